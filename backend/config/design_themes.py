@@ -4,8 +4,22 @@ Design Themes Configuration for Travel Itinerary Generator
 
 Based on successful Santa Barbara vintage travel poster theme.
 Each theme defines colors, fonts, and styling that creates cohesive visual identity.
+
+Themes are validated and compiled to minified CSS once at import; lookups
+return the cached stylesheet and its content hash.
 """
 
+import os
+import hashlib
+import logging
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple
+
+from backend.src.cache import atomic_write
+
+logger = logging.getLogger(__name__)
+
 DESIGN_THEMES = {
     "vintage_coastal": {
         "name": "Vintage Coastal",
@@ -106,48 +120,131 @@ DESIGN_THEMES = {
     }
 }
 
+DEFAULT_THEME = "vintage_coastal"
+
+# Emitted for every theme; a theme's own effects override these
+DEFAULT_EFFECTS = {
+    "card_shadow": "0 2px 4px rgba(0,0,0,0.1)",
+    "hover_lift": "translateY(-2px)",
+    "border_radius": "10px",
+}
+
+# Section -> (key, CSS variable, format) in stylesheet order
+THEME_VARIABLES = {
+    "colors": (
+        ("primary", "--primary-color", "{}"),
+        ("secondary", "--secondary-color", "{}"),
+        ("accent", "--accent-color", "{}"),
+        ("background", "--background-color", "{}"),
+        ("text_dark", "--text-dark", "{}"),
+        ("text_light", "--text-light", "{}"),
+    ),
+    "fonts": (
+        ("display", "--font-display", "'{}', cursive"),
+        ("serif", "--font-serif", "'{}', serif"),
+        ("body", "--font-body", "'{}', sans-serif"),
+    ),
+    "gradients": (
+        ("header", "--gradient-header", "{}"),
+        ("weather", "--gradient-weather", "{}"),
+        ("accent", "--gradient-accent", "{}"),
+    ),
+    "effects": (
+        ("card_shadow", "--card-shadow", "{}"),
+        ("hover_lift", "--hover-lift", "{}"),
+        ("border_radius", "--border-radius", "{}"),
+    ),
+}
+
+
+class CompiledTheme(NamedTuple):
+    """Minified stylesheet of a theme and its content hash"""
+    name: str
+    css: str
+    hash: str
+
+    @property
+    def filename(self) -> str:
+        """Content-addressed file name, safe to cache forever"""
+        return f"theme-{self.hash}.css"
+
+
+def _validate_theme(name: str, theme: Dict):
+    """Raise ValueError unless a theme defines every variable as a plain CSS value"""
+    for section, variables in THEME_VARIABLES.items():
+        values = theme.get(section, {} if section == "effects" else None)
+        if not isinstance(values, dict):
+            raise ValueError(f"Theme {name} is missing its {section}")
+        for key, _, _ in variables:
+            if section == "effects" and key not in values:
+                continue
+            value = values.get(key)
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"Theme {name} has no {section}.{key}")
+            if any(c in value for c in ";{}<>"):
+                raise ValueError(f"Theme {name} has an unsafe value for {section}.{key}: {value!r}")
+
+
+def _compile_theme(name: str, theme: Dict) -> CompiledTheme:
+    """Render one theme's CSS variables as a minified :root rule"""
+    sections = dict(theme, effects={**DEFAULT_EFFECTS, **theme.get("effects", {})})
+    declarations = [
+        f"{variable}:{template.format(' '.join(sections[section][key].split()))}"
+        for section, variables in THEME_VARIABLES.items()
+        for key, variable, template in variables
+    ]
+    css = ":root{" + ";".join(declarations) + "}"
+    return CompiledTheme(name, css, hashlib.sha256(css.encode("utf-8")).hexdigest()[:12])
+
+
+def _compile_themes(themes: Dict[str, Dict]) -> Mapping[str, CompiledTheme]:
+    """Validate and compile every theme; the result is read-only"""
+    for name, theme in themes.items():
+        _validate_theme(name, theme)
+    return MappingProxyType({name: _compile_theme(name, theme) for name, theme in themes.items()})
+
+
+COMPILED_THEMES = _compile_themes(DESIGN_THEMES)
+
+
+# Names are caller-supplied; the cache only keeps repeat warnings quiet
+@lru_cache(maxsize=128)
+def resolve_theme(theme_name: str) -> str:
+    """Name of the theme to use, falling back to DEFAULT_THEME with a warning for unknown names"""
+    if theme_name in COMPILED_THEMES:
+        return theme_name
+    logger.warning(f"Unknown theme {theme_name!r}, using {DEFAULT_THEME}")
+    return DEFAULT_THEME
+
+
+def get_compiled_theme(theme_name: str) -> CompiledTheme:
+    """Precompiled stylesheet and hash for a theme"""
+    return COMPILED_THEMES[resolve_theme(theme_name)]
+
+
 def get_theme_css(theme_name: str) -> str:
-    """Generate CSS variables for a specific theme"""
-    
-    if theme_name not in DESIGN_THEMES:
-        theme_name = "vintage_coastal"  # Default fallback
-    
-    theme = DESIGN_THEMES[theme_name]
-    
-    css_variables = f"""
-    :root {{
-        /* Colors */
-        --primary-color: {theme['colors']['primary']};
-        --secondary-color: {theme['colors']['secondary']};
-        --accent-color: {theme['colors']['accent']};
-        --background-color: {theme['colors']['background']};
-        --text-dark: {theme['colors']['text_dark']};
-        --text-light: {theme['colors']['text_light']};
-        
-        /* Fonts */
-        --font-display: '{theme['fonts']['display']}', cursive;
-        --font-serif: '{theme['fonts']['serif']}', serif;
-        --font-body: '{theme['fonts']['body']}', sans-serif;
-        
-        /* Gradients */
-        --gradient-header: {theme['gradients']['header']};
-        --gradient-weather: {theme['gradients']['weather']};
-        --gradient-accent: {theme['gradients']['accent']};
+    """Minified CSS variables for a specific theme"""
+    return get_compiled_theme(theme_name).css
+
+
+def write_theme_stylesheets(output_dir: str = "site/themes") -> Dict[str, str]:
     """
-    
-    if 'effects' in theme:
-        effects = theme['effects']
-        css_variables += f"""
-        
-        /* Effects */
-        --card-shadow: {effects.get('card_shadow', '0 2px 4px rgba(0,0,0,0.1)')};
-        --hover-lift: {effects.get('hover_lift', 'translateY(-2px)')};
-        --border-radius: {effects.get('border_radius', '10px')};
-        """
-    
-    css_variables += "\n    }\n"
-    
-    return css_variables
+    Write theme-<hash>.css for every theme
+
+    Files are content-addressed, so existing ones are left untouched and
+    can be served with immutable caching.
+
+    Returns:
+        Theme name -> file path
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    for name, compiled in COMPILED_THEMES.items():
+        path = os.path.join(output_dir, compiled.filename)
+        if not os.path.exists(path):
+            atomic_write(path, compiled.css.encode("utf-8"))
+        paths[name] = path
+    return paths
 
 # Example of how themes would be applied
 THEME_APPLICATIONS = {
@@ -190,4 +287,7 @@ if __name__ == "__main__":
     theme = suggest_theme_for_destination("Santa Barbara", ["beach", "zoo", "restaurant"])
     print(f"Suggested theme: {theme}")
     print("\nGenerated CSS:")
-    print(get_theme_css(theme))
\ No newline at end of file
+    print(get_theme_css(theme))
+    print("\nStylesheets:")
+    for name, path in write_theme_stylesheets().items():
+        print(f"  {name}: {path}")
\ No newline at end of file
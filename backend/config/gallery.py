@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Gallery Size Classes for Travel Itinerary Generator
+
+Masonry tile sizes used by the location galleries. Heights match the
+.small ... .super-tall classes in the gallery layouts; tiles are one
+column wide. Image sourcing, processing and site generation all size
+images against these classes.
+"""
+
+import math
+from typing import Tuple
+
+# Desktop column width of the three-column masonry gallery, in CSS pixels
+GALLERY_COLUMN_WIDTH = 300
+
+# Size class -> tile height in CSS pixels
+GALLERY_SIZE_CLASSES = {
+    "small": 120,
+    "medium": 200,
+    "tall": 280,
+    "extra-tall": 360,
+    "super-tall": 450,
+}
+
+# sizes attribute for gallery images: one column on phones, three columns
+# across the viewport on tablets, fixed-width columns on desktop
+GALLERY_SIZES_ATTR = f"(max-width: 768px) 100vw, (max-width: 1024px) 33vw, {GALLERY_COLUMN_WIDTH}px"
+
+# Source image requirements (see IMAGE_NAMING_CONVENTION.md)
+MIN_SOURCE_WIDTH = 800
+MAX_SOURCE_BYTES = 5 * 1024 * 1024
+SOURCE_FORMATS = {"jpeg", "png", "webp"}
+
+
+def closest_size_class(width: int, height: int) -> Tuple[str, float]:
+    """
+    Find the size class whose tile shape best matches an image
+
+    Returns:
+        (size class name, fit error) where the error is the absolute log
+        ratio between the image and tile aspect ratios; 0 is a perfect fit
+    """
+    aspect = height / width
+    return min(
+        ((name, abs(math.log(aspect * GALLERY_COLUMN_WIDTH / tile_height)))
+         for name, tile_height in GALLERY_SIZE_CLASSES.items()),
+        key=lambda item: item[1]
+    )
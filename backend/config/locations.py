@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Known Location Coordinates for Travel Itinerary Generator
+
+Local lookup table used to resolve itinerary stop names to coordinates
+without a geocoding call. Keys are lowercase names without punctuation.
+"""
+
+KNOWN_LOCATIONS = {
+    # Destinations
+    "santa barbara": (34.4208, -119.6982),
+    "los angeles": (34.0522, -118.2437),
+    "san diego": (32.7157, -117.1611),
+    "san francisco": (37.7749, -122.4194),
+
+    # Santa Barbara itinerary stops
+    "stearns wharf": (34.4103, -119.6857),
+    "funk zone": (34.4141, -119.6880),
+    "chase palm park": (34.4155, -119.6825),
+    "santa barbara zoo": (34.4205, -119.6654),
+    "sea center": (34.4093, -119.6852),
+    "shoreline park": (34.3990, -119.7071),
+    "moxi": (34.4139, -119.6862),
+    "fishouse": (34.4152, -119.6808),
+    "hotel californian": (34.4136, -119.6897),
+    "santa barbara amtrak station": (34.4137, -119.6929),
+}
@@ -0,0 +1,365 @@
+"""
+Cache Module - Two-tier response cache and file helpers shared by the backend
+In-process LRU in front of a size-bounded on-disk JSON cache, single-flight
+coalescing of concurrent fetches, and atomic, lock-guarded file writes
+
+Disk writes are atomic (temp file plus rename) and guarded by file locks
+striped over a fixed set of lock files, so several worker processes can
+share one cache directory without a lock file per key. The disk budget
+covers the whole directory: a process re-scans it under a directory lock
+before evicting, so files written by other workers count too.
+"""
+
+import os
+import json
+import time
+import zlib
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Process umask, read once: mkstemp creates 0600 files, but written files
+# (stylesheets, pages) must get the permissions open() would give them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Lock files per cache directory; keys share them by a stable hash
+LOCK_STRIPES = 64
+# Writes after which a process re-scans the shared directory against the
+# disk budget even if its own index is within it
+DISK_RESCAN_WRITES = 64
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool) -> Iterator[None]:
+    """Hold a cross-process flock on a lock file: shared for reads, exclusive for writes"""
+    if fcntl is None:
+        yield
+        return
+
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def atomic_write(path: str, payload: bytes):
+    """Write a file via a synced temp file in the same directory and an atomic rename"""
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=f".{name}.", suffix='.tmp')
+    try:
+        if hasattr(os, 'fchmod'):
+            os.fchmod(fd, 0o666 & ~_UMASK)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> (done event, result holder)
+
+    def do(self, key: str, fn: Callable[[], Dict]) -> Tuple[Dict, bool]:
+        """
+        Run fn once per key across concurrent callers
+
+        Returns:
+            The result and whether it was shared from another caller's run.
+            An exception raised by fn is re-raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = (threading.Event(), {})
+                self._calls[key] = call
+
+        done, outcome = call
+        if not leader:
+            done.wait()
+        else:
+            try:
+                outcome['result'] = fn()
+            except Exception as e:
+                outcome['error'] = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                done.set()
+
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result'], not leader
+
+    def in_flight(self, key: str) -> bool:
+        """Check whether a call for the key is currently running"""
+        with self._lock:
+            return key in self._calls
+
+
+class ResponseCache:
+    """LRU memory tier backed by a bounded directory of compact JSON files"""
+
+    def __init__(self, cache_dir: str, ttl: float = 3600,
+                 max_memory_entries: int = 256,
+                 max_disk_entries: int = 1000,
+                 max_disk_bytes: int = 50 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Directory holding one JSON file per cache key
+            ttl: Seconds an entry stays fresh
+            max_memory_entries: Entries kept in the in-process LRU
+            max_disk_entries: Files kept on disk before evicting, across every
+                process sharing cache_dir
+            max_disk_bytes: Total bytes kept on disk before evicting, across
+                every process sharing cache_dir; other processes' writes may
+                overshoot it by up to DISK_RESCAN_WRITES entries each
+        """
+        self.cache_dir = cache_dir
+        self.lock_dir = os.path.join(cache_dir, '.locks')
+        self.quarantine_dir = os.path.join(cache_dir, 'quarantine')
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (stored_at, data)
+        self._disk_index = OrderedDict()  # key -> size in bytes, oldest access first
+        self._disk_bytes = 0
+        self._writes_since_scan = 0
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0,
+            'quarantined': 0
+        }
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        os.makedirs(self.quarantine_dir, exist_ok=True)
+        self._merge_disk_index(self._scan_disk())
+
+    def _scan_disk(self) -> List[Tuple[str, int]]:
+        """(key, size) of every cache file in the directory, least recently modified first"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # Evicted by another process mid-scan
+                    continue
+                entries.append((stat.st_mtime, entry.name[:-len('.json')], stat.st_size))
+        return [(key, size) for _, key, size in sorted(entries)]
+
+    def _merge_disk_index(self, scanned: List[Tuple[str, int]]):
+        """
+        Replace the index with a directory scan; call with self._lock held
+
+        Files are ordered by modification time, except that keys this process
+        used keep their access order and count as the most recent.
+        """
+        index = OrderedDict(scanned)
+        for key in self._disk_index:
+            if key in index:
+                index.move_to_end(key)
+        self._disk_index = index
+        self._disk_bytes = sum(index.values())
+        self._writes_since_scan = 0
+
+    def _dir_lock(self):
+        """Hold the cross-process lock that serializes directory scans and eviction"""
+        return file_lock(os.path.join(self.lock_dir, "directory.lock"), exclusive=True)
+
+    def _path(self, key: str) -> str:
+        """Cache file path for a key"""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _file_lock(self, key: str, exclusive: bool):
+        """Hold the cross-process lock stripe for a key"""
+        stripe = zlib.crc32(key.encode('utf-8')) % LOCK_STRIPES
+        return file_lock(os.path.join(self.lock_dir, f"stripe-{stripe:02d}.lock"), exclusive)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached data for a key if it is still fresh"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and self._is_fresh(entry[0]):
+                self._memory.move_to_end(key)
+                self._touch_disk(key)
+                self.stats['memory_hits'] += 1
+                return entry[1]
+
+        entry = self._read_disk(key, self.ttl)
+
+        with self._lock:
+            if entry and self._is_fresh(entry[0]):
+                self._remember(key, entry)
+                self._touch_disk(key)
+                self.stats['disk_hits'] += 1
+                return entry[1]
+
+            self.stats['misses'] += 1
+            return None
+
+    def get_stale(self, key: str, max_staleness: float) -> Optional[Dict]:
+        """Return expired data for a key if it expired less than max_staleness seconds ago"""
+        max_age = self.ttl + max_staleness
+        with self._lock:
+            entry = self._memory.get(key)
+
+        if not entry or time.time() - entry[0] >= max_age:
+            entry = self._read_disk(key, max_age)
+
+        if not entry:
+            return None
+
+        with self._lock:
+            self.stats['stale_hits'] += 1
+        return entry[1]
+
+    def set(self, key: str, data: Dict):
+        """Store data in both tiers, evicting old disk entries over budget"""
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+        with self._file_lock(key, exclusive=True):
+            atomic_write(self._path(key), payload)
+
+        with self._lock:
+            self._remember(key, (time.time(), data))
+            self._disk_bytes -= self._disk_index.pop(key, 0)
+            self._disk_index[key] = len(payload)
+            self._disk_bytes += len(payload)
+            self._writes_since_scan += 1
+            rescan = self._writes_since_scan >= DISK_RESCAN_WRITES or self._over_budget()
+
+        if rescan:
+            self._enforce_disk_budget()
+
+    def _enforce_disk_budget(self):
+        """Re-scan the shared directory and evict until it is within the budgets"""
+        with self._dir_lock():
+            scanned = self._scan_disk()
+            with self._lock:
+                self._merge_disk_index(scanned)
+                evicted = self._evict_disk()
+            self._remove_files(evicted)
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            keys = list(self._disk_index)
+            self._disk_index.clear()
+            self._disk_bytes = 0
+            self._memory.clear()
+        self._remove_files(keys)
+
+    def _is_fresh(self, stored_at: float) -> bool:
+        """Check whether an entry stored at the given time is within the TTL"""
+        return time.time() - stored_at < self.ttl
+
+    def _read_disk(self, key: str, max_age: float) -> Optional[Tuple[float, Dict]]:
+        """Read an entry younger than max_age from disk, using the file mtime as its store time"""
+        path = self._path(key)
+        with self._file_lock(key, exclusive=False):
+            try:
+                stored_at = os.path.getmtime(path)
+                if time.time() - stored_at >= max_age:
+                    return None
+                with open(path, 'rb') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                return None
+            except ValueError as e:
+                logger.error(f"Corrupted cache entry {key} in {self.cache_dir}: {e}")
+                data = None
+
+        if not isinstance(data, dict):
+            self._quarantine(key)
+            return None
+        return stored_at, data
+
+    def _quarantine(self, key: str):
+        """Move a corrupted cache file aside so it is refetched instead of re-read"""
+        target = os.path.join(self.quarantine_dir, f"{key}.{int(time.time())}.json")
+        with self._file_lock(key, exclusive=True):
+            try:
+                os.replace(self._path(key), target)
+            except FileNotFoundError:
+                return
+
+        with self._lock:
+            self._disk_bytes -= self._disk_index.pop(key, 0)
+            self._memory.pop(key, None)
+            self.stats['quarantined'] += 1
+        logger.warning(f"Quarantined cache entry {key} to {target}")
+
+    def _remember(self, key: str, entry: Tuple[float, Dict]):
+        """Add an entry to the memory tier, evicting the least recently used"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats['memory_evictions'] += 1
+
+    def _touch_disk(self, key: str):
+        """Mark a disk entry as recently used"""
+        if key in self._disk_index:
+            self._disk_index.move_to_end(key)
+
+    def _over_budget(self) -> bool:
+        """Check whether the indexed files exceed the entry or byte budget"""
+        return len(self._disk_index) > self.max_disk_entries or self._disk_bytes > self.max_disk_bytes
+
+    def _evict_disk(self) -> List[str]:
+        """
+        Drop least recently used keys from the index until within entry and
+        byte budgets; call with self._lock held
+
+        Returns:
+            The evicted keys, whose files the caller removes with
+            _remove_files after releasing self._lock
+        """
+        evicted = []
+        while self._disk_index and self._over_budget():
+            key, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            evicted.append(key)
+            self.stats['disk_evictions'] += 1
+            logger.info(f"Evicted cache entry {key} from {self.cache_dir}")
+        return evicted
+
+    def _remove_files(self, keys: Iterable[str]):
+        """Delete the cache files of keys dropped from the index, unless a key was stored again since"""
+        for key in keys:
+            with self._file_lock(key, exclusive=True):
+                with self._lock:
+                    if key in self._disk_index:
+                        continue
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,192 @@
+"""
+Forecast Store Module - Per-location time series of raw forecast points
+Keeps every 3-hourly point from each fetch in an append-only record file so
+daily summaries and slot lookups can be derived without re-fetching
+"""
+
+import os
+import json
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from backend.src.cache import atomic_write, file_lock
+
+logger = logging.getLogger(__name__)
+
+# dt, temp, humidity, wind speed, condition code
+RECORD = struct.Struct('<qdddH')
+SLOT_SECONDS = 3 * 3600
+
+
+class _Series:
+    """In-memory view of one location's records, keyed by timestamp"""
+
+    def __init__(self, points: Dict[int, Tuple[float, float, float, int]], meta: Dict,
+                 records: int, file_size: int):
+        self.points = points
+        self.meta = meta
+        self.records = records
+        self.file_size = file_size
+        self._sorted = None
+
+    def timestamps(self) -> List[int]:
+        """Point timestamps in ascending order"""
+        if self._sorted is None:
+            self._sorted = sorted(self.points)
+        return self._sorted
+
+
+class ForecastStore:
+    """Append-only per-location store of raw forecast points"""
+
+    def __init__(self, store_dir: str, retention: float = 2 * 86400):
+        """
+        Args:
+            store_dir: Directory holding a record file and metadata file per key
+            retention: Seconds to keep points after their timestamp has passed
+        """
+        self.store_dir = store_dir
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._series = {}  # key -> _Series
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def _paths(self, key: str) -> Tuple[str, str, str]:
+        """Record, metadata and lock file paths for a key"""
+        base = os.path.join(self.store_dir, key)
+        return f"{base}.bin", f"{base}.meta.json", f"{base}.lock"
+
+    def merge(self, key: str, raw_data: Dict) -> int:
+        """
+        Merge the points of an API forecast response into the store
+
+        Only new or changed points are appended; a later point for the same
+        timestamp replaces the earlier one when read back.
+
+        Returns:
+            Number of points appended
+        """
+        records_path, meta_path, lock_path = self._paths(key)
+
+        with self._lock, file_lock(lock_path, exclusive=True):
+            series = self._load(key)
+            meta = {
+                'city': raw_data.get('city', series.meta.get('city', {})),
+                'conditions': list(series.meta.get('conditions', []))
+            }
+            codes = {json.dumps(cond, sort_keys=True): i for i, cond in enumerate(meta['conditions'])}
+
+            rows = []
+            for item in raw_data.get('list', []):
+                condition = item['weather'][0]
+                condition_key = json.dumps(condition, sort_keys=True)
+                if condition_key not in codes:
+                    codes[condition_key] = len(meta['conditions'])
+                    meta['conditions'].append(condition)
+
+                point = (float(item['main']['temp']), float(item['main']['humidity']),
+                         float(item['wind']['speed']), codes[condition_key])
+                if series.points.get(item['dt']) != point:
+                    series.points[item['dt']] = point
+                    rows.append(RECORD.pack(item['dt'], *point))
+
+            # Metadata goes first so every appended code already resolves
+            atomic_write(meta_path, json.dumps(meta, separators=(',', ':')).encode('utf-8'))
+            series.meta = meta
+            if rows:
+                with open(records_path, 'ab') as f:
+                    f.write(b''.join(rows))
+                series.records += len(rows)
+                series.file_size += len(rows) * RECORD.size
+                series._sorted = None
+
+            if series.records > 2 * len(series.points) + 64:
+                self._compact(key, series)
+
+        return len(rows)
+
+    def items(self, key: str, start: Optional[float] = None,
+              end: Optional[float] = None) -> List[Dict]:
+        """Stored points between start and end, oldest first, shaped like API list items"""
+        with self._lock:
+            series = self._load(key)
+            timestamps = series.timestamps()
+
+        return [
+            self._to_item(series, dt) for dt in timestamps
+            if (start is None or dt >= start) and (end is None or dt < end)
+        ]
+
+    def point_at(self, key: str, timestamp: float) -> Optional[Dict]:
+        """The stored point for the 3-hour slot containing a timestamp"""
+        with self._lock:
+            series = self._load(key)
+
+        slot = int(timestamp) - int(timestamp) % SLOT_SECONDS
+        if slot not in series.points:
+            return None
+        return self._to_item(series, slot)
+
+    def city(self, key: str) -> Dict:
+        """City block from the most recent merge for a key"""
+        with self._lock:
+            return self._load(key).meta.get('city', {})
+
+    def _to_item(self, series: _Series, dt: int) -> Dict:
+        """Convert a stored point back into the API's list item shape"""
+        temp, humidity, wind_speed, code = series.points[dt]
+        return {
+            'dt': dt,
+            'main': {'temp': temp, 'humidity': humidity},
+            'wind': {'speed': wind_speed},
+            'weather': [series.meta['conditions'][code]]
+        }
+
+    def _load(self, key: str) -> _Series:
+        """Return the series for a key, re-reading it if another process appended"""
+        records_path, meta_path, _ = self._paths(key)
+        try:
+            file_size = os.path.getsize(records_path)
+        except FileNotFoundError:
+            file_size = 0
+
+        series = self._series.get(key)
+        if series and series.file_size == file_size:
+            return series
+
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path, 'rb') as f:
+                meta = json.load(f)
+
+        points = {}
+        records = 0
+        if file_size:
+            with open(records_path, 'rb') as f:
+                data = f.read()
+            # Ignore a torn trailing record from an interrupted append
+            usable = len(data) - len(data) % RECORD.size
+            for dt, temp, humidity, wind_speed, code in RECORD.iter_unpack(data[:usable]):
+                points[dt] = (temp, humidity, wind_speed, code)
+                records += 1
+
+        series = _Series(points, meta, records, file_size)
+        self._series[key] = series
+        return series
+
+    def _compact(self, key: str, series: _Series):
+        """Rewrite a record file with one record per point, dropping expired points"""
+        records_path, _, _ = self._paths(key)
+        cutoff = time.time() - self.retention
+        for dt in [dt for dt in series.points if dt < cutoff]:
+            del series.points[dt]
+
+        series._sorted = None
+        payload = b''.join(RECORD.pack(dt, *series.points[dt]) for dt in series.timestamps())
+        atomic_write(records_path, payload)
+        series.records = len(series.points)
+        series.file_size = len(payload)
+        logger.info(f"Compacted weather series {key} to {series.records} points")
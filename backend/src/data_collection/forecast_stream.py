@@ -0,0 +1,87 @@
+"""
+Forecast Stream Module - Incremental parsing of OpenWeatherMap forecast bodies
+Keeps only the fields the weather API summarizes instead of the full payload
+"""
+
+from typing import BinaryIO, Dict
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:  # Streaming mode needs ijson; callers fall back to response.json()
+    ijson = None
+
+# Prefix of each scalar the summarizer reads -> (section, field) it is stored under
+ITEM_FIELDS = {
+    'list.item.dt': (None, 'dt'),
+    'list.item.main.temp': ('main', 'temp'),
+    'list.item.main.humidity': ('main', 'humidity'),
+    'list.item.wind.speed': ('wind', 'speed'),
+}
+WEATHER_PREFIX = 'list.item.weather.item'
+
+
+def streaming_available() -> bool:
+    """Check whether the optional ijson dependency is installed"""
+    return ijson is not None
+
+
+def parse_forecast_stream(stream: BinaryIO) -> Dict:
+    """
+    Parse a forecast response body from a byte stream in a single pass
+
+    Only dt, main.temp, main.humidity, wind.speed, the first weather entry
+    and the city block are kept; everything else is skipped as it streams.
+
+    Args:
+        stream: File-like object yielding the raw JSON body
+
+    Returns:
+        A trimmed payload with the same shape as the API response
+    """
+    items = []
+    item = None
+    city = None
+    city_builder = None
+    weather_builder = None
+    weather_seen = 0
+
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if city_builder is not None:
+            if prefix == 'city' and event == 'end_map':
+                city = city_builder.value
+                city_builder = None
+            else:
+                city_builder.event(event, value)
+            continue
+
+        if weather_builder is not None:
+            if prefix == WEATHER_PREFIX and event == 'end_map':
+                item['weather'] = [weather_builder.value]
+                weather_builder = None
+            else:
+                weather_builder.event(event, value)
+            continue
+
+        if prefix == 'list.item':
+            if event == 'start_map':
+                item = {'main': {}, 'wind': {}}
+                weather_seen = 0
+            elif event == 'end_map':
+                items.append(item)
+        elif prefix in ITEM_FIELDS:
+            section, field = ITEM_FIELDS[prefix]
+            (item if section is None else item[section])[field] = value
+        elif prefix == WEATHER_PREFIX and event == 'start_map':
+            weather_seen += 1
+            if weather_seen == 1:
+                weather_builder = ObjectBuilder()
+                weather_builder.event(event, value)
+        elif prefix == 'city' and event == 'start_map':
+            city_builder = ObjectBuilder()
+            city_builder.event(event, value)
+
+    payload = {'list': items}
+    if city is not None:
+        payload['city'] = city
+    return payload
@@ -0,0 +1,106 @@
+"""
+Geo Module - Location resolution and geohash bucketing for weather lookups
+Maps names and coordinates onto grid cells so nearby stops share forecasts
+"""
+
+import re
+from typing import Dict, Optional, Tuple, Union
+
+Coordinates = Tuple[float, float]
+Location = Union[str, Coordinates]
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+_COORDINATE_PATTERN = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$')
+
+
+def normalize_location_name(name: str) -> str:
+    """Lowercase a location name and strip punctuation and extra whitespace"""
+    return " ".join(re.sub(r"[^\w\s]", " ", name.lower()).split())
+
+
+def parse_coordinates(location: Location) -> Optional[Coordinates]:
+    """Return coordinates from a (lat, lon) pair or a "lat,lon" string"""
+    if isinstance(location, (tuple, list)) and len(location) == 2:
+        return float(location[0]), float(location[1])
+
+    if isinstance(location, str):
+        match = _COORDINATE_PATTERN.match(location)
+        if match:
+            return float(match.group(1)), float(match.group(2))
+
+    return None
+
+
+def resolve_coordinates(location: Location,
+                        known_locations: Dict[str, Coordinates]) -> Optional[Coordinates]:
+    """
+    Resolve a location to coordinates without a network call
+
+    Args:
+        location: (lat, lon) pair, "lat,lon" string or place name
+        known_locations: Lookup table keyed by normalized place name
+
+    Returns:
+        Coordinates, or None if the name is not in the lookup table
+    """
+    coordinates = parse_coordinates(location)
+    if coordinates or not isinstance(location, str):
+        return coordinates
+
+    # "Santa Barbara, CA" falls back to "santa barbara"
+    for name in (location, location.split(',')[0]):
+        coordinates = known_locations.get(normalize_location_name(name))
+        if coordinates:
+            return coordinates
+
+    return None
+
+
+def geohash_encode(lat: float, lon: float, precision: int = 5) -> str:
+    """Encode coordinates as a geohash; precision 5 is a cell of about 5km"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        value, value_range = (lon, lon_range) if even else (lat, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits <<= 1
+            value_range[1] = mid
+
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_center(geohash: str) -> Coordinates:
+    """Decode a geohash to the coordinates of its cell center"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        bits = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even else lat_range
+            mid = (value_range[0] + value_range[1]) / 2
+            if (bits >> shift) & 1:
+                value_range[0] = mid
+            else:
+                value_range[1] = mid
+            even = not even
+
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
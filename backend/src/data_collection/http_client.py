@@ -0,0 +1,227 @@
+"""
+HTTP Client Module - Rate-limited, retrying upstream client for data providers
+Shared by the weather and review collectors so each provider gets one pooled
+session, a token bucket sized to its quota and a circuit breaker
+"""
+
+import time
+import random
+import threading
+from typing import Dict, Optional
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire blocks until a token is available"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping if the bucket is empty. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and allows one trial call after a cool-down"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open'"""
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Check whether a call may go through, reserving the half-open trial"""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a failure. Returns True if this failure tripped the breaker."""
+        with self._lock:
+            self._failures += 1
+            reopening = self._trial_in_flight
+            self._trial_in_flight = False
+            if reopening or self._failures >= self.failure_threshold:
+                tripped = self._opened_at is None or reopening
+                self._opened_at = time.monotonic()
+                return tripped
+            return False
+
+
+class UpstreamClient:
+    """Pooled HTTP client with timeouts, rate limiting, retries and a circuit breaker"""
+
+    def __init__(self, base_url: str = "", rate_per_minute: float = 60, burst: int = 10,
+                 connect_timeout: float = 3.05, read_timeout: float = 10,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8,
+                 failure_threshold: int = 5, reset_timeout: float = 30,
+                 pool_maxsize: int = 10, headers: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            base_url: Prefix for relative request paths
+            rate_per_minute: Sustained request rate allowed by the provider quota
+            burst: Requests allowed back to back before throttling
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait between bytes of the response
+            max_retries: Retries on 429/5xx responses and connection errors
+            backoff_base: First backoff delay in seconds, doubled per retry
+            backoff_max: Upper bound on a single backoff delay
+            failure_threshold: Consecutive failed calls that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+            pool_maxsize: Keep-alive connections kept per host
+            headers: Headers sent with every request
+        """
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = TokenBucket(rate_per_minute / 60, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.session = self._create_session(pool_maxsize, headers)
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'calls': 0,
+            'retries': 0,
+            'throttles': 0,
+            'failures': 0,
+            'trips': 0,
+            'short_circuits': 0
+        }
+
+    def _create_session(self, pool_maxsize: int, headers: Optional[Dict[str, str]]) -> requests.Session:
+        """Create a keep-alive session sized for concurrent callers"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(headers or {})
+        return session
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def get(self, path: str, params: Optional[Dict] = None, stream: bool = False,
+            headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        GET a path relative to base_url (or an absolute URL)
+
+        Retries 429/5xx responses and connection errors with exponential
+        backoff and full jitter, honouring Retry-After. Other request errors
+        fail at once. Other responses are returned as-is for the caller to check.
+
+        Raises:
+            CircuitOpenError: The upstream has failed repeatedly and is cooling down
+            requests.RequestException: The call still failed after all retries
+        """
+        if not self.breaker.allow():
+            self._count('short_circuits')
+            raise CircuitOpenError(f"Circuit open for {self.base_url or path}")
+
+        url = path if path.startswith('http') else f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            if self.bucket.acquire() > 0:
+                self._count('throttles')
+            self._count('calls')
+
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, headers=headers,
+                                            timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except requests.RequestException as e:
+                # Not worth retrying, but the breaker must still hear about it
+                error = e
+                break
+            except Exception:
+                # Never leave a half-open trial reserved
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+
+                if response.status_code == 429:
+                    self._count('throttles')
+                retry_after = response.headers.get('Retry-After')
+                error = requests.HTTPError(f"{response.status_code} from {url}", response=response)
+                response.close()
+
+            if attempt == self.max_retries:
+                break
+
+            self._count('retries')
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+            logger.warning(f"Retrying {url} in {delay:.2f}s after: {error}")
+            time.sleep(delay)
+
+        self._count('failures')
+        if self.breaker.record_failure():
+            self._count('trips')
+            logger.error(f"Circuit opened for {self.base_url or url}")
+        raise error
@@ -0,0 +1,545 @@
+"""
+Review Mining Module - Text analysis behind the Yelp review curator
+Each review is sentence-split and tokenized once; the analyzed sentences
+then feed the must-try item matcher, the pro tip detector and the vivid
+quote scorer. Large review sets are analyzed across a process pool.
+"""
+
+import os
+import re
+import json
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.src.cache import atomic_write
+
+# Common dishes and drinks -> emoji shown in the must-try list
+MENU_ITEMS = {
+    "Lobster Mac & Cheese": "🦞",
+    "Lobster Roll": "🦞",
+    "Mac & Cheese": "🧀",
+    "Cioppino": "🦀",
+    "Crab Cakes": "🦀",
+    "Clam Chowder": "🥣",
+    "Macadamia Mahi Mahi": "🐟",
+    "Mahi Mahi": "🐟",
+    "Fish and Chips": "🐟",
+    "Fish Tacos": "🌮",
+    "Poke": "🐟",
+    "Ceviche": "🍋",
+    "Oysters": "🦪",
+    "Calamari": "🦑",
+    "Shrimp": "🍤",
+    "Sushi": "🍣",
+    "Ramen": "🍜",
+    "Steak": "🥩",
+    "Crispy Ribs": "🍖",
+    "Ribs": "🍖",
+    "Burger": "🍔",
+    "Fries": "🍟",
+    "Pizza": "🍕",
+    "Pasta": "🍝",
+    "Tacos": "🌮",
+    "Breakfast Burrito": "🌯",
+    "Burrito": "🌯",
+    "Sandwich": "🥪",
+    "Salad": "🥗",
+    "Avocado Toast": "🥑",
+    "Eggs Benedict": "🍳",
+    "Pancakes": "🥞",
+    "French Toast": "🍞",
+    "Donuts": "🍩",
+    "Cheesecake": "🍰",
+    "Ice Cream": "🍦",
+    "Coffee": "☕",
+    "Mimosa": "🥂",
+    "Margarita": "🍹",
+    "Wine": "🍷",
+}
+DEFAULT_EMOJI = "🍽️"
+
+POSITIVE_WORDS = {
+    "amazing", "awesome", "best", "delicious", "excellent", "fantastic",
+    "favorite", "fresh", "incredible", "legendary", "love", "loved",
+    "must", "outstanding", "perfect", "perfectly", "phenomenal", "recommend",
+    "tasty", "wonderful", "yum", "yummy",
+}
+NEGATIONS = {"not", "never", "no", "wasn't", "isn't", "didn't"}
+
+# Single tokens and bigrams that mark actionable advice
+TIP_CUES = {
+    "tip", "advice", "recommend", "reservation", "arrive", "avoid", "parking",
+    ("make", "sure"), ("be", "sure"), ("ask", "for"), ("don't", "miss"),
+    ("get", "there"), ("go", "early"), ("happy", "hour"), ("fill", "up"),
+}
+# Details that make a tip specific rather than obvious
+TIP_SPECIFICS = {
+    "early", "late", "weekday", "weekend", "monday", "tuesday", "wednesday",
+    "thursday", "friday", "saturday", "sunday", "patio", "window", "bar",
+    "outside", "sunset", "seat", "seating", "table", "lot", "street", "line",
+}
+_TIP_PREFIX_PATTERN = re.compile(r"^(pro[ -]?tip|tip|advice)\s*[:\-]\s*", re.IGNORECASE)
+
+GENERIC_WORDS = {
+    "great", "good", "nice", "food", "service", "place", "amazing", "awesome",
+    "delicious", "friendly", "staff", "definitely", "really", "very", "best",
+    "restaurant", "experience", "love", "loved", "recommend", "excellent",
+}
+SENSORY_WORDS = {
+    "crispy", "creamy", "smoky", "buttery", "tender", "flaky", "juicy", "salty",
+    "sweet", "tangy", "spicy", "warm", "golden", "charred", "fresh", "rich",
+    "sunset", "ocean", "view", "breeze", "fire", "wave", "harbor", "glow",
+    "sizzling", "melt", "crunch", "steaming", "salt", "sand", "pier",
+}
+FIRST_PERSON = {"i", "we", "my", "our", "us"}
+STOPWORDS = {
+    "the", "a", "an", "and", "or", "but", "of", "to", "in", "on", "at", "for",
+    "with", "it", "is", "was", "were", "this", "that", "they", "be", "had",
+    "have", "so", "as", "from", "there", "their",
+}
+
+# Review counts below this are analyzed in-process
+PARALLEL_THRESHOLD = 500
+
+_SENTENCE_PATTERN = re.compile(r"[^.!?\n]+[.!?]*")
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+|&")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split review text into trimmed sentences"""
+    return [s.strip() for s in _SENTENCE_PATTERN.findall(text) if s.strip()]
+
+
+# Words ending in these keep their final "s" (delicious, glass, this, octopus)
+_NON_PLURAL_ENDINGS = ("ss", "ous", "is", "us")
+
+
+def normalize_token(token: str) -> str:
+    """Fold '&' to 'and' and plurals to singular so phrase variants match"""
+    if token == "&":
+        return "and"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(_NON_PLURAL_ENDINGS):
+        return token[:-1]
+    return token
+
+
+def _normalize_vocabulary(words: set) -> set:
+    """Pass a word list (tokens or token tuples) through normalize_token so it matches tokenized text"""
+    return {
+        tuple(normalize_token(t) for t in word) if isinstance(word, tuple) else normalize_token(word)
+        for word in words
+    }
+
+
+POSITIVE_WORDS = _normalize_vocabulary(POSITIVE_WORDS)
+NEGATIONS = _normalize_vocabulary(NEGATIONS)
+TIP_CUES = _normalize_vocabulary(TIP_CUES)
+TIP_SPECIFICS = _normalize_vocabulary(TIP_SPECIFICS)
+GENERIC_WORDS = _normalize_vocabulary(GENERIC_WORDS)
+SENSORY_WORDS = _normalize_vocabulary(SENSORY_WORDS)
+FIRST_PERSON = _normalize_vocabulary(FIRST_PERSON)
+STOPWORDS = _normalize_vocabulary(STOPWORDS)
+
+
+def tokenize(sentence: str) -> List[str]:
+    """Lowercase, split and normalize a sentence into tokens"""
+    return [normalize_token(t) for t in _TOKEN_PATTERN.findall(sentence.lower())]
+
+
+def is_positive(tokens: List[str]) -> bool:
+    """Check whether a tokenized sentence contains un-negated praise"""
+    for i, token in enumerate(tokens):
+        if token in POSITIVE_WORDS and not (i and tokens[i - 1] in NEGATIONS):
+            return True
+    return False
+
+
+def analyze_review(review: Dict) -> Dict:
+    """Sentence-split and tokenize a review once for every miner"""
+    return {
+        "rating": review.get("rating"),
+        "sentences": [(sentence, tokenize(sentence)) for sentence in split_sentences(review.get("text", ""))]
+    }
+
+
+def analyze_reviews(reviews: List[Dict], workers: Optional[int] = None,
+                    parallel_threshold: int = PARALLEL_THRESHOLD) -> List[Dict]:
+    """Analyze reviews in input order, across a process pool for large sets"""
+    if workers == 1 or len(reviews) < parallel_threshold:
+        return [analyze_review(review) for review in reviews]
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(analyze_review, reviews, chunksize=max(1, len(reviews) // (4 * workers))))
+
+
+class ReviewAnalyzer:
+    """Caches analyzed reviews so each is tokenized once across all miners"""
+
+    def __init__(self, workers: Optional[int] = None, max_entries: int = 20000):
+        self.workers = workers
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # review key -> analyzed review
+
+    def analyze(self, reviews: List[Dict]) -> List[Dict]:
+        """Analyzed reviews in input order, reusing earlier results"""
+        keys = [self._key(review) for review in reviews]
+        missing = {key: review for key, review in zip(keys, reviews) if key not in self._cache}
+        for key, analyzed in zip(missing, analyze_reviews(list(missing.values()), self.workers)):
+            self._cache[key] = analyzed
+
+        results = []
+        for key in keys:
+            self._cache.move_to_end(key)
+            results.append(self._cache[key])
+
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return results
+
+    def _key(self, review: Dict) -> str:
+        """Yelp review id, or a hash of the text for reviews without one"""
+        if review.get("id"):
+            return review["id"]
+        return hashlib.sha1(review.get("text", "").encode("utf-8")).hexdigest()
+
+
+class MenuItemMatcher:
+    """Token trie over menu item names, matching the longest phrase at each position"""
+
+    def __init__(self, names: Iterable[str]):
+        self._root = {}
+        self.max_length = 0
+        for name in names:
+            tokens = tokenize(name)
+            node = self._root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[None] = name
+            self.max_length = max(self.max_length, len(tokens))
+
+    def find(self, tokens: List[str]) -> List[str]:
+        """Menu item names mentioned in a token list, longest match first, no overlaps"""
+        found = []
+        i = 0
+        while i < len(tokens):
+            node = self._root
+            match, match_end = None, i
+            for j in range(i, min(len(tokens), i + self.max_length)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if None in node:
+                    match, match_end = node[None], j + 1
+
+            if match:
+                found.append(match)
+                i = match_end
+            else:
+                i += 1
+        return found
+
+
+_default_matcher = None
+
+
+def get_menu_matcher(extra_items: Optional[Iterable[str]] = None) -> MenuItemMatcher:
+    """Matcher for the default menu vocabulary, plus any business-specific items"""
+    global _default_matcher
+    if extra_items:
+        return MenuItemMatcher(list(MENU_ITEMS) + list(extra_items))
+    if _default_matcher is None:
+        _default_matcher = MenuItemMatcher(MENU_ITEMS)
+    return _default_matcher
+
+
+def count_menu_mentions(analyzed_reviews: List[Dict], matcher: MenuItemMatcher) -> Dict[str, Dict]:
+    """
+    Scan every analyzed review once, counting menu item mentions
+
+    Returns:
+        Per item name: total mentions, reviews mentioning it, reviews praising
+        it in the same sentence, and the shortest praising sentence as a quote
+    """
+    stats = {}
+    for review in analyzed_reviews:
+        seen, praised = set(), set()
+        for sentence, tokens in review["sentences"]:
+            items = matcher.find(tokens)
+            if not items:
+                continue
+
+            positive = is_positive(tokens)
+            for name in items:
+                item = stats.setdefault(name, {"mentions": 0, "reviews": 0, "positive": 0, "quote": None})
+                item["mentions"] += 1
+                if name not in seen:
+                    seen.add(name)
+                    item["reviews"] += 1
+                if positive and name not in praised:
+                    praised.add(name)
+                    item["positive"] += 1
+                if positive and (item["quote"] is None or len(sentence) < len(item["quote"])):
+                    item["quote"] = sentence
+    return stats
+
+
+def merge_menu_stats(stats: Dict[str, Dict], new_stats: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Add mention counts from newly scanned reviews into accumulated stats, in place"""
+    for name, new in new_stats.items():
+        item = stats.setdefault(name, {"mentions": 0, "reviews": 0, "positive": 0, "quote": None})
+        for field in ("mentions", "reviews", "positive"):
+            item[field] += new[field]
+        if new["quote"] and (item["quote"] is None or len(new["quote"]) < len(item["quote"])):
+            item["quote"] = new["quote"]
+    return stats
+
+
+def rank_must_try(stats: Dict[str, Dict], limit: int = 4, min_reviews: int = 2) -> List[str]:
+    """Format the most praised items as must-try lines like: 🦞 Lobster Mac & Cheese - 'Legendary!'"""
+    candidates = [
+        (item["positive"], item["reviews"], item["mentions"], name)
+        for name, item in stats.items()
+        if item["reviews"] >= min_reviews and item["positive"]
+    ]
+    candidates.sort(key=lambda c: (-c[0], -c[1], -c[2], c[3]))
+
+    lines = []
+    for _, _, _, name in candidates[:limit]:
+        emoji = MENU_ITEMS.get(name, DEFAULT_EMOJI)
+        quote = _clip(stats[name]["quote"])
+        lines.append(f"{emoji} {name} - '{quote}'")
+    return lines
+
+
+def _has_cue(tokens: List[str], cues: set) -> int:
+    """Count single-token and bigram cues in a token list"""
+    return sum(1 for t in tokens if t in cues) + sum(1 for pair in zip(tokens, tokens[1:]) if pair in cues)
+
+
+def _is_near_duplicate(tokens: set, chosen: List[set], threshold: float = 0.6) -> bool:
+    """Check token-set overlap against already chosen sentences"""
+    return any(len(tokens & other) / len(tokens | other) > threshold for other in chosen)
+
+
+def collect_tip_candidates(analyzed_reviews: List[Dict]) -> List[Dict]:
+    """
+    Score every sentence that reads as actionable, non-obvious advice
+
+    A sentence needs a tip cue ("make sure", "ask for", "reservation", ...)
+    plus at least one specific detail (a time, day, number or seat/area),
+    and scores by how many cues and details it carries.
+    """
+    candidates = []
+    for review in analyzed_reviews:
+        for sentence, tokens in review["sentences"]:
+            if not 5 <= len(tokens) <= 40:
+                continue
+            cues = _has_cue(tokens, TIP_CUES)
+            if not cues:
+                continue
+            specifics = sum(1 for t in tokens if t in TIP_SPECIFICS or any(c.isdigit() for c in t))
+            if not specifics:
+                continue
+            candidates.append({"score": 2 * cues + specifics, "text": sentence, "tokens": tokens})
+    return candidates
+
+
+def select_pro_tips(candidates: List[Dict], limit: int = 3) -> List[str]:
+    """Top scoring tip candidates with near-duplicates and "Pro tip:" prefixes removed"""
+    tips, chosen = [], []
+    for candidate in sorted(candidates, key=lambda c: -c["score"]):
+        token_set = set(candidate["tokens"])
+        if _is_near_duplicate(token_set, chosen):
+            continue
+        chosen.append(token_set)
+        tip = _TIP_PREFIX_PATTERN.sub("", candidate["text"])
+        tips.append(tip[:1].upper() + tip[1:])
+        if len(tips) == limit:
+            break
+    return tips
+
+
+def detect_pro_tips(analyzed_reviews: List[Dict], limit: int = 3) -> List[str]:
+    """Find actionable, non-obvious advice sentences, best first"""
+    return select_pro_tips(collect_tip_candidates(analyzed_reviews), limit)
+
+
+def _vivid_score(tokens: List[str]) -> float:
+    """Score a sentence higher for concrete, sensory detail and lower for generic praise"""
+    content = [t for t in tokens if t not in STOPWORDS]
+    generic = sum(1 for t in content if t in GENERIC_WORDS)
+    specific = len(content) - generic
+    sensory = sum(1 for t in content if t in SENSORY_WORDS)
+    numbers = any(c.isdigit() for t in tokens for c in t)
+    personal = any(t in FIRST_PERSON for t in tokens)
+    return 2 * sensory + 0.5 * specific - 2 * generic + 1.5 * numbers + personal
+
+
+def collect_quote_candidates(analyzed_reviews: List[Dict]) -> List[Dict]:
+    """Best-scoring sentence per review, generic praise excluded"""
+    quotes = []
+    for review in analyzed_reviews:
+        best = None
+        for sentence, tokens in review["sentences"]:
+            if not 8 <= len(tokens) <= 45:
+                continue
+            score = _vivid_score(tokens)
+            if score > 0 and (best is None or score > best[0]):
+                best = (score, sentence)
+        if best:
+            quotes.append({"text": best[1], "source": "Yelp Reviewer",
+                           "rating": review["rating"], "score": round(best[0], 2)})
+    return quotes
+
+
+def select_vivid_quotes(candidates: List[Dict], limit: int = 3) -> List[Dict]:
+    """Highest scoring quote candidates first"""
+    return sorted(candidates, key=lambda q: -q["score"])[:limit]
+
+
+def score_vivid_quotes(analyzed_reviews: List[Dict], limit: int = 3) -> List[Dict]:
+    """Find the quotes that paint the most vivid pictures, best first"""
+    return select_vivid_quotes(collect_quote_candidates(analyzed_reviews), limit)
+
+
+def mine_business(reviews: List[Dict], menu_items: Optional[List[str]] = None) -> Dict:
+    """Run every miner over one business's reviews, analyzing each review once"""
+    analyzed = analyze_reviews(reviews, workers=1)
+    return {
+        "must_try_items": rank_must_try(count_menu_mentions(analyzed, get_menu_matcher(menu_items))),
+        "pro_tips": detect_pro_tips(analyzed),
+        "vivid_quotes": score_vivid_quotes(analyzed)
+    }
+
+
+def _mine_business_task(task: Tuple[List[Dict], Optional[List[str]]]) -> Dict:
+    """Process pool entry point for mine_business"""
+    return mine_business(*task)
+
+
+def mine_businesses(reviews_by_business: Dict[str, List[Dict]],
+                    menu_items_by_business: Optional[Dict[str, List[str]]] = None,
+                    workers: Optional[int] = None) -> Dict[str, Dict]:
+    """
+    Mine many businesses at once, one business per process pool task
+
+    Returns:
+        must_try_items, pro_tips and vivid_quotes per business id
+    """
+    menus = menu_items_by_business or {}
+    tasks = [(reviews, menus.get(business_id)) for business_id, reviews in reviews_by_business.items()]
+    if workers == 1 or len(tasks) < 2:
+        results = [_mine_business_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_mine_business_task, tasks))
+    return dict(zip(reviews_by_business, results))
+
+
+class IncrementalMiner:
+    """
+    Persistent per-business mining state for nightly refreshes
+
+    Each business keeps a watermark (newest review time_created seen, plus
+    the ids at that time), accumulated menu item counts and bounded pools of
+    tip and quote candidates. Ingesting only analyzes reviews past the
+    watermark and merges them into the state.
+    """
+
+    def __init__(self, state_dir: str, max_candidates: int = 50):
+        """
+        Args:
+            state_dir: Directory holding one JSON state file per business
+            max_candidates: Tip and quote candidates kept per business
+        """
+        self.state_dir = state_dir
+        self.max_candidates = max_candidates
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    def _path(self, business_id: str) -> str:
+        return os.path.join(self.state_dir, f"{business_id}.json")
+
+    def load(self, business_id: str, menu_items: Optional[List[str]] = None) -> Dict:
+        """Stored state for a business, or a fresh one if none exists or its menu changed"""
+        menu = sorted(menu_items or [])
+        path = self._path(business_id)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                state = json.load(f)
+            if state["menu_items"] == menu:
+                return state
+
+        return {
+            "menu_items": menu,
+            "watermark": "",
+            "watermark_ids": [],
+            "review_count": 0,
+            "menu_stats": {},
+            "tip_candidates": [],
+            "quote_candidates": []
+        }
+
+    def ingest(self, business_id: str, reviews: List[Dict],
+               menu_items: Optional[List[str]] = None) -> Dict:
+        """
+        Merge reviews newer than the business watermark into its state
+
+        Returns:
+            Current must_try_items, pro_tips and vivid_quotes, plus how many
+            reviews were new
+        """
+        state = self.load(business_id, menu_items)
+        new_reviews = [review for review in reviews if self._is_new(state, review)]
+
+        if new_reviews:
+            analyzed = analyze_reviews(new_reviews)
+            matcher = get_menu_matcher(state["menu_items"])
+            merge_menu_stats(state["menu_stats"], count_menu_mentions(analyzed, matcher))
+            state["tip_candidates"] = sorted(
+                state["tip_candidates"] + collect_tip_candidates(analyzed),
+                key=lambda c: -c["score"]
+            )[:self.max_candidates]
+            state["quote_candidates"] = select_vivid_quotes(
+                state["quote_candidates"] + collect_quote_candidates(analyzed),
+                self.max_candidates
+            )
+            state["review_count"] += len(new_reviews)
+            self._advance_watermark(state, new_reviews)
+            atomic_write(self._path(business_id), json.dumps(state, separators=(",", ":")).encode("utf-8"))
+
+        results = self.results(state)
+        results["new_reviews"] = len(new_reviews)
+        return results
+
+    def results(self, state: Dict) -> Dict:
+        """Rankings derived from accumulated state"""
+        return {
+            "must_try_items": rank_must_try(state["menu_stats"]),
+            "pro_tips": select_pro_tips(state["tip_candidates"]),
+            "vivid_quotes": select_vivid_quotes(state["quote_candidates"])
+        }
+
+    def _is_new(self, state: Dict, review: Dict) -> bool:
+        created = review.get("time_created", "")
+        if created != state["watermark"]:
+            return created > state["watermark"]
+        return review.get("id") not in state["watermark_ids"]
+
+    def _advance_watermark(self, state: Dict, new_reviews: List[Dict]):
+        """Move the watermark to the newest review time, tracking ids that share it"""
+        newest = max(review.get("time_created", "") for review in new_reviews)
+        ids = {review.get("id") for review in new_reviews if review.get("time_created", "") == newest}
+        if newest == state["watermark"]:
+            ids.update(state["watermark_ids"])
+        state["watermark"] = newest
+        state["watermark_ids"] = sorted(i for i in ids if i)
+
+
+def _clip(sentence: str, max_length: int = 60) -> str:
+    """Shorten a quote at a word boundary"""
+    if len(sentence) <= max_length:
+        return sentence
+    return sentence[:max_length].rsplit(" ", 1)[0].rstrip(",;:") + "..."
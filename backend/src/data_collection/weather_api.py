@@ -1,88 +1,446 @@
 """
 Weather API Module - Fetches weather data for travel destinations
 Supports OpenWeatherMap API with caching and fallback data
+
+Run from the repository root: python -m backend.src.data_collection.weather_api
 """
 
 import os
+import copy
 import json
-import requests
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import logging
 
+try:
+    import numpy as np
+except ImportError:  # Fall back to the pure Python aggregation path
+    np = None
+
+from backend.config.locations import KNOWN_LOCATIONS
+from backend.src.cache import ResponseCache, SingleFlight, atomic_write
+from backend.src.data_collection.forecast_store import ForecastStore
+from backend.src.data_collection.forecast_stream import parse_forecast_stream, streaming_available
+from backend.src.data_collection.geo import (
+    Coordinates, Location, geohash_center, geohash_encode,
+    normalize_location_name, resolve_coordinates
+)
+from backend.src.data_collection.http_client import UpstreamClient
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Mock weather patterns, cycled one per day
+MOCK_PATTERNS = [
+    {'condition': 'Clear', 'icon': '01d', 'high': 75, 'low': 60},
+    {'condition': 'Partly Cloudy', 'icon': '02d', 'high': 72, 'low': 58},
+    {'condition': 'Cloudy', 'icon': '03d', 'high': 68, 'low': 55},
+    {'condition': 'Light Rain', 'icon': '10d', 'high': 65, 'low': 52}
+]
+
+
+def _build_mock_hourly(pattern: Dict) -> List[Dict]:
+    """Hourly entries for a mock pattern, peaking at noon"""
+    hourly_data = []
+    for hour in [9, 12, 15, 18]:
+        temp_variation = (hour - 12) * 2  # Temperature peaks at noon
+        hourly_data.append({
+            'time': f"{hour % 12 or 12} {'PM' if hour >= 12 else 'AM'}",
+            'temp': pattern['high'] - 5 + temp_variation,
+            'condition': pattern['condition'],
+            'icon': pattern['icon'],
+            'description': pattern['condition'].lower()
+        })
+    return hourly_data
+
+
+MOCK_HOURLY = [_build_mock_hourly(pattern) for pattern in MOCK_PATTERNS]
+
+# Mock and fixture forecasts kept per (location, days[, date]); callers get copies
+MOCK_MEMO_SIZE = 256
+
+
+@lru_cache(maxsize=MOCK_MEMO_SIZE)
+def _build_mock_forecast(name: str, days: int, day: date) -> Dict:
+    """Build a mock forecast from the precomputed patterns, once per location, days and date"""
+    forecasts = []
+    
+    for i in range(days):
+        current_date = day + timedelta(days=i)
+        pattern = MOCK_PATTERNS[i % len(MOCK_PATTERNS)]
+        
+        forecast = {
+            'date': current_date.strftime('%a, %b %d'),
+            'day_name': current_date.strftime('%A'),
+            'high': pattern['high'],
+            'low': pattern['low'],
+            'condition': pattern['condition'],
+            'icon': pattern['icon'],
+            'description': pattern['condition'].lower(),
+            'humidity': 65,
+            'wind_speed': 10,
+            'hourly': MOCK_HOURLY[i % len(MOCK_PATTERNS)]
+        }
+        
+        forecasts.append(forecast)
+    
+    return {
+        'location': {
+            'name': name,
+            'country': 'US',
+            'coordinates': {'lat': 34.4208, 'lon': -119.6982}
+        },
+        'current': {
+            'temperature': forecasts[0]['high'] if forecasts else 70,
+            'condition': forecasts[0]['condition'] if forecasts else 'Clear',
+            'description': forecasts[0]['description'] if forecasts else 'clear sky'
+        },
+        'forecast': forecasts,
+        'additional_info': {
+            'uv_index': 'Moderate (5-7)',
+            'air_quality': 'Good',
+            'sunrise': '6:30 AM',
+            'sunset': '7:00 PM'
+        },
+        'last_updated': datetime.now().isoformat()
+    }
+
 
 class WeatherAPI:
     """Handles weather data fetching and processing for travel itineraries"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, max_workers: int = 8,
+                 cache_ttl: float = 3600, memory_cache_size: int = 256,
+                 cache_max_entries: int = 1000,
+                 cache_max_bytes: int = 50 * 1024 * 1024,
+                 stale_while_revalidate: bool = False,
+                 max_staleness: float = 6 * 3600,
+                 known_locations: Optional[Dict[str, Coordinates]] = None,
+                 geohash_precision: int = 5,
+                 stream_parse: bool = True,
+                 offline: bool = False,
+                 record_fixtures: bool = False,
+                 client: Optional[UpstreamClient] = None):
         self.api_key = api_key or os.getenv('OPENWEATHER_API_KEY')
         self.base_url = "https://api.openweathermap.org/data/2.5"
         self.cache_dir = "backend/data/weather_cache"
-        self._ensure_cache_dir()
+        self.series_dir = "backend/data/weather_series"
+        self.fixtures_dir = "backend/data/weather_fixtures"
+        self.max_workers = max_workers
+        # Free tier quota is 60 calls per minute
+        self.client = client or UpstreamClient(self.base_url, rate_per_minute=60, pool_maxsize=max_workers)
+        self.cache = ResponseCache(
+            self.cache_dir,
+            ttl=cache_ttl,
+            max_memory_entries=memory_cache_size,
+            max_disk_entries=cache_max_entries,
+            max_disk_bytes=cache_max_bytes
+        )
+        self.store = ForecastStore(self.series_dir)
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_staleness = max_staleness
+        self._inflight = SingleFlight()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2)
+        self.known_locations = dict(KNOWN_LOCATIONS)
+        self.known_locations.update(known_locations or {})
+        self.geohash_precision = geohash_precision
+        self.stream_parse = stream_parse and streaming_available()
+        self.offline = offline or os.getenv('WEATHER_OFFLINE') == '1'
+        self.record_fixtures = record_fixtures
+        self._fixtures = self._load_fixtures() if self.offline else {}
+        self._fixture_forecasts = OrderedDict()  # (cache key, days) -> processed fixture, LRU
+        self._fixture_lock = threading.Lock()
+    
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters for the forecast cache"""
+        return dict(self.cache.stats)
+    
+    @property
+    def upstream_stats(self) -> Dict[str, int]:
+        """Call, retry, throttle and circuit breaker counters for OpenWeatherMap"""
+        return dict(self.client.stats)
+    
+    def _load_fixtures(self) -> Dict[str, Dict]:
+        """Load every recorded API response in the fixtures directory, keyed by cache key"""
+        fixtures = {}
+        if not os.path.isdir(self.fixtures_dir):
+            return fixtures
+        
+        for name in sorted(os.listdir(self.fixtures_dir)):
+            if name.endswith('.json'):
+                with open(os.path.join(self.fixtures_dir, name), 'rb') as f:
+                    fixtures[name[:-len('.json')]] = json.load(f)
+        
+        logger.info(f"Loaded {len(fixtures)} weather fixtures for offline mode")
+        return fixtures
     
-    def _ensure_cache_dir(self):
-        """Create cache directory if it doesn't exist"""
-        os.makedirs(self.cache_dir, exist_ok=True)
+    def _record_fixture(self, key: str, raw_data: Dict):
+        """Save a raw API response so offline mode can replay it"""
+        os.makedirs(self.fixtures_dir, exist_ok=True)
+        payload = json.dumps(raw_data, separators=(',', ':')).encode('utf-8')
+        atomic_write(os.path.join(self.fixtures_dir, f"{key}.json"), payload)
     
-    def get_forecast(self, location: str, days: int = 3) -> Dict:
+    def get_forecast(self, location: Location, days: int = 3) -> Dict:
         """
         Get weather forecast for a location
         
         Args:
-            location: City name or coordinates
+            location: City name, "lat,lon" string or (lat, lon) pair
             days: Number of days to forecast (max 5)
         
         Returns:
             Weather forecast data
+        
+        Names in the local lookup table and coordinates are cached by
+        geohash cell, so nearby stops share one forecast. Concurrent misses for the same location share one upstream fetch.
+        With stale_while_revalidate enabled, an entry expired by less than
+        max_staleness seconds is served immediately and refreshed in the
+        background.
+        """
+        forecast, _ = self._get_forecast_with_status(location, days)
+        return forecast
+    
+    def get_forecasts(self, locations: List[Location], days: int = 3) -> List[Dict]:
+        """
+        Get weather forecasts for several locations concurrently
+        
+        Locations that share a cache key (the same name, or coordinates in
+        the same geohash cell) are fetched once and share a result. Fetches
+        run on a bounded thread pool over the shared keep-alive session.
+        
+        Args:
+            locations: City names or coordinates, one per itinerary stop
+            days: Number of days to forecast (max 5)
+        
+        Returns:
+            One entry per input location, in input order, with the forecast
+            plus its cache status ('hit', 'stale', 'miss', 'fixture' or
+            'mock') and latency in ms
         """
+        keys = [self._cache_key(location) for location in locations]
+        unique_locations = {}
+        for key, location in zip(keys, locations):
+            unique_locations.setdefault(key, location)
+        if not unique_locations:
+            return []
+        
+        def fetch(location: Location) -> Dict:
+            started = time.perf_counter()
+            forecast, cache_status = self._get_forecast_with_status(location, days)
+            return {
+                'forecast': forecast,
+                'cache': cache_status,
+                'latency_ms': round((time.perf_counter() - started) * 1000, 1)
+            }
+        
+        workers = min(self.max_workers, len(unique_locations))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(zip(unique_locations, executor.map(fetch, unique_locations.values())))
+        
+        return [dict(results[key], location=location) for key, location in zip(keys, locations)]
+    
+    def get_stored_forecast(self, location: Location, days: int = 3) -> Dict:
+        """
+        Derive a forecast from stored raw points without re-fetching
+        
+        Points kept from every earlier fetch are summarized from local
+        midnight today, so any days value is served from one fetch.
+        Falls back to get_forecast when nothing is stored yet.
+        """
+        key = self._cache_key(location)
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        items = self.store.items(key, start=today.timestamp())
+        if not items:
+            return self.get_forecast(location, days)
+        
+        return self._process_forecast({'city': self.store.city(key), 'list': items}, days, location)
+    
+    def get_weather_at(self, location: Location, when: datetime) -> Optional[Dict]:
+        """
+        Look up the stored forecast point covering a time, e.g. an activity slot
+        
+        Args:
+            location: City name, "lat,lon" string or (lat, lon) pair
+            when: Local time of the activity
+        
+        Returns:
+            An hourly entry (time, temp, condition, icon, description), or
+            None if no stored point covers that time
+        """
+        item = self.store.point_at(self._cache_key(location), when.timestamp())
+        if not item:
+            return None
+        
+        condition = item['weather'][0]
+        return {
+            'time': datetime.fromtimestamp(item['dt']).strftime('%-I %p'),
+            'temp': round(item['main']['temp']),
+            'condition': condition['main'],
+            'icon': condition['icon'],
+            'description': condition['description']
+        }
+    
+    def _get_forecast_with_status(self, location: Location, days: int) -> Tuple[Dict, str]:
+        """Get a forecast along with where it came from: 'hit', 'stale', 'miss', 'fixture' or 'mock'"""
+        if self.offline:
+            fixture_data = self._get_fixture_forecast(location, days)
+            if fixture_data:
+                return fixture_data, 'fixture'
+            return self._get_mock_forecast(location, days), 'mock'
+        
         if not self.api_key:
             logger.warning("No API key found, returning mock data")
-            return self._get_mock_forecast(location, days)
+            return self._get_mock_forecast(location, days), 'mock'
         
         try:
             # Check cache first
             cached_data = self._get_cached_forecast(location)
             if cached_data:
-                return cached_data
-            
-            # Fetch from API
-            forecast_data = self._fetch_forecast(location)
-            processed_data = self._process_forecast(forecast_data, days)
+                return cached_data, 'hit'
             
-            # Cache the result
-            self._cache_forecast(location, processed_data)
+            # Serve recently expired data while a background refresh runs
+            if self.stale_while_revalidate:
+                stale_data = self.cache.get_stale(self._cache_key(location), self.max_staleness)
+                if stale_data:
+                    logger.info(f"Serving stale weather data for {location}, refreshing")
+                    self._refresh_in_background(location, days)
+                    return stale_data, 'stale'
             
-            return processed_data
+            # Fetch from API, sharing the request with concurrent callers
+            processed_data, shared = self._inflight.do(
+                self._cache_key(location),
+                lambda: self._refresh_forecast(location, days)
+            )
+            return processed_data, 'hit' if shared else 'miss'
             
         except Exception as e:
             logger.error(f"Error fetching weather data: {e}")
-            return self._get_mock_forecast(location, days)
+            
+            # Prefer recently expired data over a mock while the upstream is down
+            stale_data = self.cache.get_stale(self._cache_key(location), self.max_staleness)
+            if stale_data:
+                return stale_data, 'stale'
+            return self._get_mock_forecast(location, days), 'mock'
+    
+    def _refresh_forecast(self, location: Location, days: int) -> Dict:
+        """Fetch, process and cache a forecast from the API"""
+        # Another flight may have filled the cache while this one was queued
+        cached_data = self.cache.get(self._cache_key(location))
+        if cached_data:
+            return cached_data
+        
+        forecast_data = self._fetch_forecast(location)
+        processed_data = self._process_forecast(forecast_data, days, location)
+        if self.record_fixtures:
+            self._record_fixture(self._cache_key(location), forecast_data)
+        
+        # Cache the result and keep the raw points for later derivation
+        self._cache_forecast(location, processed_data)
+        self._learn_coordinates(location, processed_data)
+        self.store.merge(self._cache_key(location), forecast_data)
+        
+        return processed_data
+    
+    def _learn_coordinates(self, location: Location, data: Dict):
+        """Remember the coordinates the API returned for an unknown place name"""
+        coordinates = data['location']['coordinates']
+        if coordinates['lat'] is None or coordinates['lon'] is None:
+            return
+        if resolve_coordinates(location, self.known_locations):
+            return
+        
+        self.known_locations[normalize_location_name(location)] = (coordinates['lat'], coordinates['lon'])
+        self._cache_forecast(location, data)
+    
+    def _refresh_in_background(self, location: Location, days: int):
+        """Schedule a cache refresh unless one is already running for the location"""
+        key = self._cache_key(location)
+        if self._inflight.in_flight(key):
+            return
+        
+        def refresh():
+            try:
+                self._inflight.do(key, lambda: self._refresh_forecast(location, days))
+            except Exception as e:
+                logger.error(f"Error refreshing weather data for {location}: {e}")
+        
+        self._refresh_executor.submit(refresh)
     
-    def _fetch_forecast(self, location: str) -> Dict:
+    def _fetch_forecast(self, location: Location) -> Dict:
         """Fetch forecast data from OpenWeatherMap API"""
         params = {
-            'q': location,
             'appid': self.api_key,
             'units': 'imperial'
         }
         
-        response = requests.get(f"{self.base_url}/forecast", params=params)
-        response.raise_for_status()
+        # Fetch known places at their cell center so every stop in the cell shares it
+        coordinates = resolve_coordinates(location, self.known_locations)
+        if coordinates:
+            lat, lon = geohash_center(geohash_encode(*coordinates, self.geohash_precision))
+            params['lat'] = round(lat, 4)
+            params['lon'] = round(lon, 4)
+        else:
+            params['q'] = location
+        
+        if not self.stream_parse:
+            response = self.client.get("/forecast", params=params)
+            response.raise_for_status()
+            return response.json()
         
-        return response.json()
+        # Parse the body as it arrives, keeping only the fields we summarize
+        with self.client.get("/forecast", params=params, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            return parse_forecast_stream(response.raw)
     
-    def _process_forecast(self, raw_data: Dict, days: int) -> Dict:
+    def _process_forecast(self, raw_data: Dict, days: int, location: Location = '') -> Dict:
         """Process raw API data into structured format"""
         city_info = raw_data.get('city', {})
+        items = raw_data.get('list', [])
+        
+        if np is not None and items:
+            forecasts = self._summarize_days_vectorized(items, days)
+        else:
+            forecasts = self._summarize_days(items, days)
+        
+        return {
+            'location': {
+                'name': city_info.get('name', location),
+                'country': city_info.get('country', ''),
+                'coordinates': {
+                    'lat': city_info.get('coord', {}).get('lat'),
+                    'lon': city_info.get('coord', {}).get('lon')
+                }
+            },
+            'current': {
+                'temperature': forecasts[0]['high'] if forecasts else 70,
+                'condition': forecasts[0]['condition'] if forecasts else 'Clear',
+                'description': forecasts[0]['description'] if forecasts else 'clear sky'
+            },
+            'forecast': forecasts,
+            'additional_info': {
+                'uv_index': self._estimate_uv_index(forecasts[0]['condition'] if forecasts else 'Clear'),
+                'air_quality': 'Good',  # Would need separate API for real data
+                'sunrise': city_info.get('sunrise', '6:30 AM'),
+                'sunset': city_info.get('sunset', '7:00 PM')
+            },
+            'last_updated': datetime.now().isoformat()
+        }
+    
+    def _summarize_days(self, items: List[Dict], days: int) -> List[Dict]:
+        """Group 3-hourly forecast items into daily summaries"""
         forecasts = []
         
         # Group forecasts by day
         daily_data = {}
         
-        for item in raw_data.get('list', []):
+        for item in items:
             dt = datetime.fromtimestamp(item['dt'])
             day_key = dt.strftime('%Y-%m-%d')
             
@@ -132,29 +490,97 @@ class WeatherAPI:
             
             forecasts.append(forecast)
         
-        return {
-            'location': {
-                'name': city_info.get('name', location),
-                'country': city_info.get('country', ''),
-                'coordinates': {
-                    'lat': city_info.get('coord', {}).get('lat'),
-                    'lon': city_info.get('coord', {}).get('lon')
-                }
-            },
-            'current': {
-                'temperature': forecasts[0]['high'] if forecasts else 70,
-                'condition': forecasts[0]['condition'] if forecasts else 'Clear',
-                'description': forecasts[0]['description'] if forecasts else 'clear sky'
-            },
-            'forecast': forecasts,
-            'additional_info': {
-                'uv_index': self._estimate_uv_index(forecasts[0]['condition'] if forecasts else 'Clear'),
-                'air_quality': 'Good',  # Would need separate API for real data
-                'sunrise': city_info.get('sunrise', '6:30 AM'),
-                'sunset': city_info.get('sunset', '7:00 PM')
-            },
-            'last_updated': datetime.now().isoformat()
-        }
+        return forecasts
+    
+    def _summarize_days_vectorized(self, items: List[Dict], days: int) -> List[Dict]:
+        """
+        Group 3-hourly forecast items into daily summaries with NumPy
+        
+        Produces the same output as _summarize_days: days in order of first
+        appearance, items in input order within a day, and condition ties
+        broken by first appearance within the day.
+        """
+        count = len(items)
+        timestamps = np.fromiter((item['dt'] for item in items), dtype=np.int64, count=count)
+        temps = np.fromiter((item['main']['temp'] for item in items), dtype=np.float64, count=count)
+        humidity = np.fromiter((item['main']['humidity'] for item in items), dtype=np.float64, count=count)
+        wind_speed = np.fromiter((item['wind']['speed'] for item in items), dtype=np.float64, count=count)
+        conditions = [item['weather'][0] for item in items]
+        
+        # Local midnights spanning the forecast, so DST days bucket correctly
+        first_day = datetime.fromtimestamp(int(timestamps.min())).date()
+        last_day = datetime.fromtimestamp(int(timestamps.max())).date()
+        day_starts = [
+            datetime.combine(first_day + timedelta(days=i), datetime.min.time())
+            for i in range((last_day - first_day).days + 2)
+        ]
+        boundaries = np.array([day.timestamp() for day in day_starts])
+        day_index = np.searchsorted(boundaries, timestamps, side='right') - 1
+        
+        # Calendar days present, and their rank in order of first appearance
+        present_days, first_seen, group = np.unique(day_index, return_index=True, return_inverse=True)
+        kept_groups = np.argsort(first_seen, kind='stable')[:days]
+        
+        # Contiguous per-day segments, preserving input order within each day
+        order = np.argsort(group, kind='stable')
+        segment_starts = np.searchsorted(group[order], np.arange(len(present_days)))
+        segment_sizes = np.bincount(group, minlength=len(present_days))
+        
+        highs = np.maximum.reduceat(temps[order], segment_starts)
+        lows = np.minimum.reduceat(temps[order], segment_starts)
+        mean_humidity = np.add.reduceat(humidity[order], segment_starts) / segment_sizes
+        mean_wind = np.add.reduceat(wind_speed[order], segment_starts) / segment_sizes
+        
+        # Modal condition: highest count, ties to the earliest item in the day
+        codes_by_name = {}
+        codes = np.fromiter(
+            (codes_by_name.setdefault(cond['main'], len(codes_by_name)) for cond in conditions),
+            dtype=np.int64, count=count
+        )
+        condition_names = list(codes_by_name)
+        condition_counts = np.zeros((len(present_days), len(condition_names)), dtype=np.int64)
+        np.add.at(condition_counts, (group, codes), 1)
+        first_position = np.full(condition_counts.shape, count, dtype=np.int64)
+        np.minimum.at(first_position, (group, codes), np.arange(count))
+        primary = np.argmax(condition_counts * (count + 1) - first_position, axis=1)
+        
+        # Hours since local midnight; DST transition days use the clock
+        day_lengths = np.diff(boundaries)
+        hours = (timestamps - boundaries[day_index]).astype(np.int64) // 3600
+        for i in np.flatnonzero(day_lengths[day_index] != 86400):
+            hours[i] = datetime.fromtimestamp(int(timestamps[i])).hour
+        
+        forecasts = []
+        for g in kept_groups:
+            segment = order[segment_starts[g]:segment_starts[g] + segment_sizes[g]]
+            first = conditions[segment[0]]
+            day = day_starts[present_days[g]]
+            
+            hourly = []
+            for i in segment[:8]:
+                hour = int(hours[i])
+                hourly.append({
+                    'time': f"{hour % 12 or 12} {'AM' if hour < 12 else 'PM'}",
+                    'temp': round(items[i]['main']['temp']),
+                    'condition': conditions[i]['main'],
+                    'icon': conditions[i]['icon'],
+                    'description': conditions[i]['description']
+                })
+            
+            forecasts.append({
+                'date': day.strftime('%a, %b %d'),
+                'day_name': day.strftime('%A'),
+                'high': round(float(highs[g])),
+                'low': round(float(lows[g])),
+                'condition': condition_names[primary[g]],
+                'icon': first['icon'],
+                'description': first['description'],
+                'humidity': round(float(mean_humidity[g])),
+                'wind_speed': round(float(mean_wind[g])),
+                'hourly': hourly
+            })
+        
+        return forecasts
     
     def _get_primary_condition(self, conditions: List[Dict]) -> str:
         """Determine the primary weather condition from a list"""
@@ -177,92 +603,49 @@ class WeatherAPI:
         }
         return uv_map.get(condition, 'Moderate (5-7)')
     
-    def _get_cached_forecast(self, location: str) -> Optional[Dict]:
+    def _cache_key(self, location: Location) -> str:
+        """Cache key for a location: its geohash cell when coordinates are known"""
+        coordinates = resolve_coordinates(location, self.known_locations)
+        if coordinates:
+            return f"geo_{geohash_encode(*coordinates, self.geohash_precision)}"
+        return normalize_location_name(location).replace(' ', '_')
+    
+    def _get_cached_forecast(self, location: Location) -> Optional[Dict]:
         """Get forecast from cache if available and fresh"""
-        cache_file = os.path.join(self.cache_dir, f"{location.lower().replace(' ', '_')}.json")
-        
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r') as f:
-                cached_data = json.load(f)
-            
-            # Check if cache is fresh (less than 1 hour old)
-            last_updated = datetime.fromisoformat(cached_data['last_updated'])
-            if datetime.now() - last_updated < timedelta(hours=1):
-                logger.info(f"Using cached weather data for {location}")
-                return cached_data
-        
-        return None
+        cached_data = self.cache.get(self._cache_key(location))
+        if cached_data:
+            logger.info(f"Using cached weather data for {location}")
+        return cached_data
     
-    def _cache_forecast(self, location: str, data: Dict):
+    def _cache_forecast(self, location: Location, data: Dict):
         """Cache forecast data"""
-        cache_file = os.path.join(self.cache_dir, f"{location.lower().replace(' ', '_')}.json")
-        
-        with open(cache_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.cache.set(self._cache_key(location), data)
     
-    def _get_mock_forecast(self, location: str, days: int) -> Dict:
-        """Return mock forecast data for development/testing"""
-        base_date = datetime.now()
-        forecasts = []
+    def _get_fixture_forecast(self, location: Location, days: int) -> Optional[Dict]:
+        """Replay a recorded API response for a location, processed once per days value"""
+        key = self._cache_key(location)
+        if key not in self._fixtures:
+            return None
         
-        # Mock weather patterns
-        patterns = [
-            {'condition': 'Clear', 'icon': '01d', 'high': 75, 'low': 60},
-            {'condition': 'Partly Cloudy', 'icon': '02d', 'high': 72, 'low': 58},
-            {'condition': 'Cloudy', 'icon': '03d', 'high': 68, 'low': 55},
-            {'condition': 'Light Rain', 'icon': '10d', 'high': 65, 'low': 52}
-        ]
-        
-        for i in range(days):
-            current_date = base_date + timedelta(days=i)
-            pattern = patterns[i % len(patterns)]
-            
-            hourly_data = []
-            for hour in [9, 12, 15, 18]:
-                temp_variation = (hour - 12) * 2  # Temperature peaks at noon
-                hourly_data.append({
-                    'time': f"{hour % 12 or 12} {'PM' if hour >= 12 else 'AM'}",
-                    'temp': pattern['high'] - 5 + temp_variation,
-                    'condition': pattern['condition'],
-                    'icon': pattern['icon'],
-                    'description': pattern['condition'].lower()
-                })
-            
-            forecast = {
-                'date': current_date.strftime('%a, %b %d'),
-                'day_name': current_date.strftime('%A'),
-                'high': pattern['high'],
-                'low': pattern['low'],
-                'condition': pattern['condition'],
-                'icon': pattern['icon'],
-                'description': pattern['condition'].lower(),
-                'humidity': 65,
-                'wind_speed': 10,
-                'hourly': hourly_data
-            }
-            
-            forecasts.append(forecast)
+        with self._fixture_lock:
+            forecast = self._fixture_forecasts.get((key, days))
+            if forecast is not None:
+                self._fixture_forecasts.move_to_end((key, days))
         
-        return {
-            'location': {
-                'name': location,
-                'country': 'US',
-                'coordinates': {'lat': 34.4208, 'lon': -119.6982}
-            },
-            'current': {
-                'temperature': forecasts[0]['high'] if forecasts else 70,
-                'condition': forecasts[0]['condition'] if forecasts else 'Clear',
-                'description': forecasts[0]['description'] if forecasts else 'clear sky'
-            },
-            'forecast': forecasts,
-            'additional_info': {
-                'uv_index': 'Moderate (5-7)',
-                'air_quality': 'Good',
-                'sunrise': '6:30 AM',
-                'sunset': '7:00 PM'
-            },
-            'last_updated': datetime.now().isoformat()
-        }
+        if forecast is None:
+            forecast = self._process_forecast(self._fixtures[key], days, location)
+            with self._fixture_lock:
+                self._fixture_forecasts[(key, days)] = forecast
+                while len(self._fixture_forecasts) > MOCK_MEMO_SIZE:
+                    self._fixture_forecasts.popitem(last=False)
+        # A copy, so a caller editing the result cannot change later replays
+        return copy.deepcopy(forecast)
+    
+    def _get_mock_forecast(self, location: Location, days: int) -> Dict:
+        """Return mock forecast data for development/testing, built once per location, days and date"""
+        name = location if isinstance(location, str) else f"{location[0]}, {location[1]}"
+        # A copy, so a caller editing the result cannot change later mocks
+        return copy.deepcopy(_build_mock_forecast(name, days, datetime.now().date()))
     
     def get_packing_suggestions(self, forecast_data: Dict) -> List[str]:
         """Generate packing suggestions based on weather forecast"""
@@ -315,4 +698,16 @@ if __name__ == "__main__":
     suggestions = weather.get_packing_suggestions(forecast)
     print("\nPacking Suggestions:")
     for suggestion in suggestions:
-        print(f"- {suggestion}")
\ No newline at end of file
+        print(f"- {suggestion}")
+    
+    # Multi-stop trips fetch every stop in one batch
+    print("\nTrip Stops:")
+    stops = ["Santa Barbara, CA", "Stearns Wharf", (34.4155, -119.6825), "Los Angeles, CA"]
+    for result in weather.get_forecasts(stops):
+        print(f"{result['location']}: {result['cache']} in {result['latency_ms']}ms")
+    print(f"Cache: {weather.cache_stats}")
+    print(f"Upstream: {weather.upstream_stats}")
+    
+    # Activity slots read from the stored time series
+    tomorrow_3pm = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time()) + timedelta(hours=15)
+    print(f"Tomorrow 3 PM: {weather.get_weather_at('Stearns Wharf', tomorrow_3pm)}")
\ No newline at end of file
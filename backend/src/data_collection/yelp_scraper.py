@@ -7,53 +7,294 @@ Extracts key information from Yelp reviews to generate:
 - Pro tips from reviewers  
 - Rating summaries
 - Review quotes that paint vivid pictures
+
+Run from the repository root: python -m backend.src.data_collection.yelp_scraper
 """
 
-import requests
+import hashlib
 import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional
 
+from backend.src.cache import ResponseCache
+from backend.src.data_collection.http_client import UpstreamClient
+from backend.src.data_collection.review_mining import (
+    IncrementalMiner, ReviewAnalyzer, count_menu_mentions, detect_pro_tips, get_menu_matcher,
+    mine_businesses, rank_must_try, score_vivid_quotes
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a cached response is revalidated; reviews change slowest
+CACHE_TTLS = {
+    "search": 24 * 3600,
+    "reviews": 7 * 24 * 3600
+}
+
 class YelpReviewCurator:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_workers: int = 8,
+                 client: Optional[UpstreamClient] = None,
+                 cache_ttls: Optional[Dict[str, float]] = None,
+                 cache_max_entries: int = 5000,
+                 cache_max_bytes: int = 100 * 1024 * 1024,
+                 cache_only: bool = False,
+                 mining_workers: Optional[int] = None):
         self.api_key = api_key
         self.base_url = "https://api.yelp.com/v3"
         self.headers = {"Authorization": f"Bearer {api_key}"}
+        self.max_workers = max_workers
+        self.cache_dir = "backend/data/yelp_cache"
+        self.cache_only = cache_only
+        ttls = dict(CACHE_TTLS, **(cache_ttls or {}))
+        self.caches = {
+            endpoint: ResponseCache(
+                f"{self.cache_dir}/{endpoint}",
+                ttl=ttl,
+                max_disk_entries=cache_max_entries // len(ttls),
+                max_disk_bytes=cache_max_bytes // len(ttls)
+            )
+            for endpoint, ttl in ttls.items()
+        }
+        self.mining_workers = mining_workers
+        self.analyzer = ReviewAnalyzer(workers=mining_workers)
+        self.review_state_dir = "backend/data/review_state"
+        self.incremental_miner = IncrementalMiner(self.review_state_dir)
+        # Yelp Fusion throttles bursts per second as well as the daily quota
+        self.client = client or UpstreamClient(
+            self.base_url,
+            rate_per_minute=300,
+            burst=5,
+            pool_maxsize=max_workers,
+            headers=self.headers
+        )
     
-    def get_business_reviews(self, business_id: str) -> Dict:
-        """Get reviews for a specific business"""
-        url = f"{self.base_url}/businesses/{business_id}/reviews"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
+    @property
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit, miss and eviction counters per cached endpoint"""
+        return {endpoint: dict(cache.stats) for endpoint, cache in self.caches.items()}
+    
+    def get_business_reviews(self, business_id: str, revalidate: bool = False) -> Dict:
+        """Get reviews for a specific business, asking Yelp for changes when revalidate is set"""
+        return self._get_json("reviews", f"/businesses/{business_id}/reviews", revalidate=revalidate)
     
     def search_businesses(self, location: str, term: str, limit: int = 10) -> Dict:
         """Search for businesses in a location"""
-        url = f"{self.base_url}/businesses/search"
         params = {
             "location": location,
             "term": term,
             "limit": limit,
             "sort_by": "rating"
         }
-        response = requests.get(url, headers=self.headers, params=params)
-        return response.json()
+        return self._get_json("search", "/businesses/search", params)
+    
+    def fetch_reviews_for(self, business_ids: List[str], revalidate: bool = False) -> Dict[str, Dict]:
+        """
+        Fetch reviews for several businesses concurrently
+        
+        Args:
+            business_ids: Yelp business ids; duplicates are fetched once
+            revalidate: Check fresh cache entries with Yelp instead of serving them
+        
+        Returns:
+            Review payloads keyed by business id, in input order. A failed
+            fetch maps to a Yelp-style {"error": {...}} payload.
+        """
+        unique_ids = list(dict.fromkeys(business_ids))
+        if not unique_ids:
+            return {}
+        
+        workers = min(self.max_workers, len(unique_ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {business_id: executor.submit(self.get_business_reviews, business_id, revalidate)
+                       for business_id in unique_ids}
+            return {business_id: self._result_or_error(future, business_id)
+                    for business_id, future in futures.items()}
+    
+    def search_with_reviews(self, location: str, terms: List[str], limit: int = 10) -> List[Dict]:
+        """
+        Search several terms and fetch reviews for every business found
+        
+        Searches run concurrently, and each business's review fetch starts as
+        soon as the search that found it returns, so total latency is close
+        to the slowest search plus the slowest review fetch.
+        
+        Returns:
+            One {"business": ..., "reviews": ...} entry per unique business,
+            ordered by term and then search rank
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            search_futures = {executor.submit(self.search_businesses, location, term, limit): term
+                              for term in terms}
+            results_by_term = {}
+            review_futures = {}
+            
+            for future in as_completed(search_futures):
+                term = search_futures[future]
+                businesses = self._result_or_error(future, term).get("businesses", [])
+                results_by_term[term] = businesses
+                for business in businesses:
+                    if business["id"] not in review_futures:
+                        review_futures[business["id"]] = executor.submit(
+                            self.get_business_reviews, business["id"]
+                        )
+            
+            results = []
+            seen = set()
+            for term in terms:
+                for business in results_by_term[term]:
+                    if business["id"] in seen:
+                        continue
+                    seen.add(business["id"])
+                    results.append({
+                        "business": business,
+                        "reviews": self._result_or_error(review_futures[business["id"]], business["id"])
+                    })
+            return results
+    
+    def refresh_business(self, business_id: str, menu_items: Optional[List[str]] = None) -> Dict:
+        """
+        Ingest only reviews newer than the business watermark and re-rank
+        
+        The cached reviews are always revalidated, so a refresh within the
+        reviews TTL still sees what was posted since the last one.
+        
+        Returns:
+            must_try_items, pro_tips, vivid_quotes and the number of new reviews
+        """
+        reviews = self.get_business_reviews(business_id, revalidate=True).get("reviews", [])
+        return self.incremental_miner.ingest(business_id, reviews, menu_items)
+    
+    def refresh_businesses(self, business_ids: List[str],
+                           menu_items_by_business: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict]:
+        """Nightly refresh: fetch reviews concurrently, then ingest each business incrementally"""
+        menus = menu_items_by_business or {}
+        reviews_by_business = self.fetch_reviews_for(business_ids, revalidate=True)
+        return {
+            business_id: self.incremental_miner.ingest(
+                business_id, payload.get("reviews", []), menus.get(business_id)
+            )
+            for business_id, payload in reviews_by_business.items()
+        }
+    
+    def _get_json(self, endpoint: str, path: str, params: Optional[Dict] = None,
+                  revalidate: bool = False) -> Dict:
+        """
+        GET a Yelp API path through the response cache
+        
+        Fresh entries are served without a request unless revalidate is set.
+        Expired (or revalidated) entries are sent with If-None-Match/
+        If-Modified-Since when Yelp sent validators, and served as-is in
+        cache-only mode.
+        """
+        cache = self.caches[endpoint]
+        key = self._cache_key(path, params)
+        
+        if not revalidate:
+            cached = cache.get(key)
+            if cached:
+                return cached["body"]
+        
+        stale = cache.get_stale(key, float("inf"))
+        if self.cache_only:
+            if stale:
+                return stale["body"]
+            return {"error": {"code": "NOT_CACHED", "description": f"No cached response for {path}"}}
+        
+        headers = {}
+        if stale and stale.get("etag"):
+            headers["If-None-Match"] = stale["etag"]
+        if stale and stale.get("last_modified"):
+            headers["If-Modified-Since"] = stale["last_modified"]
+        
+        response = self.client.get(path, params=params, headers=headers)
+        if response.status_code == 304 and stale:
+            cache.set(key, stale)
+            return stale["body"]
+        
+        body = response.json()
+        if response.status_code == 200:
+            cache.set(key, {
+                "body": body,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified")
+            })
+        return body
+    
+    def _cache_key(self, path: str, params: Optional[Dict]) -> str:
+        """Content address for a request: hash of the path and normalized params"""
+        normalized = {
+            name: value.strip().lower() if isinstance(value, str) else value
+            for name, value in (params or {}).items()
+            if value is not None
+        }
+        request = json.dumps([path, normalized], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(request.encode("utf-8")).hexdigest()
+    
+    def _result_or_error(self, future, label: str) -> Dict:
+        """Unwrap a fetch future, turning an exception into a Yelp-style error payload"""
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Error fetching Yelp data for {label}: {e}")
+            return {"error": {"code": "FETCH_FAILED", "description": str(e)}}
+    
+    def extract_must_try_items(self, reviews: List[Dict], menu_items: Optional[List[str]] = None,
+                               limit: int = 4) -> List[str]:
+        """
+        Extract frequently mentioned menu items from reviews
+        
+        Review text is scanned once against a token trie of menu item names,
+        so cost grows with total review length rather than items x reviews.
+        
+        Args:
+            reviews: Yelp review dicts with a "text" field
+            menu_items: Business-specific dish names to match besides the defaults
+            limit: Maximum number of items to return
+        
+        Returns:
+            Items mentioned in at least two reviews and praised in at least
+            one, most praised first, e.g. "🦞 Lobster Mac & Cheese - 'Legendary!'"
+        """
+        stats = count_menu_mentions(self.analyzer.analyze(reviews), get_menu_matcher(menu_items))
+        return rank_must_try(stats, limit)
     
-    def extract_must_try_items(self, reviews: List[Dict]) -> List[str]:
-        """Extract frequently mentioned menu items from reviews"""
-        # Implementation would analyze review text for food mentions
-        # Return items mentioned multiple times with positive context
-        pass
+    def extract_pro_tips(self, reviews: List[Dict], limit: int = 3) -> List[str]:
+        """
+        Extract actionable advice from reviews
+        
+        Keeps sentences with a tip cue ("tip", "advice", "make sure", "ask
+        for", ...) that also name a specific time, day, number or spot, so
+        obvious advice is filtered out. Near-duplicate tips are dropped.
+        """
+        return detect_pro_tips(self.analyzer.analyze(reviews), limit)
     
-    def extract_pro_tips(self, reviews: List[Dict]) -> List[str]:
-        """Extract actionable advice from reviews"""
-        # Look for sentences with "tip", "advice", "recommend", "make sure"
-        # Filter for non-obvious insights
-        pass
+    def find_vivid_quotes(self, reviews: List[Dict], limit: int = 3) -> List[Dict]:
+        """
+        Find review quotes that paint pictures rather than generic praise
+        
+        Sentences score higher for sensory and concrete detail and lower for
+        generic words like "great food, good service"; at most one quote is
+        taken per review.
+        
+        Returns:
+            [{"text": ..., "source": "Yelp Reviewer", "rating": ..., "score": ...}]
+        """
+        return score_vivid_quotes(self.analyzer.analyze(reviews), limit)
     
-    def find_vivid_quotes(self, reviews: List[Dict]) -> List[Dict]:
-        """Find review quotes that paint pictures rather than generic praise"""
-        # Avoid generic "great food, good service"
-        # Prefer specific descriptions of experiences
-        pass
+    def mine_reviews_for(self, reviews_by_business: Dict[str, List[Dict]],
+                         menu_items_by_business: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict]:
+        """
+        Run must-try, pro tip and vivid quote mining for many businesses at once
+        
+        Businesses are spread across a process pool; each review is
+        tokenized once and shared by all three miners.
+        
+        Returns:
+            {"must_try_items": [...], "pro_tips": [...], "vivid_quotes": [...]}
+            per business id
+        """
+        return mine_businesses(reviews_by_business, menu_items_by_business, self.mining_workers)
     
     def generate_rating_summary(self, business_data: Dict) -> Dict:
         """Generate rating summary with context"""
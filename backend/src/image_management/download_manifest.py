@@ -0,0 +1,230 @@
+"""
+Download Manifest Module - Persistent per-folder record of downloaded images
+Tracks source URL, HTTP validators, size and content hashes for every image
+in a gallery folder so reruns can revalidate instead of re-downloading,
+resume partial transfers and reject duplicates before they take a slot
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+import logging
+
+from backend.src.cache import atomic_write
+
+try:
+    from PIL import Image
+except ImportError:  # Perceptual dedupe needs Pillow; byte-level dedupe still applies
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Query parameters CDNs use to pick a rendition of the same source image
+CDN_SIZE_PARAMS = {
+    'w', 'h', 'width', 'height', 'size', 'resize', 'fit', 'crop', 'q', 'quality',
+    'fm', 'format', 'auto', 'dpr', 'scale', 'strip', 'ssl', 'v'
+}
+# photo-1024x768.jpg (WordPress), photo_800x.jpg (Shopify), photo@2x.png
+_SIZE_SUFFIX = re.compile(r'(?:-\d+x\d+|_(?:\d+x\d*|x\d+)|@\d+x)(?=\.\w+$)', re.IGNORECASE)
+# /w_800,h_600,c_fill/ transformation segments (Cloudinary and friends)
+_TRANSFORM_SEGMENT = re.compile(r'/(?:(?:w|h|c|q|f|g|ar|dpr)_[^/,]+,?)+(?=/)')
+_IMAGE_FILE = re.compile(r'^image(\d+)\.\w+$')
+
+
+def normalize_image_url(url: str) -> str:
+    """Collapse CDN size variants of an image URL onto one dedupe key"""
+    parsed = urlparse(url)
+    path = _SIZE_SUFFIX.sub('', _TRANSFORM_SEGMENT.sub('', parsed.path))
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query) if k.lower() not in CDN_SIZE_PARAMS)
+    key = f"{parsed.netloc.lower()}{path}"
+    return f"{key}?{urlencode(query)}" if query else key
+
+
+def file_sha256(path: str) -> str:
+    """Hex SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def perceptual_hash(path: str) -> Optional[int]:
+    """64-bit difference hash of an image, or None without Pillow or for unreadable files"""
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            img.draft('L', (64, 64))  # Let JPEG decode at reduced scale
+            pixels = list(img.convert('L').resize((9, 8)).getdata())
+    except Exception:
+        return None
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count('1')
+
+
+class DownloadManifest:
+    """Manifest of the images in one gallery folder, persisted as manifest.json"""
+
+    def __init__(self, folder: str, dhash_threshold: int = 5):
+        """
+        Args:
+            folder: Gallery folder holding imageN files and the manifest
+            dhash_threshold: Max differing dHash bits for two images to count as duplicates
+        """
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        self.dhash_threshold = dhash_threshold
+        self.items = {}     # filename -> entry
+        self.partials = {}  # url key -> validators of an interrupted download
+        self.rejected = {}  # url key -> filename it duplicated
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read the manifest from disk and index any image files it does not know"""
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'rb') as f:
+                    data = json.load(f)
+                self.items = data.get('items', {})
+                self.partials = data.get('partials', {})
+                self.rejected = data.get('rejected', {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+
+        # Drop entries whose files were deleted by hand
+        self.items = {name: entry for name, entry in self.items.items()
+                      if os.path.exists(os.path.join(self.folder, name))}
+
+        # Files placed by earlier tools or by hand still take part in dedupe
+        for name in sorted(os.listdir(self.folder)):
+            if _IMAGE_FILE.match(name) and name not in self.items:
+                path = os.path.join(self.folder, name)
+                self.items[name] = {
+                    'url': None,
+                    'size': os.path.getsize(path),
+                    'sha256': file_sha256(path),
+                    'dhash': perceptual_hash(path)
+                }
+
+    def save(self):
+        """Atomically persist the manifest"""
+        with self._lock:
+            payload = json.dumps({
+                'version': MANIFEST_VERSION,
+                'items': self.items,
+                'partials': self.partials,
+                'rejected': self.rejected
+            }, indent=2, sort_keys=True).encode('utf-8')
+        atomic_write(self.path, payload)
+
+    def downloaded_count(self) -> int:
+        """Number of images this manifest fetched from a URL"""
+        return sum(1 for entry in self.items.values() if entry.get('url'))
+
+    def known_keys(self) -> set:
+        """URL keys that already have a file or were rejected as duplicates"""
+        keys = {entry['key'] for entry in self.items.values() if entry.get('key')}
+        return keys | set(self.rejected)
+
+    def downloaded_items(self) -> Dict[str, Dict]:
+        """Entries that came from a URL and can be revalidated"""
+        return {name: entry for name, entry in self.items.items() if entry.get('url')}
+
+    def partial_path(self, key: str) -> str:
+        """Stable temp path for a URL key, so an interrupted download can resume"""
+        return os.path.join(self.folder, f".part-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}")
+
+    def conditional_headers(self, entry: Dict) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for revalidating an entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def resume_validator(self, key: str) -> Optional[str]:
+        """Strong validator for an If-Range resume of a partial download"""
+        partial = self.partials.get(key, {})
+        etag = partial.get('etag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return partial.get('last_modified')
+
+    def find_duplicate(self, sha256: str, dhash: Optional[int],
+                       exclude: Optional[str] = None) -> Optional[str]:
+        """Filename of an existing image that is byte-identical or perceptually the same"""
+        for name, entry in self.items.items():
+            if name == exclude:
+                continue
+            if entry.get('sha256') == sha256:
+                return name
+            if dhash is not None and entry.get('dhash') is not None and \
+               hamming_distance(dhash, entry['dhash']) <= self.dhash_threshold:
+                return name
+        return None
+
+    def next_filename(self, start_num: int, extension: str = '.jpg') -> str:
+        """
+        First imageN name at or after start_num that is free or holds a placeholder
+
+        Files without a source URL from start_num on are stand-ins (e.g.
+        placeholders made while offline) for images this manifest was meant
+        to download, so a real download takes their slot instead of landing
+        after them.
+        """
+        taken = {int(m.group(1)) for name, entry in self.items.items()
+                 for m in [_IMAGE_FILE.match(name)] if m and entry.get('url')}
+        untracked = [name for name in os.listdir(self.folder) if name not in self.items]
+        taken |= {int(m.group(1)) for m in map(_IMAGE_FILE.match, untracked) if m}
+        num = start_num
+        while num in taken:
+            num += 1
+        return f"image{num}{extension}"
+
+    def record(self, filename: str, url: str, key: str, etag: Optional[str],
+               last_modified: Optional[str], size: int, sha256: str, dhash: Optional[int]):
+        """Record a downloaded image and forget any partial state for its URL"""
+        with self._lock:
+            self.items[filename] = {
+                'url': url,
+                'key': key,
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': size,
+                'sha256': sha256,
+                'dhash': dhash
+            }
+            self.partials.pop(key, None)
+
+    def remove(self, filename: str):
+        """Forget an image whose file was deleted"""
+        with self._lock:
+            self.items.pop(filename, None)
+
+    def record_partial(self, key: str, url: str, etag: Optional[str], last_modified: Optional[str]):
+        with self._lock:
+            self.partials[key] = {'url': url, 'etag': etag, 'last_modified': last_modified}
+
+    def reject(self, key: str, duplicate_of: str):
+        """Remember a URL whose content duplicated an existing image"""
+        with self._lock:
+            self.rejected[key] = duplicate_of
+            self.partials.pop(key, None)
@@ -0,0 +1,159 @@
+"""
+HTML Images Module - Single-pass streaming extraction of image candidates
+Collects src, data-src, srcset and <picture> <source> candidates from HTML
+fed in chunks, keeping declared widths so the best rendition of each image
+can be chosen before anything is downloaded
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+
+# Attributes lazy-loading libraries use in place of src/srcset
+SRC_ATTRS = ('src', 'data-src', 'data-lazy-src', 'data-original')
+SRCSET_ATTRS = ('srcset', 'data-srcset', 'data-lazy-srcset')
+
+_BACKGROUND_URL = re.compile(r'background(?:-image)?\s*:[^;]*?url\(\s*["\']?([^"\')\s]+)["\']?\s*\)', re.IGNORECASE)
+
+
+class ImageCandidate(NamedTuple):
+    """Best rendition found for one image on a page"""
+    url: str
+    width: Optional[int]  # Declared or srcset width in CSS pixels, if known
+
+
+def parse_srcset(value: str) -> List[Tuple[str, Optional[int], float]]:
+    """
+    Split a srcset attribute into (url, width, density) entries
+
+    Follows the HTML candidate-string rules closely enough for URLs that
+    contain commas (CDN transform paths), which a plain split would break.
+    """
+    entries = []
+    pos = 0
+    length = len(value)
+    while pos < length:
+        while pos < length and (value[pos].isspace() or value[pos] == ','):
+            pos += 1
+        start = pos
+        while pos < length and not value[pos].isspace():
+            pos += 1
+        url = value[start:pos]
+        descriptors = ''
+        if url.endswith(','):
+            url = url.rstrip(',')
+        else:
+            end = value.find(',', pos)
+            end = length if end == -1 else end
+            descriptors = value[pos:end]
+            pos = end + 1
+        if not url:
+            continue
+
+        width, density = None, 1.0
+        for descriptor in descriptors.split():
+            try:
+                if descriptor.endswith('w'):
+                    width = int(descriptor[:-1])
+                elif descriptor.endswith('x'):
+                    density = float(descriptor[:-1])
+            except ValueError:
+                pass
+        entries.append((url, width, density))
+    return entries
+
+
+def _declared_width(attrs: Dict[str, str]) -> Optional[int]:
+    """Width attribute of an <img>, ignoring percentages and junk"""
+    value = (attrs.get('width') or '').strip().rstrip('px')
+    return int(value) if value.isdigit() else None
+
+
+class ImageCandidateParser(HTMLParser):
+    """Incremental HTML tokenizer that groups image renditions per image"""
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.images = []        # ImageCandidate per image, in page order
+        self._picture = None    # Renditions of the open <picture>, if any
+        self._in_style = False
+
+    def _resolve(self, url: str) -> Optional[str]:
+        """Absolute URL for a candidate, skipping inline data URIs"""
+        url = url.strip()
+        if not url or url.startswith('data:'):
+            return None
+        return urljoin(self.base_url, url)
+
+    def _renditions(self, attrs: Dict[str, str], width: Optional[int]) -> List[Tuple[str, Optional[int], float]]:
+        """All renditions an element offers as (url, width, density)"""
+        renditions = []
+        for name in SRCSET_ATTRS:
+            if attrs.get(name):
+                for url, w, density in parse_srcset(attrs[name]):
+                    if w is None and width:
+                        w = int(width * density)
+                    renditions.append((url, w, density))
+        for name in SRC_ATTRS:
+            if attrs.get(name):
+                renditions.append((attrs[name], width, 1.0))
+        return renditions
+
+    def _add_image(self, renditions: List[Tuple[str, Optional[int], float]]):
+        """Keep the widest rendition, falling back to the highest density"""
+        best = None
+        for url, width, density in renditions:
+            resolved = self._resolve(url)
+            if resolved is None:
+                continue
+            score = (width or 0, density)
+            if best is None or score > best[0]:
+                best = (score, ImageCandidate(resolved, width))
+        if best:
+            self.images.append(best[1])
+
+    def _add_backgrounds(self, text: str):
+        """Collect url() images from inline styles and <style> blocks"""
+        for url in _BACKGROUND_URL.findall(text):
+            resolved = self._resolve(url)
+            if resolved:
+                self.images.append(ImageCandidate(resolved, None))
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value for name, value in attrs if value is not None}
+
+        if tag == 'picture':
+            self._picture = []
+        elif tag == 'source' and self._picture is not None:
+            self._picture.extend(self._renditions(attrs, None))
+        elif tag == 'img':
+            renditions = self._renditions(attrs, _declared_width(attrs))
+            if self._picture is not None:
+                self._picture.extend(renditions)
+            else:
+                self._add_image(renditions)
+        elif tag == 'style':
+            self._in_style = True
+
+        if attrs.get('style'):
+            self._add_backgrounds(attrs['style'])
+
+    def handle_endtag(self, tag):
+        if tag == 'picture' and self._picture is not None:
+            self._add_image(self._picture)
+            self._picture = None
+        elif tag == 'style':
+            self._in_style = False
+
+    def handle_data(self, data):
+        if self._in_style:
+            self._add_backgrounds(data)
+
+    def close(self):
+        super().close()
+        # An unclosed <picture> still counts as an image
+        if self._picture:
+            self._add_image(self._picture)
+            self._picture = None
@@ -0,0 +1,204 @@
+"""
+Image Optimizer Module - Parallel gallery image optimization
+Crops each source image to the gallery size class its shape fits best and
+writes progressive JPEG, WebP and (when supported) AVIF renditions.
+Replaces the macOS-only compress-images.sh.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+import logging
+
+try:
+    import pillow_avif  # noqa: F401  Registers AVIF with Pillow releases that lack it
+except ImportError:
+    pass
+
+from backend.config.gallery import GALLERY_COLUMN_WIDTH, GALLERY_SIZE_CLASSES, closest_size_class
+from backend.src.cache import atomic_write
+from backend.src.image_management.image_pipeline import (
+    OUTPUT_FORMATS, Image, ImageOps, list_sources, load_state, require_pillow, reusable_result, save_image
+)
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = ".optimizer-state.json"
+
+
+def avif_supported() -> bool:
+    """Check whether this Pillow build can encode AVIF"""
+    if Image is None:
+        return False
+    Image.init()
+    return 'AVIF' in Image.SAVE
+
+
+def _target_size(width: int, height: int, scale: float):
+    """Size class and pixel size of the tile an image is cropped to"""
+    size_class, _ = closest_size_class(width, height)
+    return size_class, (round(GALLERY_COLUMN_WIDTH * scale), round(GALLERY_SIZE_CLASSES[size_class] * scale))
+
+
+def _optimize_one(task: Dict) -> Dict:
+    """Process-pool worker: optimize one source image unless it is unchanged"""
+    started = time.perf_counter()
+    result = {'source': task['source'], 'status': 'skipped', 'outputs': {}}
+    result['sha256'], previous = reusable_result(
+        task, lambda entry: (os.path.join(task['output_dir'], name) for name in entry['outputs'])
+    )
+    result['source_bytes'] = os.path.getsize(task['path'])
+
+    if previous:
+        result.update(size_class=previous['size_class'], size=previous.get('size'), outputs=previous['outputs'])
+        result['seconds'] = time.perf_counter() - started
+        return result
+
+    try:
+        with Image.open(task['path']) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode != 'RGB':
+                # Flatten transparency onto white rather than black
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img.convert('RGBA'), mask=img.convert('RGBA').split()[-1])
+                img = background
+
+            size_class, size = _target_size(img.width, img.height, task['scale'])
+            # Never upscale; shrink the tile instead so the class aspect is kept
+            factor = min(1.0, img.width / size[0], img.height / size[1])
+            size = (max(1, round(size[0] * factor)), max(1, round(size[1] * factor)))
+            tile = ImageOps.fit(img, size, Image.LANCZOS)
+
+        os.makedirs(os.path.dirname(os.path.join(task['output_dir'], task['stem'])), exist_ok=True)
+        for fmt in task['formats']:
+            name = f"{task['stem']}{OUTPUT_FORMATS[fmt][0]}"
+            path = os.path.join(task['output_dir'], name)
+            save_image(tile, path, fmt)
+            result['outputs'][name] = os.path.getsize(path)
+
+        result.update(status='optimized', size_class=size_class, size=list(size))
+    except Exception as e:
+        result.update(status='failed', error=str(e))
+
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+class ImageOptimizer:
+    """Optimizes a tree of gallery images into size-class renditions"""
+
+    def __init__(self, source_dir: str = "santa-barbara-images",
+                 output_dir: str = "site/optimized-images",
+                 formats: Optional[Sequence[str]] = None, scale: float = 2.0,
+                 workers: Optional[int] = None):
+        """
+        Args:
+            source_dir: Folder tree of original images (never modified)
+            output_dir: Where renditions are written, mirroring source_dir; served with the site
+            formats: Pillow formats to emit; defaults to JPEG, WebP and AVIF if supported
+            scale: Device pixel ratio the tiles are rendered for
+            workers: Process pool size; defaults to the CPU count
+        """
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.formats = list(formats or ['JPEG', 'WEBP'] + (['AVIF'] if avif_supported() else []))
+        self.scale = scale
+        self.workers = workers
+        self.state_path = os.path.join(output_dir, STATE_NAME)
+
+    @property
+    def settings(self) -> str:
+        """Fingerprint of everything that affects the renditions"""
+        payload = json.dumps({
+            'formats': {fmt: OUTPUT_FORMATS[fmt] for fmt in self.formats},
+            'scale': self.scale,
+            'column_width': GALLERY_COLUMN_WIDTH,
+            'size_classes': GALLERY_SIZE_CLASSES
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def run(self) -> Dict:
+        """
+        Optimize every source image, skipping unchanged ones
+
+        Returns:
+            Summary with per-image results, byte totals and wall time
+        """
+        require_pillow("optimize images")
+
+        started = time.perf_counter()
+        state = load_state(self.state_path, "optimizer state", {})
+        settings = self.settings
+        tasks = [{
+            'source': source,
+            'path': os.path.join(self.source_dir, source),
+            'stem': os.path.splitext(source)[0],
+            'output_dir': self.output_dir,
+            'formats': self.formats,
+            'scale': self.scale,
+            'settings': settings,
+            'previous': state.get(source)
+        } for source in list_sources(self.source_dir)]
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(_optimize_one, tasks, chunksize=4))
+
+        new_state = {}
+        for result in results:
+            if result['status'] != 'failed':
+                new_state[result['source']] = {
+                    'sha256': result['sha256'],
+                    'settings': settings,
+                    'size_class': result['size_class'],
+                    'size': result['size'],
+                    'outputs': result['outputs']
+                }
+        atomic_write(self.state_path, json.dumps(new_state, indent=2, sort_keys=True).encode('utf-8'))
+
+        source_bytes = sum(r['source_bytes'] for r in results if r['status'] != 'failed')
+        jpeg_bytes = sum(size for r in results for name, size in r['outputs'].items() if name.endswith('.jpg'))
+        return {
+            'results': results,
+            'optimized': sum(1 for r in results if r['status'] == 'optimized'),
+            'skipped': sum(1 for r in results if r['status'] == 'skipped'),
+            'failed': sum(1 for r in results if r['status'] == 'failed'),
+            'source_bytes': source_bytes,
+            'output_bytes': {
+                fmt: sum(size for r in results for name, size in r['outputs'].items()
+                         if name.endswith(OUTPUT_FORMATS[fmt][0]))
+                for fmt in self.formats
+            },
+            'bytes_saved': source_bytes - jpeg_bytes if 'JPEG' in self.formats else 0,
+            'seconds': time.perf_counter() - started
+        }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Optimize a gallery tree and print per-image timings and savings"""
+    argv = sys.argv[1:] if argv is None else argv
+    optimizer = ImageOptimizer(*argv[:2])
+    print(f"Optimizing images in {optimizer.source_dir} ({', '.join(optimizer.formats)})...")
+
+    summary = optimizer.run()
+    for result in summary['results']:
+        if result['status'] == 'failed':
+            print(f"  FAILED {result['source']}: {result['error']}")
+        elif result['status'] == 'optimized':
+            outputs = ", ".join(f"{name.rsplit('.', 1)[1]} {size // 1024}KB" for name, size in result['outputs'].items())
+            print(f"  {result['source']} -> {result['size_class']} in {result['seconds'] * 1000:.0f}ms ({outputs})")
+
+    print(f"\nOptimized {summary['optimized']}, unchanged {summary['skipped']}, failed {summary['failed']} "
+          f"in {summary['seconds']:.1f}s")
+    print(f"Sources: {summary['source_bytes'] / 1e6:.1f}MB")
+    for fmt, size in summary['output_bytes'].items():
+        print(f"  {fmt}: {size / 1e6:.1f}MB")
+    print(f"Bytes saved (JPEG): {summary['bytes_saved'] / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
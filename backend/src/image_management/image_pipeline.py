@@ -0,0 +1,94 @@
+"""
+Image Pipeline Module - Shared plumbing of the image build stages
+Source discovery, format tables, state files and the skip-if-unchanged
+check used by both the optimizer and the responsive variant generator
+
+Each stage runs its per-image work across a process pool and keeps a JSON
+state file of content hashes and settings, so a rerun only re-encodes
+sources that changed and outputs that went missing.
+"""
+
+import os
+import json
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Only encoding needs Pillow; the tables and state helpers work without it
+    Image = None
+    ImageOps = None
+
+from backend.src.image_management.download_manifest import file_sha256
+
+logger = logging.getLogger(__name__)
+
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Pillow format -> (extension, save options)
+OUTPUT_FORMATS = {
+    'JPEG': ('.jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'WEBP': ('.webp', {'quality': 80, 'method': 6}),
+    'AVIF': ('.avif', {'quality': 60, 'speed': 6}),
+}
+
+
+def require_pillow(action: str):
+    """
+    Fail before starting a process pool when Pillow is missing
+
+    Raises:
+        RuntimeError: Pillow is not installed
+    """
+    if Image is None:
+        raise RuntimeError(f"Pillow is required to {action}")
+
+
+def list_sources(source_dir: str) -> List[str]:
+    """Source images relative to source_dir, '/'-separated and in a stable order"""
+    sources = []
+    for root, _, files in os.walk(source_dir):
+        for name in files:
+            if name.lower().endswith(SOURCE_EXTENSIONS) and not name.startswith('.'):
+                sources.append(os.path.relpath(os.path.join(root, name), source_dir).replace(os.sep, '/'))
+    return sorted(sources)
+
+
+def load_state(path: str, label: str, default: Dict) -> Dict:
+    """A stage's JSON state file, or default if it is missing or unreadable"""
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, 'rb') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable {label} {path}: {e}")
+        return default
+
+
+def reusable_result(task: Dict, output_paths: Callable[[Dict], Iterable[str]]) -> Tuple[str, Optional[Dict]]:
+    """
+    Hash a task's source and check whether its previous result still holds
+
+    Args:
+        task: Worker task with the source 'path', current 'settings' and the
+            'previous' state entry for the source, if any
+        output_paths: Paths of the files a previous entry produced
+
+    Returns:
+        The source sha256, and the previous entry if its hash and settings
+        match and all of its outputs exist, else None
+    """
+    sha256 = file_sha256(task['path'])
+    previous = task.get('previous')
+    if previous and previous.get('sha256') == sha256 and previous.get('settings') == task['settings'] and \
+       all(os.path.exists(path) for path in output_paths(previous)):
+        return sha256, previous
+    return sha256, None
+
+
+def save_image(img, path: str, fmt: str):
+    """Encode an image in one of OUTPUT_FORMATS via a per-process temp file and a rename"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    img.save(temp_path, fmt, **OUTPUT_FORMATS[fmt][1])
+    os.replace(temp_path, path)
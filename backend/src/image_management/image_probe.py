@@ -0,0 +1,116 @@
+"""
+Image Probe Module - Image format and dimensions from the first bytes of a file
+Lets the downloaders filter and rank candidates from a small ranged GET
+instead of transferring every image in full
+"""
+
+import struct
+from typing import Dict, List, NamedTuple, Optional
+
+from backend.config.gallery import (
+    MAX_SOURCE_BYTES, MIN_SOURCE_WIDTH, SOURCE_FORMATS, closest_size_class
+)
+
+# Enough for the SOF marker of JPEGs carrying typical EXIF blocks
+PROBE_BYTES = 32 * 1024
+
+# JPEG start-of-frame markers (everything in C0-CF except DHT, JPG and DAC)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field
+_JPEG_STANDALONE = {0x01} | set(range(0xD0, 0xDA))
+
+
+class ImageInfo(NamedTuple):
+    """Format name and pixel dimensions decoded from an image header"""
+    format: str
+    width: int
+    height: int
+
+
+def _jpeg_size(data: bytes) -> Optional[ImageInfo]:
+    """Walk JPEG segments up to the first start-of-frame marker"""
+    pos = 2
+    while pos + 9 < len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        if marker in _JPEG_STANDALONE:
+            pos += 2
+            continue
+        if marker in _JPEG_SOF:
+            height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+            return ImageInfo('jpeg', width, height)
+        pos += 2 + struct.unpack('>H', data[pos + 2:pos + 4])[0]
+    return None
+
+
+def _webp_size(data: bytes) -> Optional[ImageInfo]:
+    """Read dimensions from a lossy, lossless or extended WebP header"""
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30:
+        width, height = struct.unpack('<HH', data[26:30])
+        return ImageInfo('webp', width & 0x3FFF, height & 0x3FFF)
+    if chunk == b'VP8L' and len(data) >= 25:
+        bits = struct.unpack('<I', data[21:25])[0]
+        return ImageInfo('webp', (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b'VP8X' and len(data) >= 30:
+        width = int.from_bytes(data[24:27], 'little') + 1
+        height = int.from_bytes(data[27:30], 'little') + 1
+        return ImageInfo('webp', width, height)
+    return None
+
+
+def parse_image_header(data: bytes) -> Optional[ImageInfo]:
+    """
+    Decode format and pixel dimensions from the start of an image file
+
+    Supports JPEG, PNG, GIF and WebP.
+
+    Returns:
+        ImageInfo, or None if the format is unknown or the header is cut off
+    """
+    if data[:2] == b'\xff\xd8':
+        return _jpeg_size(data)
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and data[12:16] == b'IHDR' and len(data) >= 24:
+        width, height = struct.unpack('>II', data[16:24])
+        return ImageInfo('png', width, height)
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        width, height = struct.unpack('<HH', data[6:10])
+        return ImageInfo('gif', width, height)
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return _webp_size(data)
+    return None
+
+
+def rank_for_gallery(probes: List[Dict]) -> List[Dict]:
+    """
+    Filter probed candidates against the gallery requirements and rank them
+
+    Each probe is a dict with 'url', 'bytes' (total size or None) and 'info'
+    (ImageInfo or None). Images that are too small, too large or in an
+    unusable format are dropped. The rest are ordered by how well their
+    aspect ratio fits a size class, then by resolution. Images whose header
+    could not be decoded rank last. Kept probes gain 'size_class' and 'fit'.
+    """
+    ranked = []
+    unknown = []
+    for probe in probes:
+        if probe['bytes'] and probe['bytes'] > MAX_SOURCE_BYTES:
+            continue
+
+        info = probe['info']
+        if info is None:
+            unknown.append(probe)
+            continue
+        if info.format not in SOURCE_FORMATS or info.width < MIN_SOURCE_WIDTH or not info.height:
+            continue
+
+        probe['size_class'], probe['fit'] = closest_size_class(info.width, info.height)
+        ranked.append(probe)
+
+    # Fits within about 10% of a tile shape count as equally good
+    ranked.sort(key=lambda p: (round(p['fit'] * 10), -p['info'].width * p['info'].height))
+    return ranked + unknown
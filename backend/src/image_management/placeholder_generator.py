@@ -0,0 +1,249 @@
+"""
+Placeholder Generator Module - Captioned placeholder images for gallery folders
+Renders each distinct caption/size/format once into a content-keyed cache,
+fans cache misses out over a process pool and copies results into place.
+Optionally writes lightweight SVG or WebP placeholders for every gallery
+size class.
+"""
+
+import io
+import os
+import json
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+import logging
+
+from backend.config.gallery import GALLERY_COLUMN_WIDTH, GALLERY_SIZE_CLASSES
+from backend.src.cache import atomic_write
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # SVG placeholders render without Pillow
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# First font found wins; Pillow's bitmap font is the last resort
+DEFAULT_FONT_PATHS = (
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+)
+BACKGROUND = (240, 240, 240)
+TEXT_COLOR = (150, 150, 150)
+BORDER_COLOR = (200, 200, 200)
+
+# Below this many renders a process pool costs more than it saves
+PARALLEL_THRESHOLD = 8
+
+# Pillow format name, file extension
+RASTER_FORMATS = {'jpeg': ('JPEG', '.jpg'), 'webp': ('WEBP', '.webp')}
+
+
+@lru_cache(maxsize=None)
+def load_font(size: int, font_paths: Tuple[str, ...] = DEFAULT_FONT_PATHS):
+    """Load a TrueType font once per process and size"""
+    for path in font_paths:
+        if os.path.exists(path):
+            try:
+                return ImageFont.truetype(path, size)
+            except OSError:
+                continue
+    return ImageFont.load_default()
+
+
+def render_svg(caption: str, width: int, height: int, font_size: int) -> bytes:
+    """Placeholder as a small SVG document"""
+    background = '#%02x%02x%02x' % BACKGROUND
+    text_color = '#%02x%02x%02x' % TEXT_COLOR
+    border = '#%02x%02x%02x' % BORDER_COLOR
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">'
+        f'<rect x="1" y="1" width="{width - 2}" height="{height - 2}" fill="{background}" '
+        f'stroke="{border}" stroke-width="2"/>'
+        f'<text x="50%" y="50%" dominant-baseline="middle" text-anchor="middle" '
+        f'font-family="Helvetica, Arial, sans-serif" font-size="{font_size}" fill="{text_color}">'
+        f'{escape(caption)}</text></svg>'
+    ).encode('utf-8')
+
+
+def render_raster(caption: str, width: int, height: int, font_size: int, fmt: str,
+                  font_paths: Tuple[str, ...] = DEFAULT_FONT_PATHS) -> bytes:
+    """Placeholder as JPEG or WebP bytes"""
+    img = Image.new('RGB', (width, height), color=BACKGROUND)
+    draw = ImageDraw.Draw(img)
+    font = load_font(font_size, font_paths)
+
+    # Center text
+    bbox = draw.textbbox((0, 0), caption, font=font)
+    x = (width - (bbox[2] - bbox[0])) // 2
+    y = (height - (bbox[3] - bbox[1])) // 2
+    draw.text((x, y), caption, fill=TEXT_COLOR, font=font)
+
+    # Add border
+    draw.rectangle([0, 0, width - 1, height - 1], outline=BORDER_COLOR, width=2)
+
+    buffer = io.BytesIO()
+    pil_format = RASTER_FORMATS[fmt][0]
+    img.save(buffer, pil_format, quality=85 if fmt == 'jpeg' else 75)
+    return buffer.getvalue()
+
+
+def _render_job(job: Dict) -> str:
+    """Process-pool worker: render one placeholder into the cache"""
+    payload = render_raster(job['caption'], job['width'], job['height'], job['font_size'],
+                            job['format'], job['font_paths'])
+    atomic_write(job['cache_path'], payload)
+    return job['cache_path']
+
+
+class PlaceholderGenerator:
+    """Creates captioned placeholder images for gallery folders"""
+
+    def __init__(self, base_dir: str = "santa-barbara-images",
+                 cache_dir: str = "backend/data/placeholder_cache",
+                 size: Tuple[int, int] = (800, 600), font_size: int = 40,
+                 font_paths: Sequence[str] = DEFAULT_FONT_PATHS,
+                 size_class_dir: Optional[str] = None, size_class_formats: Sequence[str] = ('svg',),
+                 workers: Optional[int] = None):
+        """
+        Args:
+            base_dir: Folder holding one subfolder per itinerary stop
+            cache_dir: Content-keyed store of rendered placeholders
+            size: Pixel size of the imageN.jpg placeholders
+            font_size: Caption size at the full placeholder width
+            font_paths: TrueType fonts to try, in order
+            size_class_dir: If set, also write a placeholder per gallery size class here
+            size_class_formats: 'svg' and/or 'webp' for the size-class placeholders
+            workers: Process pool size; defaults to the CPU count
+        """
+        self.base_dir = base_dir
+        self.cache_dir = cache_dir
+        self.size = size
+        self.font_size = font_size
+        self.font_paths = tuple(font_paths)
+        self.size_class_dir = size_class_dir
+        self.size_class_formats = list(size_class_formats)
+        self.workers = workers
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _cache_path(self, caption: str, width: int, height: int, fmt: str) -> str:
+        """Cache file for a caption/size/format, keyed on everything that affects the pixels"""
+        key = json.dumps([caption, width, height, fmt, self._font_size_for(width),
+                          self.font_paths, BACKGROUND, TEXT_COLOR, BORDER_COLOR])
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:24]
+        extension = '.svg' if fmt == 'svg' else RASTER_FORMATS[fmt][1]
+        return os.path.join(self.cache_dir, f"{digest}{extension}")
+
+    def _font_size_for(self, width: int) -> int:
+        """Scale the caption with the placeholder width"""
+        return max(12, round(self.font_size * width / self.size[0]))
+
+    def _plan(self, image_folders: Dict[str, List[str]]) -> List[Tuple[str, str, int, int, str]]:
+        """(destination, caption, width, height, format) for every placeholder still missing"""
+        plan = []
+        for folder, captions in image_folders.items():
+            for i, caption in enumerate(captions):
+                # Skip if image already exists
+                destination = os.path.join(self.base_dir, folder, f"image{i+1}.jpg")
+                if not os.path.exists(destination):
+                    plan.append((destination, caption, self.size[0], self.size[1], 'jpeg'))
+
+                if self.size_class_dir is None:
+                    continue
+                for size_class, tile_height in GALLERY_SIZE_CLASSES.items():
+                    for fmt in self.size_class_formats:
+                        extension = '.svg' if fmt == 'svg' else RASTER_FORMATS[fmt][1]
+                        destination = os.path.join(self.size_class_dir, folder, f"image{i+1}-{size_class}{extension}")
+                        if not os.path.exists(destination):
+                            plan.append((destination, caption, GALLERY_COLUMN_WIDTH, tile_height, fmt))
+        return plan
+
+    @staticmethod
+    def _place(cache_path: str, destination: str) -> bool:
+        """
+        Link a complete copy into place unless an image appeared there since planning
+
+        Without hard link support (some network and FAT filesystems) the copy
+        is renamed into place instead, which is only guarded by an existence
+        check just before the rename.
+        """
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        temp_path = f"{destination}.{os.getpid()}.tmp"
+        shutil.copyfile(cache_path, temp_path)
+        try:
+            os.link(temp_path, destination)
+            return True
+        except FileExistsError:
+            logger.info(f"Keeping existing image: {destination}")
+            return False
+        except OSError:
+            if os.path.exists(destination):
+                logger.info(f"Keeping existing image: {destination}")
+                return False
+            os.replace(temp_path, destination)
+            return True
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def generate(self, image_folders: Dict[str, List[str]]) -> Dict:
+        """
+        Create every missing placeholder for a set of gallery folders
+
+        Args:
+            image_folders: Folder name -> captions, one placeholder per caption
+
+        Returns:
+            Counts of placeholders created, renders performed and cache hits;
+            a slot filled by another writer after planning is left alone
+        """
+        plan = self._plan(image_folders)
+
+        # Render each distinct placeholder once; SVG is cheap enough to do inline
+        jobs = {}
+        for _, caption, width, height, fmt in plan:
+            cache_path = self._cache_path(caption, width, height, fmt)
+            if cache_path in jobs or os.path.exists(cache_path):
+                continue
+            if fmt == 'svg':
+                atomic_write(cache_path, render_svg(caption, width, height, self._font_size_for(width)))
+                jobs[cache_path] = None
+                continue
+            if Image is None:
+                raise RuntimeError("Pillow is required for JPEG and WebP placeholders")
+            jobs[cache_path] = {
+                'caption': caption,
+                'width': width,
+                'height': height,
+                'format': fmt,
+                'font_size': self._font_size_for(width),
+                'font_paths': self.font_paths,
+                'cache_path': cache_path
+            }
+
+        raster_jobs = [job for job in jobs.values() if job]
+        if len(raster_jobs) >= PARALLEL_THRESHOLD and self.workers != 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(_render_job, raster_jobs, chunksize=4))
+        else:
+            for job in raster_jobs:
+                _render_job(job)
+
+        created = 0
+        for destination, caption, width, height, fmt in plan:
+            if self._place(self._cache_path(caption, width, height, fmt), destination):
+                created += 1
+                logger.info(f"Created placeholder: {destination}")
+
+        return {
+            'created': created,
+            'rendered': len(jobs),
+            'cache_hits': len(plan) - len(jobs)
+        }
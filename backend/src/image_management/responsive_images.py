@@ -0,0 +1,182 @@
+"""
+Responsive Images Module - Width-stepped gallery variants and a srcset manifest
+Resizes every gallery image to a ladder of widths in JPEG and WebP and
+records dimensions, byte sizes and a tiny blur-up placeholder per image so
+pages can emit srcset/sizes with explicit width and height. The manifest
+doubles as the stage state that lets unchanged images be skipped.
+"""
+
+import os
+import io
+import json
+import time
+import base64
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence
+import logging
+
+from backend.config.gallery import GALLERY_SIZES_ATTR, closest_size_class
+from backend.src.cache import atomic_write
+from backend.src.image_management.image_pipeline import (
+    OUTPUT_FORMATS, Image, ImageOps, list_sources, load_state, require_pillow, reusable_result, save_image
+)
+
+logger = logging.getLogger(__name__)
+
+WIDTH_STEPS = (320, 480, 640, 960, 1280)
+PLACEHOLDER_WIDTH = 16
+MANIFEST_NAME = "manifest.json"
+
+
+def _placeholder(img) -> str:
+    """Blurred thumbnail as a JPEG data URI of a few hundred bytes"""
+    thumb = img.copy()
+    thumb.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH * 4))
+    buffer = io.BytesIO()
+    thumb.save(buffer, 'JPEG', quality=40)
+    return f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+
+
+def _variants_for(task: Dict) -> Dict:
+    """Process-pool worker: build the width ladder for one source image unless it is unchanged"""
+    started = time.perf_counter()
+    sha256, previous = reusable_result(
+        task, lambda entry: (os.path.join(task['site_dir'], v['path']) for v in entry['variants'])
+    )
+    if previous:
+        return {'source': task['source'], 'status': 'skipped', 'entry': previous,
+                'seconds': time.perf_counter() - started}
+
+    try:
+        with Image.open(task['path']) as img:
+            img = ImageOps.exif_transpose(img).convert('RGB')
+
+        # Widths the source can serve without upscaling; tiny sources get one variant
+        widths = [w for w in task['widths'] if w <= img.width] or [img.width]
+        stem = os.path.splitext(task['source'])[0]
+        variants = []
+        for width in widths:
+            height = round(img.height * width / img.width)
+            resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+            for fmt in task['formats']:
+                rel_path = os.path.join(task['output_prefix'], f"{stem}-{width}w{OUTPUT_FORMATS[fmt][0]}")
+                path = os.path.join(task['site_dir'], rel_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                save_image(resized, path, fmt)
+                variants.append({
+                    'path': rel_path.replace(os.sep, '/'),
+                    'format': fmt.lower(),
+                    'width': width,
+                    'height': height,
+                    'bytes': os.path.getsize(path)
+                })
+
+        entry = {
+            'sha256': sha256,
+            'settings': task['settings'],
+            'width': img.width,
+            'height': img.height,
+            'bytes': os.path.getsize(task['path']),
+            'size_class': closest_size_class(img.width, img.height)[0],
+            'placeholder': _placeholder(img),
+            'variants': variants
+        }
+        return {'source': task['source'], 'status': 'generated', 'entry': entry,
+                'seconds': time.perf_counter() - started}
+    except Exception as e:
+        return {'source': task['source'], 'status': 'failed', 'error': str(e),
+                'seconds': time.perf_counter() - started}
+
+
+def build_srcset(entry: Dict, fmt: str = 'jpeg', prefix: str = '') -> str:
+    """srcset attribute value for one manifest entry in one format"""
+    return ", ".join(f"{prefix}{v['path']} {v['width']}w" for v in entry['variants'] if v['format'] == fmt)
+
+
+def fallback_variant(entry: Dict, fmt: str = 'jpeg', max_width: int = 640) -> Dict:
+    """Variant to use as the plain src: the widest one not above max_width"""
+    variants = [v for v in entry['variants'] if v['format'] == fmt]
+    fitting = [v for v in variants if v['width'] <= max_width]
+    return max(fitting, key=lambda v: v['width']) if fitting else min(variants, key=lambda v: v['width'])
+
+
+class ResponsiveImageGenerator:
+    """Generates responsive variants for a gallery tree and a manifest describing them"""
+
+    def __init__(self, source_dir: str = "santa-barbara-images", site_dir: str = "site",
+                 output_prefix: str = "responsive-images", widths: Sequence[int] = WIDTH_STEPS,
+                 formats: Sequence[str] = ('JPEG', 'WEBP'), workers: Optional[int] = None):
+        """
+        Args:
+            source_dir: Folder tree of original gallery images
+            site_dir: Static site root the variants are deployed with
+            output_prefix: Folder under site_dir for variants and the manifest
+            widths: Target variant widths in pixels
+            formats: Pillow formats to emit per width
+            workers: Process pool size; defaults to the CPU count
+        """
+        self.source_dir = source_dir
+        self.site_dir = site_dir
+        self.output_prefix = output_prefix
+        self.widths = sorted(widths)
+        self.formats = list(formats)
+        self.workers = workers
+        self.manifest_path = os.path.join(site_dir, output_prefix, MANIFEST_NAME)
+
+    @property
+    def settings(self) -> str:
+        """Fingerprint of everything that affects the variants"""
+        payload = json.dumps({
+            'widths': self.widths,
+            'formats': {fmt: OUTPUT_FORMATS[fmt] for fmt in self.formats},
+            'placeholder_width': PLACEHOLDER_WIDTH,
+            'output_prefix': self.output_prefix
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def load_manifest(self) -> Dict:
+        """The manifest from the last run, or an empty one"""
+        return load_state(self.manifest_path, "variant manifest", {'sizes': GALLERY_SIZES_ATTR, 'images': {}})
+
+    def run(self) -> Dict:
+        """
+        Generate variants for every gallery image and write the manifest
+
+        Returns:
+            Summary with per-image results, the manifest and wall time
+        """
+        require_pillow("generate responsive variants")
+
+        started = time.perf_counter()
+        previous = self.load_manifest().get('images', {})
+        settings = self.settings
+        tasks = [{
+            'source': source,
+            'path': os.path.join(self.source_dir, source),
+            'site_dir': self.site_dir,
+            'output_prefix': self.output_prefix,
+            'widths': self.widths,
+            'formats': self.formats,
+            'settings': settings,
+            'previous': previous.get(source)
+        } for source in list_sources(self.source_dir)]
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(_variants_for, tasks, chunksize=4))
+
+        manifest = {
+            'sizes': GALLERY_SIZES_ATTR,
+            'images': {r['source']: r['entry'] for r in results if r['status'] != 'failed'}
+        }
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        atomic_write(self.manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+        return {
+            'results': results,
+            'manifest': manifest,
+            'generated': sum(1 for r in results if r['status'] == 'generated'),
+            'skipped': sum(1 for r in results if r['status'] == 'skipped'),
+            'failed': sum(1 for r in results if r['status'] == 'failed'),
+            'seconds': time.perf_counter() - started
+        }
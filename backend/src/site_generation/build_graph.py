@@ -0,0 +1,245 @@
+"""
+Build Graph Module - Incremental, parallel pipeline of site build steps
+Each node declares the inputs it depends on (config dicts, files, other
+snapshots) and the outputs it produces. A node whose input fingerprint and
+outputs are unchanged since the last successful run is skipped; nodes
+whose dependencies are done run concurrently.
+
+Inputs are collected only after a node's dependencies have finished, so a
+step that re-ran but produced the same content does not force its
+dependents to rebuild. File contents are hashed once and cached by size
+and mtime in the persisted state.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+import logging
+
+from backend.src.cache import atomic_write
+from backend.src.site_generation.template_engine import fingerprint
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+
+
+class BuildNode:
+    """One step of the build: inputs to fingerprint, an action, and the outputs it leaves behind"""
+
+    def __init__(self, name: str, action: Callable[[], Any], inputs: Callable[['FileHasher'], Any],
+                 deps: Sequence[str] = (), outputs: Sequence[str] = (),
+                 complete: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            name: Unique node name
+            action: Does the work; its return value is reported back
+            inputs: Returns a JSON-serializable description of everything the
+                action reads, given a FileHasher for file and folder contents;
+                called before the action and again after it runs
+            deps: Nodes that must finish before this one
+            outputs: Paths that must exist for a previous run to be reused
+            complete: Checked after the action; a run it rejects (e.g. downloads
+                that fell short while offline) is not recorded, so the next
+                build runs the node again
+        """
+        self.name = name
+        self.action = action
+        self.inputs = inputs
+        self.deps = list(deps)
+        self.outputs = list(outputs)
+        self.complete = complete
+
+
+class FileHasher:
+    """Content hashes of files, recomputed only when size or mtime change"""
+
+    def __init__(self, known: Optional[Dict[str, List]] = None):
+        """
+        Args:
+            known: path -> [size, mtime_ns, sha256] from a previous build
+        """
+        self._known = dict(known or {})
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def file(self, path: str) -> Optional[str]:
+        """sha256 of a file, or None if it does not exist"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached = self._known.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            digest = cached[2]
+        else:
+            sha = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+
+        with self._lock:
+            self._seen[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def tree(self, root: str, extensions: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Relative path -> sha256 for every (matching, non-hidden) file under root"""
+        extensions = tuple(e.lower() for e in extensions) if extensions else None
+        hashes = {}
+        for folder, dirs, files in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for name in sorted(files):
+                if name.startswith('.') or (extensions and not name.lower().endswith(extensions)):
+                    continue
+                path = os.path.join(folder, name)
+                hashes[os.path.relpath(path, root).replace(os.sep, '/')] = self.file(path)
+        return hashes
+
+    def snapshot(self) -> Dict[str, List]:
+        """Hashes of every file looked at in this build, for the next one"""
+        with self._lock:
+            return dict(self._seen)
+
+
+class BuildGraph:
+    """Runs build nodes in dependency order, skipping those whose inputs are unchanged"""
+
+    def __init__(self, state_path: str = "backend/data/build_state.json", workers: int = 4):
+        """
+        Args:
+            state_path: JSON file with node fingerprints and file hashes between builds
+            workers: How many nodes may run at the same time
+        """
+        self.state_path = state_path
+        self.workers = workers
+        self.nodes: Dict[str, BuildNode] = {}
+
+    def add(self, node: BuildNode) -> BuildNode:
+        """
+        Register a node
+
+        Raises:
+            ValueError: The name is taken or a dependency is not registered yet
+        """
+        if node.name in self.nodes:
+            raise ValueError(f"Duplicate build node {node.name}")
+        unknown = [dep for dep in node.deps if dep not in self.nodes]
+        if unknown:
+            raise ValueError(f"Build node {node.name} depends on unknown {', '.join(unknown)}")
+        self.nodes[node.name] = node
+        return node
+
+    def _load_state(self) -> Dict:
+        """Fingerprints and file hashes from the last build"""
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'rb') as f:
+                    state = json.load(f)
+                if state.get('version') == STATE_VERSION:
+                    return state
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable build state {self.state_path}: {e}")
+        return {'version': STATE_VERSION, 'nodes': {}, 'files': {}}
+
+    def _selected(self, targets: Optional[Iterable[str]]) -> List[str]:
+        """Targets and everything they depend on, in registration order"""
+        if targets is None:
+            return list(self.nodes)
+        wanted = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.nodes:
+                raise KeyError(f"Unknown build node {name}")
+            if name not in wanted:
+                wanted.add(name)
+                pending.extend(self.nodes[name].deps)
+        return [name for name in self.nodes if name in wanted]
+
+    def _run_node(self, node: BuildNode, hasher: FileHasher, previous: Optional[Dict], force: bool) -> Dict:
+        """Fingerprint a node's inputs and run it unless its last run still holds"""
+        started = time.perf_counter()
+        key = fingerprint(node.name, node.inputs(hasher))
+        if not force and previous and previous.get('fingerprint') == key and \
+           all(os.path.exists(path) for path in node.outputs):
+            return {'status': 'skipped', 'fingerprint': key, 'seconds': time.perf_counter() - started}
+
+        result = node.action()
+        # An action may rewrite files it also reads (e.g. download manifests);
+        # record the inputs as it left them so the next build can skip it
+        key = fingerprint(node.name, node.inputs(hasher))
+        if node.complete and not node.complete():
+            return {'status': 'partial', 'fingerprint': None, 'result': result,
+                    'seconds': time.perf_counter() - started}
+        return {'status': 'built', 'fingerprint': key, 'result': result,
+                'seconds': time.perf_counter() - started}
+
+    def run(self, targets: Optional[Iterable[str]] = None, force: bool = False) -> Dict:
+        """
+        Build the requested nodes and their dependencies
+
+        A failed node is reported and its dependents are not run; every other
+        node still completes and its state is saved. A partial node's
+        dependents do run, but the node itself is retried on the next build.
+
+        Args:
+            targets: Node names to build; all nodes when omitted
+            force: Run every selected node even if its inputs are unchanged
+
+        Returns:
+            Per-node status ('built', 'partial', 'skipped', 'failed', 'blocked'), timing and
+            action results, plus the wall time of the whole build
+        """
+        started = time.perf_counter()
+        names = self._selected(targets)
+        state = self._load_state()
+        hasher = FileHasher(state.get('files'))
+        results: Dict[str, Dict] = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            waiting = list(names)
+            while waiting or running:
+                for name in list(waiting):
+                    deps = self.nodes[name].deps
+                    if any(results.get(dep, {}).get('status') in ('failed', 'blocked') for dep in deps):
+                        results[name] = {'status': 'blocked', 'seconds': 0.0}
+                        waiting.remove(name)
+                    elif all(dep in results for dep in deps):
+                        future = pool.submit(self._run_node, self.nodes[name], hasher,
+                                             state['nodes'].get(name), force)
+                        running[future] = name
+                        waiting.remove(name)
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Build node {name} failed: {e}")
+                        results[name] = {'status': 'failed', 'error': str(e), 'seconds': 0.0}
+                        # Outputs may be half written; never reuse them
+                        state['nodes'].pop(name, None)
+                        continue
+                    state['nodes'][name] = {'fingerprint': results[name]['fingerprint'],
+                                            'built_at': time.time() if results[name]['status'] != 'skipped'
+                                            else state['nodes'].get(name, {}).get('built_at')}
+                    logger.info(f"{name}: {results[name]['status']} in {results[name]['seconds'] * 1000:.0f}ms")
+
+        # Keep hashes of files outside this build's selection for later full builds
+        kept = {path: entry for path, entry in state.get('files', {}).items() if os.path.exists(path)}
+        state['files'] = {**kept, **hasher.snapshot()}
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        atomic_write(self.state_path, json.dumps(state, indent=2, sort_keys=True).encode('utf-8'))
+
+        return {'nodes': results, 'seconds': time.perf_counter() - started}
@@ -0,0 +1,440 @@
+"""
+HTML Generator Module - Itinerary page fragments
+Renders the header, navigation, day sections, activity cards, masonry
+galleries and weather forecast of an itinerary page from structured data.
+Every fragment goes through the fragment cache, so a page rebuild only
+re-renders fragments whose inputs changed.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+from urllib.parse import quote_plus
+
+from backend.config.gallery import GALLERY_SIZES_ATTR
+from backend.src.image_management.responsive_images import build_srcset, fallback_variant
+from backend.src.site_generation.template_engine import (
+    FragmentCache, Markup, TemplateEngine, escape, fingerprint, join
+)
+
+TEMPLATES = {
+    'page': """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>$title</title>
+    <link rel="stylesheet" href="$theme_href">
+    <style>
+$base_css
+    </style>
+</head>
+<body>
+$header
+$navigation
+$days
+$weather
+</body>
+</html>
+""",
+    'header': """    <header class="header">
+        <h1>$title</h1>
+        <div>
+            <p class="subtitle">$subtitle</p>
+            <span class="date-range">· $date_range</span>
+        </div>
+    </header>""",
+    'navigation': """    <nav class="navigation">
+        <div class="nav-container">
+$links
+            <a href="javascript:window.print()" class="nav-link">Print Itinerary</a>
+        </div>
+    </nav>""",
+    'nav_link': """            <a href="#$anchor" class="nav-link">$label</a>""",
+    'day': """    <section id="$anchor" class="day-section">
+        <div class="day-header">
+            <h2 class="day-title">$title</h2>
+        </div>
+$activities
+    </section>""",
+    'activity': """        <div class="activity-card" id="$anchor">
+            <div class="activity-content">
+                <div class="activity-info">
+                    <div>
+                        <div class="activity-time">$time</div>
+                        <h3 class="activity-title">$title</h3>
+                        <p class="activity-description">$description</p>
+$rating
+                    </div>
+                    <div>
+$highlights
+$pro_tips
+$contact
+                    </div>
+                </div>
+$gallery
+            </div>
+        </div>""",
+    'rating': """                        <div class="rating-info">
+                            <span class="rating-stars">$stars</span>
+                            <span>$summary</span>
+                        </div>""",
+    'highlights': """                        <div class="must-try-list">
+                            <div class="must-try-title">$title</div>
+$items
+                        </div>""",
+    'highlight_item': """                            <div class="must-try-item">$text</div>""",
+    'pro_tips': """                        <div class="activity-highlight">$tips</div>""",
+    'contact': """                        <div class="contact-info">
+$items
+                        </div>""",
+    'contact_item': """                            <div class="contact-item"><span class="contact-icon">$icon</span>$content</div>""",
+    'link': """<a href="$href"$target>$text</a>""",
+    'gallery': """                <div class="gallery-container">
+                    <div class="masonry-gallery" id="$gallery_id">
+$items
+                    </div>
+                </div>""",
+    'gallery_item': """                        <div class="gallery-item $size_class">
+                            <div class="gallery-placeholder">
+                                $picture
+                            </div>$caption
+                        </div>""",
+    'picture': """<picture><source type="image/webp" srcset="$webp_srcset" sizes="$sizes"><img src="$src" srcset="$jpeg_srcset" sizes="$sizes" width="$width" height="$height" alt="$alt" loading="lazy" decoding="async" style="background: url('$placeholder') center / cover"></picture>""",
+    'rendition_picture': """<picture>$sources<img src="$src"$dimensions alt="$alt" loading="lazy" decoding="async"></picture>""",
+    'source': """<source type="$type" srcset="$srcset">""",
+    'img': """<img src="$src" alt="$alt" loading="lazy" decoding="async">""",
+    'gallery_caption': """
+                            <div class="gallery-caption">$text</div>""",
+    'weather': """    <section id="weather" class="weather-section">
+        <h2 class="day-title">$title</h2>
+        <div class="weather-forecast">
+$days
+        </div>
+    </section>""",
+    'weather_day': """            <div class="weather-day">
+                <h3>$name</h3>
+                <div class="weather-icon">$icon</div>
+                <div class="weather-temps">$high°/$low°</div>
+                <p>$condition</p>
+                <div class="weather-details">
+                    <div>💧 Humidity: $humidity%</div>
+                    <div>💨 Wind: $wind mph</div>
+                </div>
+            </div>""",
+}
+
+# Layout rules shared by every theme; colors and fonts come from the theme variables
+BASE_CSS = """
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: var(--font-body); background: var(--background-color); color: var(--text-dark); line-height: 1.6; }
+        .header { background: var(--gradient-header); color: white; text-align: center; padding: 40px 20px; }
+        .header h1 { font-family: var(--font-display); font-size: 4rem; letter-spacing: 4px; }
+        .subtitle { font-family: var(--font-serif); font-size: 1.4rem; display: inline; }
+        .navigation { position: sticky; top: 0; z-index: 100; background: white; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+        .nav-container { max-width: 1200px; margin: 0 auto; display: flex; flex-wrap: wrap; justify-content: center; gap: 10px; padding: 12px; }
+        .nav-link { color: var(--primary-color); text-decoration: none; font-weight: 600; padding: 6px 14px; border-radius: 20px; }
+        .nav-link:hover { background: var(--gradient-accent); }
+        .day-section { max-width: 1200px; margin: 40px auto; padding: 0 20px; }
+        .day-title { font-family: var(--font-display); font-size: 3rem; color: var(--primary-color); letter-spacing: 3px; }
+        .activity-card { background: white; border-radius: var(--border-radius); box-shadow: var(--card-shadow); margin: 24px 0; overflow: hidden; transition: transform 0.3s ease; }
+        .activity-card:hover { transform: var(--hover-lift); }
+        .activity-content { display: flex; flex-wrap: wrap; }
+        .activity-info { flex: 1 1 45%; padding: 28px; display: flex; flex-direction: column; justify-content: space-between; gap: 16px; }
+        .activity-time { color: var(--accent-color); font-weight: 700; text-transform: uppercase; font-size: 0.9rem; }
+        .activity-title { font-family: var(--font-serif); font-size: 1.8rem; margin: 6px 0 10px; }
+        .activity-description { color: var(--text-light); }
+        .rating-info { margin-top: 12px; display: flex; gap: 10px; align-items: center; font-size: 0.9rem; color: var(--text-light); }
+        .rating-stars { color: #f5a623; letter-spacing: 2px; }
+        .must-try-list { background: var(--gradient-accent); border-radius: 12px; padding: 16px; }
+        .must-try-title { font-weight: 700; color: var(--primary-color); margin-bottom: 8px; font-size: 0.85rem; letter-spacing: 1px; }
+        .must-try-item { padding: 4px 0; }
+        .activity-highlight { border-left: 4px solid var(--accent-color); padding: 12px 16px; margin-top: 12px; background: #fffaf5; font-style: italic; }
+        .contact-info { margin-top: 12px; font-size: 0.9rem; }
+        .contact-item { display: flex; gap: 8px; padding: 2px 0; }
+        .contact-item a { color: var(--primary-color); }
+        .gallery-container { flex: 1 1 55%; position: relative; }
+        .masonry-gallery { display: grid; grid-template-columns: repeat(3, 1fr); grid-auto-rows: 60px; gap: 8px; padding: 12px; }
+        .gallery-item { position: relative; overflow: hidden; border-radius: 12px; grid-row: span 3; }
+        .gallery-placeholder { width: 100%; height: 100%; }
+        .gallery-placeholder img { width: 100%; height: 100%; object-fit: cover; display: block; }
+        .gallery-caption { position: absolute; bottom: 0; left: 0; right: 0; background: linear-gradient(transparent, rgba(0,0,0,0.8)); color: white; padding: 15px 10px 10px; font-size: 0.8rem; text-align: center; transform: translateY(100%); transition: transform 0.3s ease; }
+        .gallery-item:hover .gallery-caption { transform: translateY(0); }
+        .gallery-item.small { grid-row: span 2; }
+        .gallery-item.medium { grid-row: span 3; }
+        .gallery-item.tall { grid-row: span 4; }
+        .gallery-item.extra-tall { grid-row: span 5; }
+        .gallery-item.super-tall { grid-row: span 6; }
+        .weather-section { max-width: 1200px; margin: 40px auto; padding: 40px 20px; background: var(--gradient-weather); border-radius: var(--border-radius); text-align: center; }
+        .weather-forecast { display: grid; grid-template-columns: repeat(auto-fit, minmax(220px, 1fr)); gap: 20px; margin-top: 30px; }
+        .weather-day { background: white; border-radius: 16px; padding: 24px; box-shadow: var(--card-shadow); }
+        .weather-icon { font-size: 3rem; margin: 15px 0; }
+        .weather-temps { font-size: 1.8rem; font-weight: bold; }
+        .weather-details { margin-top: 15px; font-size: 0.9rem; color: var(--text-light); }
+        @media (max-width: 1024px) { .activity-info, .gallery-container { flex: 1 1 100%; } }
+        @media (max-width: 768px) {
+            .header h1 { font-size: 3rem; }
+            .day-title { font-size: 2.5rem; }
+            .masonry-gallery { grid-template-columns: 1fr; grid-auto-rows: auto; }
+            .gallery-item { grid-row: span 1 !important; height: 250px; }
+        }
+        @media print { .navigation, .gallery-container { display: none; } }
+"""
+
+# OpenWeatherMap icon code prefix -> emoji
+WEATHER_EMOJI = {
+    '01': '☀️', '02': '⛅', '03': '☁️', '04': '☁️', '09': '🌧️',
+    '10': '🌦️', '11': '⛈️', '13': '❄️', '50': '🌫️'
+}
+CONTACT_ICONS = {'address': '📍', 'website': '🌐', 'phone': '📞'}
+
+_IMAGE_FILE = re.compile(r'^(?:image(\d+)|(\d+)-(.+?))\.(?:jpe?g|png|webp)$', re.IGNORECASE)
+# Size hints from IMAGE_NAMING_CONVENTION.md -> gallery size class
+NAMING_SIZE_CLASSES = {'large': 'medium', 'wide': 'small', 'square': 'medium', 'tall': 'tall'}
+# Optimizer rendition extension -> <source> type, best compression first; JPEG is the <img> fallback
+RENDITION_TYPES = (('.avif', 'image/avif'), ('.webp', 'image/webp'))
+
+
+def slugify(text: str) -> str:
+    """Lowercase, hyphen-separated anchor for a title"""
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def stars(rating: float) -> str:
+    """Five-star string for a 0-5 rating"""
+    full = int(round(rating))
+    return '★' * full + '☆' * (5 - full)
+
+
+def list_gallery_images(folder_path: str) -> List[Dict]:
+    """
+    Gallery images in a folder, in display order
+
+    Understands both imageN.jpg and the NN-description-size.jpg names from
+    IMAGE_NAMING_CONVENTION.md; descriptive names supply alt text and a
+    size hint.
+    """
+    if not os.path.isdir(folder_path):
+        return []
+
+    images = []
+    for name in os.listdir(folder_path):
+        match = _IMAGE_FILE.match(name)
+        if not match:
+            continue
+        if match.group(1):
+            images.append({'file': name, 'order': int(match.group(1)), 'alt': None, 'size_hint': None})
+            continue
+
+        words = match.group(3).split('-')
+        size_hint = NAMING_SIZE_CLASSES.get(words[-1])
+        if size_hint:
+            words = words[:-1]
+        images.append({'file': name, 'order': int(match.group(2)),
+                       'alt': " ".join(words).capitalize(), 'size_hint': size_hint})
+    return sorted(images, key=lambda image: image['order'])
+
+
+class HTMLGenerator:
+    """Renders itinerary page fragments through a fragment cache"""
+
+    def __init__(self, fragments: Optional[FragmentCache] = None,
+                 image_root: str = "santa-barbara-images", image_url_prefix: str = "./santa-barbara-images",
+                 responsive_manifest: Optional[Dict] = None, optimized_state: Optional[Dict] = None,
+                 optimized_url_prefix: str = "optimized-images"):
+        """
+        Args:
+            fragments: Cache of rendered fragments; a fresh in-memory one by default
+            image_root: Folder holding one gallery folder per activity
+            image_url_prefix: URL of image_root as seen from the page
+            responsive_manifest: Output of the responsive image stage, for srcset and dimensions
+            optimized_state: State of the image optimizer, for size-class renditions of
+                images without responsive variants
+            optimized_url_prefix: URL of the optimizer output folder as seen from the page
+        """
+        self.engine = TEMPLATES_ENGINE
+        self.fragments = fragments or FragmentCache(namespace=TEMPLATES_FINGERPRINT)
+        self.image_root = image_root
+        self.image_url_prefix = image_url_prefix
+        self.responsive = (responsive_manifest or {}).get('images', {})
+        self.sizes = (responsive_manifest or {}).get('sizes', GALLERY_SIZES_ATTR)
+        self.optimized = optimized_state or {}
+        self.optimized_url_prefix = optimized_url_prefix
+
+    def header(self, document: Dict) -> Markup:
+        """Page header with title, subtitle and dates"""
+        inputs = {key: document.get(key, '') for key in ('title', 'subtitle', 'date_range')}
+        return self.fragments.render('header', inputs, lambda: self.engine.render('header', **inputs))
+
+    def navigation(self, links: List[Dict]) -> Markup:
+        """Navigation bar from [{'anchor', 'label'}]"""
+        return self.fragments.render('navigation', links, lambda: self.engine.render(
+            'navigation', links=join(self.engine.render('nav_link', **link) for link in links)
+        ))
+
+    def gallery(self, gallery: Dict, anchor: str) -> Markup:
+        """
+        Masonry gallery for an activity's image folder
+
+        The folder listing and its responsive manifest entries are part of
+        the fragment inputs, so adding or replacing an image re-renders
+        only this gallery.
+        """
+        folder = gallery['folder']
+        images = list_gallery_images(os.path.join(self.image_root, folder))
+        limit = gallery.get('limit')
+        if limit:
+            images = images[:limit]
+        for image in images:
+            image['responsive'] = self.responsive.get(f"{folder}/{image['file']}")
+            image['optimized'] = self.optimized.get(f"{folder}/{image['file']}")
+
+        inputs = {'gallery': gallery, 'images': images, 'sizes': self.sizes, 'prefix': self.image_url_prefix,
+                  'optimized_prefix': self.optimized_url_prefix}
+        return self.fragments.render('gallery', inputs, lambda: self._render_gallery(gallery, images, anchor))
+
+    def _render_rendition(self, entry: Dict, alt: str) -> Optional[Markup]:
+        """<picture> over the optimizer's AVIF/WebP/JPEG renditions, or None without a JPEG"""
+        outputs = entry.get('outputs', {})
+        jpeg = next((name for name in outputs if name.endswith('.jpg')), None)
+        if not jpeg:
+            return None
+        stem = jpeg[:-len('.jpg')]
+        sources = [
+            self.engine.render('source', type=mime, srcset=f"{self.optimized_url_prefix}/{stem}{extension}")
+            for extension, mime in RENDITION_TYPES if f"{stem}{extension}" in outputs
+        ]
+        size = entry.get('size')
+        dimensions = Markup(f' width="{int(size[0])}" height="{int(size[1])}"') if size else Markup('')
+        return self.engine.render('rendition_picture', sources=join(sources, ''), dimensions=dimensions,
+                                  src=f"{self.optimized_url_prefix}/{jpeg}", alt=alt)
+
+    def _render_gallery(self, gallery: Dict, images: List[Dict], anchor: str) -> Markup:
+        """
+        Gallery items as <picture> with srcset when responsive variants exist,
+        <picture> over optimizer renditions when those exist, else plain <img>
+        """
+        captions = gallery.get('captions', {})
+        alts = gallery.get('alts', {})
+        items = []
+        for image in images:
+            alt = alts.get(image['file']) or image['alt'] or captions.get(image['file']) or gallery.get('title', '')
+            entry = image['responsive']
+            rendition = self._render_rendition(image['optimized'], alt) if image['optimized'] else None
+            if entry and entry.get('variants'):
+                fallback = fallback_variant(entry)
+                picture = self.engine.render(
+                    'picture', src=fallback['path'], jpeg_srcset=build_srcset(entry, 'jpeg'),
+                    webp_srcset=build_srcset(entry, 'webp'), sizes=self.sizes,
+                    width=entry['width'], height=entry['height'], alt=alt, placeholder=entry['placeholder']
+                )
+                size_class = image['size_hint'] or entry.get('size_class', '')
+            elif rendition:
+                picture = rendition
+                # Renditions are cropped to the optimizer's size class, so it wins over name hints
+                size_class = image['optimized'].get('size_class') or image['size_hint'] or ''
+            else:
+                picture = self.engine.render('img', src=f"{self.image_url_prefix}/{gallery['folder']}/{image['file']}", alt=alt)
+                size_class = image['size_hint'] or ''
+
+            caption = captions.get(image['file'])
+            items.append(self.engine.render(
+                'gallery_item', size_class=size_class, picture=picture,
+                caption=self.engine.render('gallery_caption', text=caption) if caption else Markup('')
+            ))
+
+        return self.engine.render('gallery', gallery_id=gallery.get('id', f"{anchor}-gallery"), items=join(items))
+
+    def activity(self, activity: Dict, reviews: Optional[Dict] = None) -> Markup:
+        """
+        Activity card with highlights, pro tips, contact details and gallery
+
+        Args:
+            activity: Activity entry from the itinerary document
+            reviews: Mined review data for the activity's business, if any
+        """
+        anchor = activity.get('id') or slugify(activity['title'])
+        gallery = self.gallery(activity['gallery'], anchor) if activity.get('gallery') else Markup('')
+        inputs = {'activity': {k: v for k, v in activity.items() if k != 'gallery'},
+                  'reviews': reviews, 'gallery': gallery}
+        return self.fragments.render('activity', inputs,
+                                     lambda: self._render_activity(activity, reviews or {}, anchor, gallery))
+
+    def _render_activity(self, activity: Dict, reviews: Dict, anchor: str, gallery: Markup) -> Markup:
+        """Fill the activity card template"""
+        engine = self.engine
+        rating = activity.get('rating')
+        rating_html = engine.render('rating', stars=stars(rating['stars']), summary=rating.get('summary', '')) \
+            if rating else Markup('')
+
+        # Curated highlights win; mined must-try items fill in for restaurants
+        highlights = activity.get('highlights') or reviews.get('must_try_items', [])
+        highlights_html = engine.render(
+            'highlights', title=activity.get('highlights_title', 'MUST TRY'),
+            items=join(engine.render('highlight_item', text=item) for item in highlights)
+        ) if highlights else Markup('')
+
+        tips = activity.get('pro_tips') or reviews.get('pro_tips', [])[:1]
+        tips_html = engine.render('pro_tips', tips=join((escape(tip) for tip in tips), "<br>")) \
+            if tips else Markup('')
+
+        contact_items = []
+        for field, icon in CONTACT_ICONS.items():
+            value = (activity.get('contact') or {}).get(field)
+            if not value:
+                continue
+            if field == 'website':
+                content = engine.render('link', href=value, target=Markup(' target="_blank"'),
+                                        text=re.sub(r'^https?://(www\.)?', '', value).rstrip('/'))
+            elif field == 'phone':
+                content = engine.render('link', href=f"tel:{re.sub(r'[^0-9+]', '', value)}", target=Markup(''), text=value)
+            else:
+                content = engine.render('link', href=f"https://maps.google.com/?q={quote_plus(value)}",
+                                        target=Markup(' target="_blank"'), text=value)
+            contact_items.append(engine.render('contact_item', icon=icon, content=content))
+        contact_html = engine.render('contact', items=join(contact_items)) if contact_items else Markup('')
+
+        return engine.render(
+            'activity', anchor=anchor, time=activity.get('time', ''), title=activity['title'],
+            description=activity.get('description', ''), rating=rating_html, highlights=highlights_html,
+            pro_tips=tips_html, contact=contact_html, gallery=gallery
+        )
+
+    def day(self, day: Dict, activities: List[Markup]) -> Markup:
+        """Day section wrapping already-rendered activity cards"""
+        inputs = {'anchor': day['anchor'], 'title': day['title'], 'activities': activities}
+        return self.fragments.render('day', inputs, lambda: self.engine.render(
+            'day', anchor=day['anchor'], title=day['title'], activities=join(activities)
+        ))
+
+    def weather(self, forecast: Optional[Dict], title: str) -> Markup:
+        """Forecast section from a WeatherAPI forecast"""
+        days = [{
+            'name': day.get('day_name', day['date']),
+            'icon': WEATHER_EMOJI.get(str(day.get('icon', ''))[:2], '🌤️'),
+            'high': day['high'],
+            'low': day['low'],
+            'condition': day['condition'],
+            'humidity': day.get('humidity', '--'),
+            'wind': day.get('wind_speed', '--')
+        } for day in (forecast or {}).get('forecast', [])]
+        if not days:
+            return Markup('')
+
+        return self.fragments.render('weather', {'title': title, 'days': days}, lambda: self.engine.render(
+            'weather', title=title, days=join(self.engine.render('weather_day', **day) for day in days)
+        ))
+
+    def page(self, document: Dict, theme_href: str, header: Markup, navigation: Markup,
+             days: List[Markup], weather: Markup) -> Markup:
+        """Complete HTML document"""
+        title = document.get('page_title') or document.get('title', 'Itinerary')
+        return self.engine.render(
+            'page', title=title, theme_href=theme_href, base_css=Markup(BASE_CSS),
+            header=header, navigation=navigation, days=join(days, "\n\n"), weather=weather
+        )
+
+
+# Compiled once at import; the fingerprint invalidates cached fragments when a template changes
+TEMPLATES_ENGINE = TemplateEngine(TEMPLATES)
+TEMPLATES_FINGERPRINT = fingerprint(TEMPLATES, BASE_CSS)
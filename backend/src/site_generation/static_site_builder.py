@@ -0,0 +1,229 @@
+"""
+Static Site Builder Module - Builds itinerary pages from structured documents
+Pulls weather from WeatherAPI, mined review data from YelpReviewCurator,
+a hashed theme stylesheet from DESIGN_THEMES and gallery images from the image folders,
+then renders the page through the fragment cache so a rebuild after a
+small itinerary edit only re-renders the affected fragments
+"""
+
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import logging
+
+from backend.config.design_themes import (
+    DESIGN_THEMES, get_compiled_theme, suggest_theme_for_destination, write_theme_stylesheets
+)
+from backend.src.cache import atomic_write
+from backend.src.image_management.image_optimizer import STATE_NAME
+from backend.src.site_generation.html_generator import TEMPLATES_FINGERPRINT, HTMLGenerator, slugify
+from backend.src.site_generation.template_engine import FragmentCache
+
+logger = logging.getLogger(__name__)
+
+
+class StaticSiteBuilder:
+    """Renders itinerary documents into static HTML pages"""
+
+    def __init__(self, output_dir: str = "site", weather_api=None, review_curator=None,
+                 image_root: str = "santa-barbara-images",
+                 image_url_prefix: str = "./santa-barbara-images",
+                 responsive_manifest_path: Optional[str] = "site/responsive-images/manifest.json",
+                 optimized_state_path: Optional[str] = f"site/optimized-images/{STATE_NAME}",
+                 optimized_url_prefix: str = "optimized-images",
+                 state_dir: str = "backend/data/site_fragments", theme_dir: str = "themes"):
+        """
+        Args:
+            output_dir: Static site root pages are written to
+            weather_api: WeatherAPI instance; the weather section is omitted without one
+            review_curator: YelpReviewCurator instance for activities with a yelp_business_id
+            image_root: Folder holding one gallery folder per activity
+            image_url_prefix: URL of image_root as seen from the pages
+            responsive_manifest_path: Manifest from the responsive image stage, if generated
+            optimized_state_path: State of the image optimizer, if it has run
+            optimized_url_prefix: URL of the optimizer output folder as seen from the pages
+            state_dir: Where rendered fragments are kept between builds
+            theme_dir: Folder under output_dir for the content-hashed theme stylesheets
+        """
+        self.output_dir = output_dir
+        self.weather_api = weather_api
+        self.review_curator = review_curator
+        self.image_root = image_root
+        self.image_url_prefix = image_url_prefix
+        self.responsive_manifest_path = responsive_manifest_path
+        self.optimized_state_path = optimized_state_path
+        self.optimized_url_prefix = optimized_url_prefix
+        self.state_dir = state_dir
+        self.theme_dir = theme_dir
+
+    @staticmethod
+    def load_document(path: str) -> Dict:
+        """Read an itinerary document from a JSON file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _load_stage_output(path: Optional[str], label: str) -> Optional[Dict]:
+        """JSON written by an image stage (variant manifest, optimizer state), if that stage has run"""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {label} {path}: {e}")
+            return None
+
+    def _activities(self, document: Dict) -> List[Dict]:
+        """Every activity of every day, in order"""
+        return [activity for day in document.get('days', []) for activity in day.get('activities', [])]
+
+    def theme_for(self, document: Dict) -> str:
+        """Theme named by the document, or one suggested from its destination and activities"""
+        theme = document.get('theme')
+        if theme in DESIGN_THEMES:
+            return theme
+        if theme:
+            logger.warning(f"Unknown theme {theme}, suggesting one instead")
+        titles = [activity.get('title', '') for activity in self._activities(document)]
+        return suggest_theme_for_destination(document.get('destination', document.get('title', '')), titles)
+
+    def _fetch_forecast(self, document: Dict) -> Optional[Dict]:
+        """Forecast for the document's weather location, or None"""
+        if self.weather_api is None:
+            return None
+        location = document.get('weather', {}).get('location') or document.get('destination')
+        if not location:
+            return None
+        try:
+            return self.weather_api.get_forecast(location, days=min(len(document.get('days', [])) or 3, 5))
+        except Exception as e:
+            logger.warning(f"Building without weather for {location}: {e}")
+            return None
+
+    def _fetch_reviews(self, document: Dict) -> Dict[str, Dict]:
+        """Mined review data per Yelp business id referenced by the document"""
+        activities = [a for a in self._activities(document) if a.get('yelp_business_id')]
+        if self.review_curator is None or not activities:
+            return {}
+        menus = {a['yelp_business_id']: a['menu_items'] for a in activities if a.get('menu_items')}
+        try:
+            return self.review_curator.refresh_businesses([a['yelp_business_id'] for a in activities], menus)
+        except Exception as e:
+            logger.warning(f"Building without review data: {e}")
+            return {}
+
+    def forecast_snapshot(self, document: Dict) -> Optional[Dict]:
+        """The forecast a build of this document would render, for change detection"""
+        return self._fetch_forecast(document)
+
+    def build(self, document: Dict, output_name: str = "index.html",
+              forecast: Optional[Dict] = None) -> Dict:
+        """
+        Render an itinerary document to a page
+
+        Weather and reviews are fetched concurrently. Fragments whose inputs
+        are unchanged since the last build are reused, and the page is only
+        rewritten when its content changed.
+
+        Args:
+            document: Itinerary with title, subtitle, date_range, destination,
+                optional theme and weather settings, and days of activities
+            output_name: Page file name under output_dir
+            forecast: Forecast already fetched for this document; fetched when omitted
+
+        Returns:
+            Output path, whether it was rewritten, fragment counts and timing
+        """
+        started = time.perf_counter()
+        slug = document.get('slug') or slugify(document.get('title', 'itinerary'))
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            forecast_future = None if forecast else pool.submit(self._fetch_forecast, document)
+            reviews_future = pool.submit(self._fetch_reviews, document)
+            if forecast_future:
+                forecast = forecast_future.result()
+            reviews = reviews_future.result()
+
+        fragments = FragmentCache(os.path.join(self.state_dir, f"{slug}.json"), namespace=TEMPLATES_FINGERPRINT)
+        generator = HTMLGenerator(fragments, self.image_root, self.image_url_prefix,
+                                  self._load_stage_output(self.responsive_manifest_path, "responsive manifest"),
+                                  self._load_stage_output(self.optimized_state_path, "optimizer state"),
+                                  self.optimized_url_prefix)
+
+        days_html = []
+        nav_links = []
+        for day in document.get('days', []):
+            day = dict(day, anchor=day.get('id') or slugify(day['title']))
+            nav_links.append({'anchor': day['anchor'], 'label': day.get('label') or day['title'].title()})
+            activities = [
+                generator.activity(activity, reviews.get(activity.get('yelp_business_id')))
+                for activity in day.get('activities', [])
+            ]
+            days_html.append(generator.day(day, activities))
+
+        weather_title = document.get('weather', {}).get('title') or f"{len(days_html)}-DAY WEATHER FORECAST"
+        weather_html = generator.weather(forecast, weather_title)
+        if weather_html:
+            nav_links.append({'anchor': 'weather', 'label': 'Weather'})
+
+        # Stylesheets are named by content hash, so pages can link them with immutable caching
+        write_theme_stylesheets(os.path.join(self.output_dir, self.theme_dir))
+        theme_href = f"{self.theme_dir}/{get_compiled_theme(self.theme_for(document)).filename}"
+        page = generator.page(document, theme_href, generator.header(document),
+                              generator.navigation(nav_links), days_html, weather_html)
+
+        output_path = os.path.join(self.output_dir, output_name)
+        payload = page.encode('utf-8')
+        written = True
+        if os.path.exists(output_path):
+            with open(output_path, 'rb') as f:
+                written = f.read() != payload
+        if written:
+            os.makedirs(self.output_dir, exist_ok=True)
+            atomic_write(output_path, payload)
+        fragments.save()
+
+        return {
+            'output': output_path,
+            'written': written,
+            'rendered': fragments.stats['rendered'],
+            'reused': fragments.stats['reused'],
+            'seconds': time.perf_counter() - started
+        }
+
+
+if __name__ == "__main__":
+    from backend.src.data_collection.weather_api import WeatherAPI
+
+    example = {
+        "slug": "santa-barbara-preview",
+        "title": "SANTA BARBARA",
+        "subtitle": "A Coastal Weekend Escape",
+        "date_range": "August 30 - September 1, 2025",
+        "destination": "Santa Barbara, CA",
+        "days": [{
+            "id": "saturday",
+            "title": "SATURDAY",
+            "activities": [{
+                "id": "fishouse",
+                "time": "7:00 PM - Dinner",
+                "title": "Santa Barbara FisHouse",
+                "description": "Dine where local fishermen bring their catch straight from boat to table.",
+                "rating": {"stars": 4.2, "summary": "4.2/5 • 1,461 Reviews • Established 1999"},
+                "highlights": ["🦞 Lobster Mac & Cheese - 'Legendary!'", "🥣 Clam Chowder"],
+                "pro_tips": ["Fire pit patio seating fills up fast at sunset!"],
+                "contact": {"address": "101 E Cabrillo Blvd, Santa Barbara, CA 93101",
+                            "website": "https://www.fishousesb.com", "phone": "(805) 966-2418"},
+                "gallery": {"folder": "Saturday-1900-FisHouse", "id": "fishouse-gallery"}
+            }]
+        }]
+    }
+
+    builder = StaticSiteBuilder(output_dir="backend/data/site_preview", weather_api=WeatherAPI())
+    for attempt in ("first build", "rebuild"):
+        result = builder.build(example)
+        print(f"{attempt}: {result['rendered']} rendered, {result['reused']} reused, "
+              f"written={result['written']} in {result['seconds'] * 1000:.0f}ms -> {result['output']}")
@@ -0,0 +1,117 @@
+"""
+Template Engine Module - Precompiled HTML templates and a fragment cache
+Templates are compiled once into string.Template objects and values are
+HTML-escaped unless marked as Markup. Rendered fragments are cached by a
+fingerprint of their inputs so a rebuild only re-renders what changed.
+"""
+
+import os
+import json
+import html
+import hashlib
+from string import Template
+from typing import Callable, Dict, Iterable, Optional
+import logging
+
+from backend.src.cache import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class Markup(str):
+    """HTML that is already safe and must not be escaped again"""
+
+
+def escape(value) -> Markup:
+    """Escape a value for HTML text or a quoted attribute"""
+    if isinstance(value, Markup):
+        return value
+    return Markup(html.escape('' if value is None else str(value), quote=True))
+
+
+def join(fragments: Iterable[str], separator: str = "\n") -> Markup:
+    """Concatenate rendered fragments"""
+    return Markup(separator.join(fragments))
+
+
+def fingerprint(*parts) -> str:
+    """Stable short hash of JSON-serializable inputs"""
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:20]
+
+
+class TemplateEngine:
+    """Named templates compiled once and rendered with auto-escaping"""
+
+    def __init__(self, templates: Dict[str, str]):
+        """
+        Args:
+            templates: Template name -> string.Template source using $name placeholders
+
+        Raises:
+            ValueError: A template has an invalid placeholder
+        """
+        self._compiled = {}
+        self._fields = {}
+        for name, source in templates.items():
+            template = Template(source)
+            if not template.is_valid():
+                raise ValueError(f"Template {name} has an invalid placeholder")
+            self._compiled[name] = template
+            self._fields[name] = set(template.get_identifiers())
+
+    def render(self, name: str, /, **values) -> Markup:
+        """
+        Render a template; values are escaped unless they are Markup
+
+        Raises:
+            KeyError: A placeholder of the template has no value
+        """
+        fields = self._fields[name]
+        missing = fields - values.keys()
+        if missing:
+            raise KeyError(f"Template {name} is missing {', '.join(sorted(missing))}")
+        return Markup(self._compiled[name].substitute({key: escape(values[key]) for key in fields}))
+
+
+class FragmentCache:
+    """Rendered fragments keyed by the fingerprint of their inputs, persisted between builds"""
+
+    def __init__(self, path: Optional[str] = None, namespace: str = ''):
+        """
+        Args:
+            path: JSON file the cache is loaded from and saved to; None keeps it in memory
+            namespace: Mixed into every key, e.g. a fingerprint of the templates,
+                so changing a template invalidates its fragments
+        """
+        self.path = path
+        self.namespace = namespace
+        self._fragments = {}
+        self._used = set()
+        self.stats = {'rendered': 0, 'reused': 0}
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    self._fragments = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable fragment cache {path}: {e}")
+
+    def render(self, kind: str, inputs, render: Callable[[], str]) -> Markup:
+        """Return the cached fragment for these inputs, rendering it only on a miss"""
+        key = f"{kind}:{fingerprint(self.namespace, kind, inputs)}"
+        self._used.add(key)
+        if key in self._fragments:
+            self.stats['reused'] += 1
+            return Markup(self._fragments[key])
+
+        self.stats['rendered'] += 1
+        fragment = self._fragments[key] = str(render())
+        return Markup(fragment)
+
+    def save(self):
+        """Persist fragments used by this build, dropping the rest"""
+        self._fragments = {key: value for key, value in self._fragments.items() if key in self._used}
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            atomic_write(self.path, json.dumps(self._fragments, separators=(',', ':')).encode('utf-8'))
@@ -0,0 +1,173 @@
+"""
+Tests for the shared response cache and fetch coalescing
+Run from the repository root: python -m pytest backend/tests
+"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from backend.src.cache import DISK_RESCAN_WRITES, LOCK_STRIPES, ResponseCache, SingleFlight
+
+
+def cache_files(cache_dir):
+    """Cache entry files on disk"""
+    return sorted(name for name in os.listdir(cache_dir) if name.endswith('.json'))
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_calls_share_one_run(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        runs = []
+
+        def fetch():
+            runs.append(1)
+            started.set()
+            release.wait(5)
+            return {'temp': 72}
+
+        results = []
+
+        def call():
+            results.append(flight.do('sb', fetch))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=call) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        time.sleep(0.2)  # Let the followers reach do() while the leader is blocked
+        self.assertTrue(flight.in_flight('sb'))
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        self.assertEqual(len(runs), 1)
+        self.assertEqual([result for result, _ in results], [{'temp': 72}] * 5)
+        self.assertEqual(sorted(shared for _, shared in results), [False] + [True] * 4)
+        self.assertFalse(flight.in_flight('sb'))
+
+    def test_error_reaches_every_caller_and_is_not_cached(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("upstream down")
+
+        with self.assertRaises(ValueError):
+            flight.do('sb', fail)
+        self.assertEqual(flight.do('sb', lambda: {'temp': 70}), ({'temp': 70}, False))
+
+    def test_keys_run_independently(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do('a', lambda: {'v': 1})[0], {'v': 1})
+        self.assertEqual(flight.do('b', lambda: {'v': 2})[0], {'v': 2})
+
+
+class ResponseCacheEvictionTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_disk_keeps_most_recently_used_within_entry_budget(self):
+        cache = ResponseCache(self.cache_dir, max_disk_entries=3)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, {'key': key})
+        cache.get('a')  # a is now more recent than b
+        cache.set('d', {'key': 'd'})
+
+        self.assertEqual(cache_files(self.cache_dir), ['a.json', 'c.json', 'd.json'])
+        self.assertEqual(cache.stats['disk_evictions'], 1)
+
+    def test_disk_byte_budget(self):
+        cache = ResponseCache(self.cache_dir, max_disk_bytes=250)
+        for i in range(10):
+            cache.set(f'k{i}', {'padding': 'x' * 80})
+
+        sizes = [os.path.getsize(os.path.join(self.cache_dir, name)) for name in cache_files(self.cache_dir)]
+        self.assertLessEqual(sum(sizes), 250)
+        self.assertIn('k9.json', cache_files(self.cache_dir))
+
+    def test_memory_tier_is_lru_bounded(self):
+        cache = ResponseCache(self.cache_dir, max_memory_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, {'key': key})
+
+        self.assertEqual(list(cache._memory), ['b', 'c'])
+        self.assertEqual(cache.stats['memory_evictions'], 1)
+        # The evicted entry is still served from disk
+        self.assertEqual(cache.get('a'), {'key': 'a'})
+        self.assertEqual(cache.stats['disk_hits'], 1)
+
+    def test_expired_entries_are_only_served_stale(self):
+        cache = ResponseCache(self.cache_dir, ttl=60)
+        cache.set('sb', {'temp': 72})
+        past = time.time() - 120
+        os.utime(os.path.join(self.cache_dir, 'sb.json'), (past, past))
+        cache._memory.clear()
+
+        self.assertIsNone(cache.get('sb'))
+        self.assertEqual(cache.get_stale('sb', 3600), {'temp': 72})
+        self.assertIsNone(cache.get_stale('sb', 30))
+
+    def test_clear_removes_every_file(self):
+        cache = ResponseCache(self.cache_dir)
+        cache.set('a', {})
+        cache.set('b', {})
+        cache.clear()
+
+        self.assertEqual(cache_files(self.cache_dir), [])
+        self.assertIsNone(cache.get('a'))
+
+
+class ResponseCacheSharingTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_corrupted_entry_is_quarantined_and_missed(self):
+        cache = ResponseCache(self.cache_dir)
+        cache.set('sb', {'temp': 72})
+        with open(os.path.join(self.cache_dir, 'sb.json'), 'w') as f:
+            f.write('{"temp": 7')
+        cache._memory.clear()
+
+        self.assertIsNone(cache.get('sb'))
+        self.assertEqual(cache.stats['quarantined'], 1)
+        self.assertEqual(cache_files(self.cache_dir), [])
+        self.assertEqual(len(os.listdir(cache.quarantine_dir)), 1)
+
+    def test_writes_leave_no_temp_files(self):
+        cache = ResponseCache(self.cache_dir)
+        for i in range(5):
+            cache.set('sb', {'version': i})
+
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ['.locks', 'quarantine', 'sb.json'])
+        self.assertEqual(ResponseCache(self.cache_dir).get('sb'), {'version': 4})
+
+    def test_disk_budget_is_shared_by_caches_on_one_directory(self):
+        # Two instances stand in for two worker processes; each re-scans the
+        # directory at the latest every DISK_RESCAN_WRITES writes
+        first = ResponseCache(self.cache_dir, max_disk_entries=10)
+        second = ResponseCache(self.cache_dir, max_disk_entries=10)
+        for i in range(10):
+            first.set(f'first{i}', {})
+        for i in range(DISK_RESCAN_WRITES):
+            second.set(f'second{i}', {})
+
+        self.assertEqual(len(cache_files(self.cache_dir)), 10)
+        self.assertLessEqual(len(os.listdir(os.path.join(self.cache_dir, '.locks'))), LOCK_STRIPES + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
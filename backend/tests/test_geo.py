@@ -0,0 +1,56 @@
+"""
+Tests for location resolution and geohash bucketing
+Run from the repository root: python -m pytest backend/tests
+"""
+
+import unittest
+
+from backend.config.locations import KNOWN_LOCATIONS
+from backend.src.data_collection.geo import (
+    geohash_center, geohash_encode, normalize_location_name, parse_coordinates, resolve_coordinates
+)
+
+
+class GeohashTest(unittest.TestCase):
+    def test_known_value(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+
+    def test_nearby_stops_share_a_cell(self):
+        downtown = geohash_encode(*KNOWN_LOCATIONS["santa barbara"])
+        station = geohash_encode(*KNOWN_LOCATIONS["santa barbara amtrak station"])
+        self.assertEqual(downtown, station)
+
+    def test_distant_points_do_not_share_a_cell(self):
+        self.assertNotEqual(geohash_encode(34.4208, -119.6982), geohash_encode(34.0522, -118.2437))
+
+    def test_precision_sets_cell_size(self):
+        coarse = geohash_encode(34.4208, -119.6982, 4)
+        fine = geohash_encode(34.4208, -119.6982, 7)
+        self.assertTrue(fine.startswith(coarse))
+
+    def test_center_lies_in_its_cell(self):
+        for lat, lon in [(34.4208, -119.6982), (-33.8688, 151.2093), (0.0, 0.0)]:
+            cell = geohash_encode(lat, lon)
+            center = geohash_center(cell)
+            self.assertEqual(geohash_encode(*center), cell)
+            self.assertLess(abs(center[0] - lat), 0.05)
+            self.assertLess(abs(center[1] - lon), 0.05)
+
+
+class ResolveCoordinatesTest(unittest.TestCase):
+    def test_parses_pairs_and_strings(self):
+        self.assertEqual(parse_coordinates((34.42, -119.69)), (34.42, -119.69))
+        self.assertEqual(parse_coordinates(" 34.42 , -119.69 "), (34.42, -119.69))
+        self.assertIsNone(parse_coordinates("Santa Barbara"))
+
+    def test_resolves_names_with_state_suffix(self):
+        self.assertEqual(resolve_coordinates("Santa Barbara, CA", KNOWN_LOCATIONS),
+                         KNOWN_LOCATIONS["santa barbara"])
+        self.assertIsNone(resolve_coordinates("Atlantis", KNOWN_LOCATIONS))
+
+    def test_normalizes_names(self):
+        self.assertEqual(normalize_location_name("  Santa   Barbara Zoo! "), "santa barbara zoo")
+
+
+if __name__ == "__main__":
+    unittest.main()
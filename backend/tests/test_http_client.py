@@ -0,0 +1,121 @@
+"""
+Tests for the upstream client's circuit breaker
+Run from the repository root: python -m pytest backend/tests
+"""
+
+import time
+import unittest
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Answers every GET with the next queued status code, or raises it if it is an exception"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+@unittest.skipUnless(requests, "requests is not installed")
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        from backend.src.data_collection.http_client import CircuitBreaker
+
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+
+    def test_trips_after_consecutive_failures(self):
+        self.assertFalse(self.breaker.record_failure())
+        self.assertFalse(self.breaker.record_failure())
+        self.assertTrue(self.breaker.record_failure())
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_the_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.assertFalse(self.breaker.record_failure())
+        self.assertEqual(self.breaker.state, 'closed')
+
+    def test_half_open_allows_one_trial_and_recovers(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        time.sleep(0.06)
+
+        self.assertEqual(self.breaker.state, 'half_open')
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_trial_reopens(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        time.sleep(0.06)
+
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.record_failure())
+        self.assertEqual(self.breaker.state, 'open')
+
+
+@unittest.skipUnless(requests, "requests is not installed")
+class UpstreamClientBreakerTest(unittest.TestCase):
+    def setUp(self):
+        from backend.src.data_collection.http_client import UpstreamClient
+
+        self.client = UpstreamClient("https://api.example.com", rate_per_minute=60000, burst=100,
+                                     max_retries=0, failure_threshold=2, reset_timeout=0.05)
+
+    def test_trips_short_circuits_and_recovers(self):
+        from backend.src.data_collection.http_client import CircuitOpenError
+
+        self.client.session = FakeSession([503, 503, 200])
+        for _ in range(2):
+            with self.assertRaises(requests.HTTPError):
+                self.client.get("/forecast")
+        with self.assertRaises(CircuitOpenError):
+            self.client.get("/forecast")
+        self.assertEqual(self.client.session.calls, 2)
+        self.assertEqual(self.client.stats['trips'], 1)
+        self.assertEqual(self.client.stats['short_circuits'], 1)
+
+        time.sleep(0.06)
+        self.assertEqual(self.client.get("/forecast").status_code, 200)
+        self.assertEqual(self.client.breaker.state, 'closed')
+
+    def test_unexpected_error_releases_the_trial(self):
+        self.client.session = FakeSession([503, 503, ValueError("bad"), 200])
+        for _ in range(2):
+            with self.assertRaises(requests.HTTPError):
+                self.client.get("/forecast")
+        time.sleep(0.06)
+
+        with self.assertRaises(ValueError):
+            self.client.get("/forecast")
+        time.sleep(0.06)
+        self.assertEqual(self.client.get("/forecast").status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+"""
+Tests for the review mining text analysis
+Run from the repository root: python -m pytest backend/tests
+"""
+
+import unittest
+
+from backend.src.data_collection.review_mining import is_positive, mine_business, normalize_token, tokenize
+
+
+class NormalizeTokenTest(unittest.TestCase):
+    def test_folds_plurals(self):
+        self.assertEqual(normalize_token("tacos"), "taco")
+        self.assertEqual(normalize_token("oysters"), "oyster")
+
+    def test_keeps_words_that_only_end_in_s(self):
+        for word in ("delicious", "this", "glass", "octopus"):
+            self.assertEqual(normalize_token(word), word)
+
+
+class DeliciousReviewTest(unittest.TestCase):
+    def test_delicious_is_positive(self):
+        self.assertTrue(is_positive(tokenize("The clam chowder was delicious.")))
+
+    def test_delicious_reviews_rank_the_dish(self):
+        reviews = [
+            {"id": "1", "rating": 5, "text": "The clam chowder was delicious."},
+            {"id": "2", "rating": 4, "text": "Clam chowder here is delicious."},
+        ]
+        must_try = mine_business(reviews)["must_try_items"]
+        self.assertEqual(len(must_try), 1)
+        self.assertIn("Clam Chowder", must_try[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
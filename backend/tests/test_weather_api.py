@@ -0,0 +1,61 @@
+"""
+Tests for the weather forecast daily summaries
+Run from the repository root: python -m pytest backend/tests
+"""
+
+import random
+import unittest
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+CONDITIONS = [
+    {'main': 'Clear', 'icon': '01d', 'description': 'clear sky'},
+    {'main': 'Clouds', 'icon': '03d', 'description': 'scattered clouds'},
+    {'main': 'Rain', 'icon': '10d', 'description': 'light rain'},
+    {'main': 'Fog', 'icon': '50d', 'description': 'fog'},
+]
+
+
+def three_hour_series(rng: random.Random):
+    """Forecast items every 3 hours from a random start, so the first and last days are partial"""
+    start = int(datetime(2024, rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23)).timestamp())
+    return [{
+        'dt': start + i * 3 * 3600,
+        'main': {'temp': round(rng.uniform(40, 95), 2), 'humidity': rng.randint(10, 100)},
+        'wind': {'speed': round(rng.uniform(0, 25), 2)},
+        'weather': [dict(rng.choice(CONDITIONS))]
+    } for i in range(rng.randint(1, 40))]
+
+
+@unittest.skipUnless(np is not None and requests is not None, "numpy and requests are required")
+class SummarizeDaysTest(unittest.TestCase):
+    def setUp(self):
+        from backend.src.data_collection.weather_api import WeatherAPI
+
+        # The summaries only read their arguments; skip the cache and client setup
+        self.api = WeatherAPI.__new__(WeatherAPI)
+
+    def test_vectorized_matches_python_on_random_series(self):
+        rng = random.Random(1234)
+        for _ in range(200):
+            items = three_hour_series(rng)
+            days = rng.randint(1, 7)
+            self.assertEqual(self.api._summarize_days_vectorized(items, days),
+                             self.api._summarize_days(items, days))
+
+    def test_single_item_day(self):
+        items = three_hour_series(random.Random(7))[:1]
+        self.assertEqual(self.api._summarize_days_vectorized(items, 5), self.api._summarize_days(items, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
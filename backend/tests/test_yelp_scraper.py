@@ -0,0 +1,85 @@
+"""
+Tests for the Yelp review refresh path
+Run from the repository root: python -m pytest backend/tests
+"""
+
+import os
+import tempfile
+import unittest
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = headers or {}
+
+    def json(self):
+        return self._body
+
+
+class FakeClient:
+    """Serves one business's reviews with an ETag, honouring If-None-Match"""
+
+    def __init__(self, reviews):
+        self.reviews = reviews
+        self.calls = []
+
+    def get(self, path, params=None, headers=None):
+        self.calls.append(dict(headers or {}))
+        etag = f'"{len(self.reviews)}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, {"reviews": list(self.reviews)}, {"ETag": etag})
+
+
+@unittest.skipUnless(requests, "requests is not installed")
+class RefreshBusinessTest(unittest.TestCase):
+    def setUp(self):
+        from backend.src.data_collection.yelp_scraper import YelpReviewCurator
+
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.client = FakeClient([
+            {"id": "1", "rating": 5, "time_created": "2024-01-01 10:00:00",
+             "text": "The clam chowder was delicious."}
+        ])
+        self.curator = YelpReviewCurator("key", client=self.client)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_second_refresh_sees_new_review(self):
+        first = self.curator.refresh_business("shack")
+        self.assertEqual(first["new_reviews"], 1)
+
+        self.client.reviews.append({"id": "2", "rating": 4, "time_created": "2024-01-02 10:00:00",
+                                    "text": "Clam chowder here is delicious."})
+        second = self.curator.refresh_business("shack")
+
+        self.assertEqual(second["new_reviews"], 1)
+        self.assertEqual(self.client.calls[1].get("If-None-Match"), '"1"')
+
+    def test_unchanged_refresh_is_conditional(self):
+        self.curator.refresh_businesses(["shack"])
+        result = self.curator.refresh_businesses(["shack"])["shack"]
+
+        self.assertEqual(result["new_reviews"], 0)
+        self.assertEqual(len(self.client.calls), 2)
+        self.assertEqual(self.client.calls[1].get("If-None-Match"), '"1"')
+
+    def test_plain_reads_serve_fresh_cache(self):
+        self.curator.get_business_reviews("shack")
+        self.curator.get_business_reviews("shack")
+        self.assertEqual(len(self.client.calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
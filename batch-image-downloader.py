@@ -2,14 +2,40 @@
 """
 Batch image downloader for Santa Barbara locations
 Downloads images from official websites for multiple locations in parallel
+
+All locations share one HTTP session. Downloads are bounded by a global
+semaphore and a per-host connection limit, and bodies stream to disk in
+chunks through a temp file that is renamed into place.
+
+Each folder keeps a manifest.json of what it holds, so reruns revalidate
+existing images with conditional GETs, resume interrupted transfers with
+Range requests and reject duplicates before they are given a filename.
+
+New candidates are probed with a small ranged GET first, and only images
+whose header shows a usable size and shape for the gallery are downloaded.
+Probing stops once enough candidates qualify for the images still needed.
 """
 
 import asyncio
 import aiohttp
 import os
-import json
-from urllib.parse import urljoin, urlparse
-import re
+import codecs
+import hashlib
+from itertools import islice
+
+from backend.src.image_management.download_manifest import (
+    DownloadManifest, normalize_image_url, perceptual_hash
+)
+from backend.src.image_management.html_images import ImageCandidateParser
+from backend.src.image_management.image_probe import PROBE_BYTES, parse_image_header, rank_for_gallery
+
+# Concurrency limits shared across every location
+MAX_CONCURRENT_REQUESTS = 16
+MAX_CONNECTIONS_PER_HOST = 4
+CHUNK_SIZE = 64 * 1024
+# Qualifying candidates probed per image still needed; spares cover downloads
+# that fail or turn out to be duplicates
+PROBE_SPARES = 2
 
 # Configuration for each location
 LOCATIONS = {
@@ -81,114 +107,292 @@ LOCATIONS = {
     }
 }
 
-async def fetch_page(session, url):
-    """Fetch a web page and return its content"""
+async def fetch_page(session, semaphore, url):
+    """Stream a web page through the image parser and return its image candidates"""
+    parser = ImageCandidateParser(url)
     try:
-        async with session.get(url, timeout=10) as response:
-            if response.status == 200:
-                return await response.text()
+        async with semaphore:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status != 200:
+                    return []
+                decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    parser.feed(decoder.decode(chunk))
+                parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+        return parser.images
     except Exception as e:
         print(f"Error fetching {url}: {e}")
-    return ""
+    return []
 
-def extract_image_urls(html, base_url, keywords):
-    """Extract image URLs from HTML that match keywords"""
-    image_urls = []
-    
-    # Find all img tags
-    img_pattern = r'<img[^>]+src=["\']([^"\']+)["\'][^>]*>'
-    matches = re.findall(img_pattern, html, re.IGNORECASE)
+def extract_image_urls(images, keywords):
+    """Keep image candidates that match keywords or look like photos"""
+    selected = []
     
-    # Also find background images
-    bg_pattern = r'background-image:\s*url\(["\']?([^"\')\s]+)["\']?\)'
-    bg_matches = re.findall(bg_pattern, html, re.IGNORECASE)
-    
-    # Also find data-src (lazy loading)
-    data_src_pattern = r'data-src=["\']([^"\']+)["\']'
-    data_matches = re.findall(data_src_pattern, html, re.IGNORECASE)
-    
-    all_urls = matches + bg_matches + data_matches
-    
-    for url in all_urls:
-        # Make absolute URL
-        absolute_url = urljoin(base_url, url)
+    for image in images:
+        url = image.url.lower()
         
         # Filter out logos, icons, and small images
-        if any(skip in absolute_url.lower() for skip in ['logo', 'icon', 'button', 'arrow']):
+        if any(skip in url for skip in ['logo', 'icon', 'button', 'arrow']):
             continue
             
         # Check if URL contains any keywords or is a general image
-        if any(keyword in absolute_url.lower() for keyword in keywords) or \
-           any(ext in absolute_url.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp']):
-            image_urls.append(absolute_url)
+        if any(keyword in url for keyword in keywords) or \
+           any(ext in url for ext in ['.jpg', '.jpeg', '.png', '.webp']):
+            selected.append(image)
+    
+    return selected
+
+def _total_size(response):
+    """Full resource size from Content-Range, or Content-Length on a 200"""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range and content_range.rsplit('/', 1)[1].isdigit():
+        return int(content_range.rsplit('/', 1)[1])
+    length = response.headers.get('Content-Length', '')
+    return int(length) if response.status == 200 and length.isdigit() else None
+
+async def probe_image(session, semaphore, url):
+    """
+    Read just the start of an image to learn its size, format and dimensions
     
-    # Remove duplicates and return
-    return list(set(image_urls))
+    Uses a ranged GET so one request returns both the total size and the
+    header bytes; servers that ignore Range are cut off after PROBE_BYTES.
+    """
+    try:
+        async with semaphore:
+            headers = {'Range': f"bytes=0-{PROBE_BYTES - 1}"}
+            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status not in (200, 206):
+                    return None
+                # read() returns whatever one network chunk holds; JPEG headers
+                # behind a large EXIF block need the full probe window
+                try:
+                    head = await response.content.readexactly(PROBE_BYTES)
+                except asyncio.IncompleteReadError as e:
+                    head = e.partial
+                return {
+                    'url': url,
+                    'bytes': _total_size(response),
+                    'info': parse_image_header(head)
+                }
+    except Exception as e:
+        print(f"Error probing {url}: {e}")
+    return None
 
-async def download_image(session, url, filepath):
-    """Download an image from URL to filepath"""
+def _write_chunk(f, digest, chunk):
+    """Append a chunk to the open file and the running hash"""
+    f.write(chunk)
+    digest.update(chunk)
+
+def _hash_prefix(path):
+    """SHA-256 state primed with the bytes of a partial download"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest
+
+async def download_image(session, semaphore, manifest, url, entry=None):
+    """
+    Stream an image into its partial file, writing off the event loop
+    
+    Sends If-None-Match/If-Modified-Since when revalidating a manifest entry
+    and a Range request when a partial file from an earlier run can resume.
+    Returns ('unchanged', None), ('downloaded', info) or ('failed', None).
+    """
+    key = normalize_image_url(url)
+    part_path = manifest.partial_path(key)
+    headers = manifest.conditional_headers(entry) if entry else {}
+    
+    offset = 0
+    validator = manifest.resume_validator(key)
+    if validator and os.path.exists(part_path):
+        offset = os.path.getsize(part_path)
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = validator
+    
+    resumable = False
     try:
-        async with session.get(url, timeout=30) as response:
-            if response.status == 200:
-                content = await response.read()
-                with open(filepath, 'wb') as f:
-                    f.write(content)
-                return True
+        async with semaphore:
+            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status == 304:
+                    return 'unchanged', None
+                if response.status == 200:
+                    offset = 0
+                elif response.status != 206 or not offset:
+                    return 'failed', None
+                
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if etag or last_modified:
+                    resumable = True
+                    manifest.record_partial(key, url, etag, last_modified)
+                    await asyncio.to_thread(manifest.save)
+                
+                digest = await asyncio.to_thread(_hash_prefix, part_path) if offset else hashlib.sha256()
+                f = await asyncio.to_thread(open, part_path, 'ab' if offset else 'wb')
+                try:
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        await asyncio.to_thread(_write_chunk, f, digest, chunk)
+                finally:
+                    await asyncio.to_thread(f.close)
+        
+        return 'downloaded', {
+            'path': part_path,
+            'url': url,
+            'key': key,
+            'etag': etag,
+            'last_modified': last_modified,
+            'size': await asyncio.to_thread(os.path.getsize, part_path),
+            'sha256': digest.hexdigest(),
+            'dhash': await asyncio.to_thread(perceptual_hash, part_path)
+        }
     except Exception as e:
         print(f"Error downloading {url}: {e}")
-    return False
+        # Keep the partial file for a Range resume when the server gave us a validator
+        if not resumable and os.path.exists(part_path):
+            os.remove(part_path)
+    return 'failed', None
 
-async def process_location(location_name, config):
+async def _revalidate(session, semaphore, manifest, filename, entry):
+    """Refresh one manifest image; returns True if its file changed or was dropped"""
+    status, info = await download_image(session, semaphore, manifest, entry['url'], entry)
+    if status != 'downloaded':
+        return False
+    
+    if info['sha256'] == entry['sha256']:
+        os.remove(info['path'])
+        manifest.record(filename, info['url'], info['key'], info['etag'], info['last_modified'],
+                        info['size'], info['sha256'], info['dhash'])
+        return False
+    
+    if not _accept(manifest, None, info, filename):
+        # The new content repeats another image; free the slot for a fresh download
+        os.remove(os.path.join(manifest.folder, filename))
+        manifest.remove(filename)
+    return True
+
+def _accept(manifest, start_num, info, filename=None):
+    """
+    Move a finished download into a slot unless it duplicates another image
+    
+    Takes the next free slot from start_num, or replaces filename when
+    refreshing an existing image (which is then left out of the duplicate
+    check). Returns the filename, or None for a duplicate.
+    """
+    duplicate = manifest.find_duplicate(info['sha256'], info['dhash'], exclude=filename)
+    if duplicate:
+        manifest.reject(info['key'], duplicate)
+        os.remove(info['path'])
+        print(f"  Skipped {info['url'][:50]}... (duplicate of {duplicate})")
+        return None
+    
+    filename = filename or manifest.next_filename(start_num)
+    os.replace(info['path'], os.path.join(manifest.folder, filename))
+    manifest.record(filename, info['url'], info['key'], info['etag'], info['last_modified'],
+                    info['size'], info['sha256'], info['dhash'])
+    return filename
+
+async def process_location(session, semaphore, location_name, config):
     """Process a single location - fetch pages and download images"""
     print(f"\nProcessing {location_name}...")
     
     # Create folder if it doesn't exist
     os.makedirs(config['folder'], exist_ok=True)
+    manifest = DownloadManifest(config['folder'])
+    await asyncio.to_thread(manifest.load)
+    
+    # Revalidate images from earlier runs with conditional GETs; without an
+    # ETag or Last-Modified that would re-download every image on every run
+    existing = {filename: entry for filename, entry in manifest.downloaded_items().items()
+                if manifest.conditional_headers(entry)}
+    if existing:
+        changed = await asyncio.gather(*(
+            _revalidate(session, semaphore, manifest, filename, entry)
+            for filename, entry in existing.items()
+        ))
+        print(f"  Revalidated {len(existing)} images, {sum(changed)} changed")
+    
+    # Revalidation may have freed slots, so count what is missing only now
+    needed = config['needed'] - manifest.downloaded_count()
+    if needed <= 0:
+        await asyncio.to_thread(manifest.save)
+        print(f"  {location_name} already has its {config['needed']} images")
+        return
+    
+    # Fetch all URLs for this location in parallel
+    pages = await asyncio.gather(*(fetch_page(session, semaphore, url) for url in config['urls']))
+    all_images = []
+    for url, images in zip(config['urls'], pages):
+        if images:
+            selected = extract_image_urls(images, config['keywords'])
+            all_images.extend(selected)
+            print(f"    {url}: found {len(selected)} images")
+    
+    # Collapse CDN size variants onto the widest one seen, and drop anything
+    # the manifest already holds or rejected
+    known = manifest.known_keys()
+    candidates = {}
+    for image in all_images:
+        key = normalize_image_url(image.url)
+        if key in known:
+            continue
+        if key not in candidates or (image.width or 0) > (candidates[key].width or 0):
+            candidates[key] = image
+    print(f"  Total new unique images found: {len(candidates)}")
     
-    async with aiohttp.ClientSession() as session:
-        # Fetch all URLs for this location
-        all_image_urls = []
-        for url in config['urls']:
-            print(f"  Fetching {url}...")
-            html = await fetch_page(session, url)
-            if html:
-                image_urls = extract_image_urls(html, url, config['keywords'])
-                all_image_urls.extend(image_urls)
-                print(f"    Found {len(image_urls)} images")
+    # Probe headers in batches only until enough candidates suit the gallery,
+    # then download the best fits in waves sized to the images still needed
+    downloaded = 0
+    probed = 0
+    ranked = []
+    unprobed = iter(candidates.values())
+    
+    while downloaded < needed:
+        short = needed - downloaded
+        while sum(1 for probe in ranked if probe['info']) < short * PROBE_SPARES:
+            batch = list(islice(unprobed, short * PROBE_SPARES))
+            if not batch:
+                break
+            probes = await asyncio.gather(*(probe_image(session, semaphore, image.url) for image in batch))
+            probed += len(batch)
+            ranked = rank_for_gallery(ranked + [probe for probe in probes if probe])
         
-        # Remove duplicates
-        all_image_urls = list(set(all_image_urls))
-        print(f"  Total unique images found: {len(all_image_urls)}")
+        wave, ranked = ranked[:short], ranked[short:]
+        if not wave:
+            break
         
-        # Download needed images
-        downloaded = 0
-        image_num = config['start_num']
+        results = await asyncio.gather(*(
+            download_image(session, semaphore, manifest, probe['url']) for probe in wave
+        ))
         
-        for url in all_image_urls:
-            if downloaded >= config['needed']:
-                break
-                
-            filepath = os.path.join(config['folder'], f"image{image_num}.jpg")
-            print(f"  Downloading image{image_num}.jpg from {url[:50]}...")
-            
-            success = await download_image(session, url, filepath)
-            if success:
+        for status, info in results:
+            if status != 'downloaded':
+                continue
+            filename = _accept(manifest, config['start_num'], info)
+            if filename:
+                print(f"  Downloaded {filename} from {info['url'][:50]}...")
                 downloaded += 1
-                image_num += 1
-            
-        print(f"  Downloaded {downloaded} images for {location_name}")
+        
+        await asyncio.to_thread(manifest.save)
+    
+    print(f"  Probed {probed} of {len(candidates)} candidates")
+    await asyncio.to_thread(manifest.save)
+    print(f"  Downloaded {downloaded} images for {location_name}")
 
 async def main():
     """Main function to process all locations"""
     print("Starting batch image download for Santa Barbara locations...")
     
-    # Process all locations concurrently
-    tasks = []
-    for location_name, config in LOCATIONS.items():
-        task = process_location(location_name, config)
-        tasks.append(task)
-    
-    await asyncio.gather(*tasks)
+    # Process all locations concurrently over one shared session
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_REQUESTS, limit_per_host=MAX_CONNECTIONS_PER_HOST)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(
+            process_location(session, semaphore, location_name, config)
+            for location_name, config in LOCATIONS.items()
+        ))
     
     print("\nAll locations processed!")
     
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Incremental build of the Santa Barbara itinerary site
+
+Usage: python build-site.py [itinerary.json] [--no-download] [--optimize] [--force] [--only node,...]
+
+Runs downloads, placeholders, responsive variants and the HTML page (with
+its hashed theme stylesheet) as one build graph. The responsive variants
+already give every gallery image WebP/AVIF sources, so the standalone
+optimizer renditions only run with --optimize. Each
+step is skipped when its inputs (LOCATIONS, placeholder captions, source
+images, theme, templates, forecast) hash the same as on the last
+successful run, and independent steps run in parallel. State is kept in
+backend/data/build_state.json.
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+import importlib.util
+import logging
+from functools import lru_cache
+
+from backend.config.design_themes import COMPILED_THEMES, get_compiled_theme
+from backend.src.image_management.download_manifest import MANIFEST_NAME, DownloadManifest
+from backend.src.image_management.image_optimizer import ImageOptimizer
+from backend.src.image_management.image_pipeline import SOURCE_EXTENSIONS
+from backend.src.image_management.placeholder_generator import PlaceholderGenerator
+from backend.src.image_management.responsive_images import ResponsiveImageGenerator
+from backend.src.site_generation.build_graph import BuildGraph, BuildNode
+from backend.src.site_generation.html_generator import TEMPLATES_FINGERPRINT
+from backend.src.site_generation.static_site_builder import StaticSiteBuilder
+
+IMAGE_ROOT = "santa-barbara-images"
+SITE_DIR = "site"
+
+@lru_cache(maxsize=None)
+def load_script(path):
+    """Import one of the top-level scripts for its config and entry point"""
+    spec = importlib.util.spec_from_file_location(path.replace('-', '_')[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def folder_manifests(hasher, config):
+    """Download manifests of every configured folder, so deleted or edited images re-trigger a run"""
+    return {name: hasher.file(f"{location['folder']}/{MANIFEST_NAME}") for name, location in config.items()}
+
+def downloads_complete(config):
+    """Whether every configured folder holds as many downloaded images as it needs"""
+    for location in config.values():
+        manifest = DownloadManifest(location['folder'])
+        if os.path.isdir(location['folder']):
+            manifest.load()
+        if manifest.downloaded_count() < location['needed']:
+            return False
+    return True
+
+def weather_api():
+    """WeatherAPI for the page's forecast section"""
+    from backend.src.data_collection.weather_api import WeatherAPI
+    return WeatherAPI()
+
+def build_graph(document_path=None, download=True, optimize=False):
+    """Wire the site build steps into a graph"""
+    graph = BuildGraph()
+    source_deps = []
+
+    if download:
+        graph.add(BuildNode(
+            'downloads',
+            action=lambda: asyncio.run(load_script('batch-image-downloader.py').main()),
+            inputs=lambda hasher: {
+                'locations': load_script('batch-image-downloader.py').LOCATIONS,
+                'manifests': folder_manifests(hasher, load_script('batch-image-downloader.py').LOCATIONS)
+            },
+            # Offline runs leave folders short; try again next build instead of settling
+            complete=lambda: downloads_complete(load_script('batch-image-downloader.py').LOCATIONS)
+        ))
+        # simple-batch-downloader.py is left out: it curls over the same imageN slots
+        # this downloader records in its manifests, so the two would keep swapping them
+        source_deps = ['downloads']
+
+    # Downloads and placeholders share imageN slots; placeholders fill what downloads left empty
+    image_folders = load_script('create-placeholder-images.py').image_folders
+    placeholders = PlaceholderGenerator(IMAGE_ROOT, size_class_dir=f"{SITE_DIR}/placeholders")
+    graph.add(BuildNode(
+        'placeholders',
+        action=lambda: placeholders.generate(image_folders),
+        deps=source_deps,
+        inputs=lambda hasher: {
+            'folders': image_folders,
+            'size': placeholders.size,
+            'font_size': placeholders.font_size,
+            'formats': placeholders.size_class_formats
+        },
+        outputs=[f"{IMAGE_ROOT}/{folder}/image{i + 1}.jpg"
+                 for folder, captions in image_folders.items() for i in range(len(captions))]
+    ))
+
+    optimizer = ImageOptimizer(IMAGE_ROOT)
+    html_deps = ['responsive']
+    if optimize:
+        graph.add(BuildNode(
+            'optimize',
+            action=optimizer.run,
+            inputs=lambda hasher: {'sources': hasher.tree(IMAGE_ROOT, SOURCE_EXTENSIONS), 'settings': optimizer.settings},
+            deps=['placeholders'],
+            outputs=[optimizer.state_path]
+        ))
+        html_deps.append('optimize')
+
+    responsive = ResponsiveImageGenerator(IMAGE_ROOT, SITE_DIR)
+    graph.add(BuildNode(
+        'responsive',
+        action=responsive.run,
+        inputs=lambda hasher: {'sources': hasher.tree(IMAGE_ROOT, SOURCE_EXTENSIONS), 'settings': responsive.settings},
+        deps=['placeholders'],
+        outputs=[responsive.manifest_path]
+    ))
+
+    if document_path:
+        builder = StaticSiteBuilder(SITE_DIR, weather_api=weather_api(), image_root=IMAGE_ROOT,
+                                    image_url_prefix=f"./{IMAGE_ROOT}",
+                                    responsive_manifest_path=responsive.manifest_path,
+                                    optimized_state_path=optimizer.state_path)
+        # The forecast fetched for the fingerprint is the one the page renders
+        snapshot = {}
+
+        def html_inputs(hasher):
+            document = builder.load_document(document_path)
+            snapshot['document'] = document
+            snapshot['forecast'] = builder.forecast_snapshot(document)
+            return {
+                'document': hasher.file(document_path),
+                'theme': get_compiled_theme(builder.theme_for(document)).hash,
+                'templates': TEMPLATES_FINGERPRINT,
+                # Daily entries only; last_updated changes on every fetch
+                'forecast': (snapshot['forecast'] or {}).get('forecast'),
+                'variants': hasher.file(responsive.manifest_path),
+                'renditions': hasher.file(optimizer.state_path),
+                'images': hasher.tree(IMAGE_ROOT, SOURCE_EXTENSIONS)
+            }
+
+        graph.add(BuildNode(
+            'html',
+            action=lambda: builder.build(snapshot['document'], forecast=snapshot['forecast']),
+            inputs=html_inputs,
+            deps=html_deps,
+            # The page links one of these; the builder writes them all
+            outputs=[f"{SITE_DIR}/index.html"] +
+                    [f"{SITE_DIR}/{builder.theme_dir}/{compiled.filename}" for compiled in COMPILED_THEMES.values()]
+        ))
+
+    return graph
+
+def parse_args(argv):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Incrementally build the itinerary site")
+    parser.add_argument('document', nargs='?', help="Itinerary JSON to render as site/index.html")
+    parser.add_argument('--no-download', dest='download', action='store_false',
+                        help="Skip the image downloader")
+    parser.add_argument('--optimize', action='store_true',
+                        help="Also build the standalone optimizer renditions")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if inputs are unchanged")
+    parser.add_argument('--only', type=lambda value: [name for name in value.split(',') if name],
+                        metavar='NODE[,NODE...]', help="Build only these nodes and their dependencies")
+    return parser, parser.parse_args(argv)
+
+def main(argv):
+    """Build whatever changed since the last run"""
+    parser, args = parse_args(argv)
+    graph = build_graph(args.document, download=args.download, optimize=args.optimize)
+    unknown = [name for name in args.only or [] if name not in graph.nodes]
+    if unknown:
+        parser.error(f"unknown build node {', '.join(unknown)} (choose from {', '.join(graph.nodes)})")
+
+    summary = graph.run(targets=args.only, force=args.force)
+
+    for name, result in summary['nodes'].items():
+        detail = f" ({result['error']})" if result['status'] == 'failed' else ""
+        print(f"  {name}: {result['status']} in {result['seconds'] * 1000:.0f}ms{detail}")
+    print(f"Build finished in {summary['seconds']:.2f}s")
+    return 1 if any(r['status'] in ('failed', 'blocked') for r in summary['nodes'].values()) else 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    sys.exit(main(sys.argv[1:]))
@@ -1,17 +1,15 @@
 #!/bin/bash
 
-# Compress all images in santa-barbara-images folder
+# Optimize all images in santa-barbara-images folder
+# Originals are left untouched; size-class renditions (progressive JPEG,
+# WebP and AVIF where supported) go to site/optimized-images, where the
+# gallery pages reference them, and unchanged sources are skipped on reruns
 echo "Compressing images..."
 
-# Find all jpg files and compress them
-find santa-barbara-images -name "*.jpg" -type f | while read file; do
-    echo "Compressing: $file"
-    # Resize to max 1200px width/height and compress to 85% quality
-    sips -Z 1200 --setProperty formatOptions 85 "$file" --out "$file" 2>/dev/null
-done
+python3 -m backend.src.image_management.image_optimizer santa-barbara-images site/optimized-images || exit 1
 
 echo "Compression complete!"
 
 # Show new folder size
 echo "New folder size:"
-du -sh santa-barbara-images/
\ No newline at end of file
+du -sh site/optimized-images/
@@ -1,8 +1,17 @@
 #!/usr/bin/env python3
-import os
-from PIL import Image, ImageDraw, ImageFont
-import requests
-from io import BytesIO
+"""
+Create captioned placeholder images for the Santa Barbara gallery folders
+
+Usage: python create-placeholder-images.py [base_dir] [--size-classes]
+
+Existing images are left alone. With --size-classes, SVG placeholders for
+every gallery size class are also written under site/placeholders.
+"""
+
+import sys
+import logging
+
+from backend.src.image_management.placeholder_generator import PlaceholderGenerator
 
 # Define image folders and their placeholder texts
 image_folders = {
@@ -20,47 +29,18 @@ image_folders = {
     "Hotel-Californian": ["Rooftop Pool", "Tan-Tan Bar", "Spanish Architecture", "Luxury Rooms"]
 }
 
-base_dir = "/Users/richard/Downloads/Travel/santa-barbara-images"
-
-# Create placeholder images
-for folder, captions in image_folders.items():
-    folder_path = os.path.join(base_dir, folder)
-    os.makedirs(folder_path, exist_ok=True)
+def main(argv):
+    """Create any missing placeholders"""
+    args = [arg for arg in argv if not arg.startswith('--')]
+    base_dir = args[0] if args else "santa-barbara-images"
+    size_class_dir = "site/placeholders" if '--size-classes' in argv else None
     
-    for i, caption in enumerate(captions):
-        img_path = os.path.join(folder_path, f"image{i+1}.jpg")
-        
-        # Skip if image already exists
-        if os.path.exists(img_path):
-            continue
-            
-        # Create placeholder image
-        img = Image.new('RGB', (800, 600), color=(240, 240, 240))
-        draw = ImageDraw.Draw(img)
-        
-        # Add text
-        text = f"{caption}"
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 40)
-        except:
-            font = ImageFont.load_default()
-            
-        # Get text bounding box
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        
-        # Center text
-        x = (800 - text_width) // 2
-        y = (600 - text_height) // 2
-        
-        draw.text((x, y), text, fill=(150, 150, 150), font=font)
-        
-        # Add border
-        draw.rectangle([0, 0, 799, 599], outline=(200, 200, 200), width=2)
-        
-        # Save image
-        img.save(img_path, 'JPEG', quality=85)
-        print(f"Created placeholder: {img_path}")
+    generator = PlaceholderGenerator(base_dir, size_class_dir=size_class_dir)
+    summary = generator.generate(image_folders)
+    print(f"Created {summary['created']} placeholders "
+          f"({summary['rendered']} rendered, {summary['cache_hits']} from cache)")
+    print("Placeholder images created!")
 
-print("Placeholder images created!")
\ No newline at end of file
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    main(sys.argv[1:])
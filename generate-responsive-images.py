@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Generate responsive variants for the Santa Barbara gallery images
+Writes width-stepped JPEG/WebP files and site/responsive-images/manifest.json
+with dimensions, byte sizes and blur-up placeholders for srcset/sizes
+"""
+
+from backend.src.image_management.responsive_images import ResponsiveImageGenerator
+
+if __name__ == "__main__":
+    print("Generating responsive image variants...")
+    generator = ResponsiveImageGenerator()
+    summary = generator.run()
+    
+    for result in summary['results']:
+        if result['status'] == 'failed':
+            print(f"  FAILED {result['source']}: {result['error']}")
+        elif result['status'] == 'generated':
+            entry = result['entry']
+            widths = sorted({v['width'] for v in entry['variants']})
+            print(f"  {result['source']}: {entry['width']}x{entry['height']} -> {widths} in {result['seconds'] * 1000:.0f}ms")
+    
+    images = summary['manifest']['images'].values()
+    original_bytes = sum(entry['bytes'] for entry in images)
+    variant_bytes = sum(v['bytes'] for entry in images for v in entry['variants'])
+    print(f"\nGenerated {summary['generated']}, unchanged {summary['skipped']}, failed {summary['failed']} "
+          f"in {summary['seconds']:.1f}s")
+    print(f"Originals: {original_bytes / 1e6:.1f}MB, all variants: {variant_bytes / 1e6:.1f}MB")
+    print(f"Manifest: {generator.manifest_path}")